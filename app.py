@@ -3,22 +3,57 @@ AnswerLens - AI Screen Analysis Application
 GUI Application using Google Gemini
 """
 
+import argparse
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import threading
+from tkinter import ttk, scrolledtext, messagebox, simpledialog, filedialog
+import asyncio
 import sys
 import json
+import io
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageTk
 from screen_analyzer import ScreenCapture
-from llm_analyzer import LLMAnalyzer
+from llm_analyzer import LLMAnalyzer, DEFAULT_MODEL
+from response_cache import ResponseCache
+from history_store import HistoryStore
+from screenshot_writer import ScreenshotWriter, FORMATS as SCREENSHOT_FORMATS
+from async_runner import AsyncRunner
+from capture_worker import CaptureWorker
+from request_scheduler import RequestScheduler
+from monitor_scheduler import MonitorScheduler
+from teleprompter_engine import TeleprompterEngine, FRAME_MS
+from word_index import WordIndex
 from region_selector import RegionSelector
+import image_codec
+from frame_diff import FrameChangeDetector, changed_region
+from frame_buffer import FrameBuffer
+import multi_monitor
+from metrics import Metrics, breakdown
+from profiling import Profiler
+
+
+PREVIEW_SIZE = (400, 300)
+MAX_QUEUED_CAPTURES = 16  # Images sent together from the capture queue
+CACHE_DIR = ".answerlens_cache"  # Persistent response cache (when "Keep cache on disk" is ticked)
+
+# Callbacks wrapped by the opt-in profiler, grouped by pipeline stage
+PROFILED_CALLBACKS = {
+    'capture': ['capture_screen', '_on_manual_capture', '_auto_capture_and_analyze', '_poll_frame',
+                '_capture_and_encode_monitors'],
+    'encode': ['_encode_with_preview', '_show_preview'],
+    'analysis': ['analyze_screen', '_append_answer_chunk', '_on_analysis_done', '_on_batch_done',
+                 '_on_chat_done'],
+    'teleprompter': ['_teleprompter_frame', '_set_teleprompter_text', '_append_teleprompter_text',
+                     '_highlight_word'],
+}
 
 
 class ScreenAnalysisApp:
     """AnswerLens - Main GUI application for AI screen analysis"""
     
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
         self.root.title("AnswerLens - AI Screen Analysis")
         self.root.geometry("1200x750")
@@ -42,21 +77,71 @@ class ScreenAnalysisApp:
         self.selected_window = None
         self.fixed_region = None
         self.current_image = None
-        self.current_image_base64 = None
+        self.current_image_bytes = None
+        self.current_encode_ms = None
+        self.current_resize_ms = None
+        self.current_capture_timings = {}  # capture_ms / convert_ms of current_image
+        self.preview_photo = None
+        self.preview_request_id = 0
+        self.preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Preview")
+        self.current_image_mime = None
+        self.analysis_request_id = 0
         self.config_file = "config.json"
+        self.response_cache = ResponseCache()  # Persistence is enabled by load_config
+        try:
+            self.history = HistoryStore("answerlens_history.db")
+        except Exception as e:
+            print(f"History disabled: {e}")
+            self.history = None
+        self.history_window = None
+        self.screenshot_writer = ScreenshotWriter(directory="screenshots")
+        self.frame_buffer = FrameBuffer()
+        self.last_buffered_time = None
+        self.capture_queue = []  # (caption, PIL Image) captures to ask about together
+        self.question_sets = {}  # Saved question sets: name -> list of questions
+        self.chat_session = None  # Conversation about the current capture (follow-up mode)
+        self.metrics = Metrics()
+        self.metrics_export_path = None  # JSON or Prometheus text file rewritten as metrics change
+        self.last_metrics_export = 0.0
+        self.history_entries = []
+        self.history_search_timer = None
+        self.async_runner = AsyncRunner(max_concurrency=4)
+        self.poll_interval = 0.5  # Seconds between low-cost change polls while monitoring
+        self.capture_worker = CaptureWorker(interval=None)
+        self.multi_capture = multi_monitor.MultiMonitorCapture()
+        self.current_monitors = None  # List of (MonitorShot, EncodedImage) in "All Monitors" mode
+        self.request_scheduler = RequestScheduler()
+        self.request_timeout = 90  # Seconds an analysis (including retries) may take
+        self.analyses_in_flight = 0
         self.monitoring = False
         self.monitor_timer = None
+        self.change_detector = FrameChangeDetector()
+        self.last_monitor_question = None
+        self.monitor_scheduler = MonitorScheduler()
+        self.last_poll_signature = None
+        self.last_poll_timestamp = None
+        self.last_sent_image = None
         self.teleprompter_window = None
         self.teleprompter_scroll_active = False
-        self.teleprompter_scroll_timer = None
-        self.teleprompter_word_timer = None
+        self.teleprompter_animation_timer = None
+        self.teleprompter_auto_start = False  # Start playback when the streamed answer's first words arrive
+        self.teleprompter_engine = TeleprompterEngine()
+        self.highlighted_word_index = None
         self.teleprompter_controls_visible = True
         self.current_word_index = 0
-        self.word_positions = []
-        self.scroll_delay_counter = 0
+        self.word_index = WordIndex()
+        
+        # Wrap hot callbacks before the UI binds them (no-op unless profiling is enabled)
+        self.profiler = profiler or Profiler()
+        self.profiler.instrument(self, PROFILED_CALLBACKS)
+        self.profiler.instrument(self.frame_buffer, {'encode': ['add']})
+        self.profiler.instrument(self.capture_worker, {'capture': ['_grab']})
+        self.profiler.instrument(self.async_runner, {'analysis': ['submit']})
+        self.profiler.instrument(self.request_scheduler, {'network': ['run', 'stream']})
         
         self.setup_ui()
         self.load_config()
+        self._apply_cache_settings()
     
     def setup_ui(self):
         """Create the user interface"""
@@ -79,9 +164,27 @@ class ScreenAnalysisApp:
         init_btn = ttk.Button(config_frame, text="Initialize", command=self.initialize_llm)
         init_btn.grid(row=0, column=3, padx=10, pady=5)
         
+        # Client-side rate limit
+        ttk.Label(config_frame, text="Requests/min:").grid(row=0, column=4, sticky=tk.W, padx=(10, 5))
+        self.requests_per_minute_var = tk.IntVar(value=10)
+        ttk.Spinbox(config_frame, from_=1, to=1000, width=6,
+                    textvariable=self.requests_per_minute_var).grid(row=0, column=5, sticky=tk.W)
+        self.requests_per_minute_var.trace_add('write', lambda *args: self._apply_requests_per_minute())
+        
+        # Persist cached answers across restarts
+        self.persist_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(config_frame, text="Keep cache on disk", variable=self.persist_cache_var,
+                        command=self._apply_cache_settings).grid(row=0, column=6, sticky=tk.W, padx=(10, 0))
+        
         self.status_label = ttk.Label(config_frame, text="Status: Not initialized", foreground="red")
         self.status_label.grid(row=1, column=0, columnspan=4, sticky=tk.W, pady=5)
         
+        # Stage timing breakdown of the latest analysis
+        self.metrics_label = ttk.Label(config_frame, text="", foreground="gray")
+        self.metrics_label.grid(row=1, column=4, columnspan=3, sticky=tk.W, padx=(10, 0))
+        ttk.Button(config_frame, text="Export Metrics...",
+                   command=self.export_metrics).grid(row=2, column=4, columnspan=2, sticky=tk.W, padx=(10, 0))
+        
         # Info label
         info_label = ttk.Label(config_frame, text="💡 Get a FREE API key at: https://aistudio.google.com/apikey", foreground="blue")
         info_label.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=5)
@@ -104,6 +207,8 @@ class ScreenAnalysisApp:
                        value="region").pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(mode_frame, text="Fixed Region", variable=self.capture_mode, 
                        value="fixed").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(mode_frame, text="All Monitors", variable=self.capture_mode, 
+                       value="monitors").pack(side=tk.LEFT, padx=5)
         
         # Window selection dropdown (for window mode)
         window_frame = ttk.Frame(capture_frame)
@@ -117,6 +222,21 @@ class ScreenAnalysisApp:
         ttk.Button(window_frame, text="Refresh Windows", 
                   command=self.refresh_windows).pack(side=tk.LEFT, padx=5)
         
+        # Monitor selection (for all-monitors mode)
+        monitors_frame = ttk.Frame(capture_frame)
+        monitors_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(monitors_frame, text="Monitors:").pack(side=tk.LEFT, padx=5)
+        self.monitors_var = tk.StringVar(value="all")
+        ttk.Entry(monitors_frame, textvariable=self.monitors_var, width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Label(monitors_frame, text="(\"all\" or e.g. 1,2)", foreground="gray").pack(side=tk.LEFT)
+        ttk.Label(monitors_frame, text="Send as:").pack(side=tk.LEFT, padx=(20, 5))
+        self.monitor_requests_var = tk.StringVar(value="combined")
+        ttk.Combobox(monitors_frame, textvariable=self.monitor_requests_var, width=10, state="readonly",
+                     values=["combined", "separate"]).pack(side=tk.LEFT, padx=5)
+        ttk.Label(monitors_frame, text="(one request with all images, or one request per monitor)",
+                  foreground="gray").pack(side=tk.LEFT)
+        
         # Action buttons
         button_frame = ttk.Frame(capture_frame)
         button_frame.pack(fill=tk.X, pady=5)
@@ -128,9 +248,35 @@ class ScreenAnalysisApp:
         ttk.Button(button_frame, text="💾 Save Screenshot", 
                   command=self.save_screenshot).pack(side=tk.LEFT, padx=5)
         
+        ttk.Label(button_frame, text="Encoding:").pack(side=tk.LEFT, padx=(20, 5))
+        self.encoding_profile_var = tk.StringVar(value=image_codec.DEFAULT_PROFILE)
+        ttk.Combobox(button_frame, textvariable=self.encoding_profile_var, width=10, state="readonly",
+                     values=list(image_codec.PROFILES)).pack(side=tk.LEFT, padx=5)
+        
+        # Screenshot saving: format, PNG compression and auto-save
+        save_frame = ttk.Frame(capture_frame)
+        save_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(save_frame, text="Save as:").pack(side=tk.LEFT, padx=5)
+        self.screenshot_format_var = tk.StringVar(value=self.screenshot_writer.format)
+        ttk.Combobox(save_frame, textvariable=self.screenshot_format_var, width=6, state="readonly",
+                     values=list(SCREENSHOT_FORMATS)).pack(side=tk.LEFT, padx=5)
+        ttk.Label(save_frame, text="PNG level:").pack(side=tk.LEFT, padx=(10, 5))
+        self.png_level_var = tk.IntVar(value=self.screenshot_writer.compress_level)
+        ttk.Spinbox(save_frame, from_=0, to=9, increment=1, width=4,
+                    textvariable=self.png_level_var).pack(side=tk.LEFT, padx=5)
+        self.auto_save_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(save_frame, text="Auto-save every capture",
+                        variable=self.auto_save_var).pack(side=tk.LEFT, padx=10)
+        self.save_info_label = ttk.Label(save_frame, text="", foreground="gray")
+        self.save_info_label.pack(side=tk.LEFT, padx=5)
+        
         self.capture_info_label = ttk.Label(capture_frame, text="", foreground="blue")
         self.capture_info_label.pack(fill=tk.X, pady=2)
         
+        self.encode_info_label = ttk.Label(capture_frame, text="", foreground="gray")
+        self.encode_info_label.pack(fill=tk.X)
+        
         # Initialize window list if on Windows
         if sys.platform == 'win32':
             self.refresh_windows()
@@ -152,6 +298,34 @@ class ScreenAnalysisApp:
         self.question_text.pack(fill=tk.X, pady=5)
         self.question_text.insert("1.0", "What do you see on this screen? Give answer in around 100 words and make it into a single paragraph")
         
+        # Batch mode: several questions (one per line) answered in one request
+        batch_frame = ttk.Frame(question_frame)
+        batch_frame.pack(fill=tk.X)
+        
+        self.batch_questions_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(batch_frame, text="One question per line (single request)",
+                        variable=self.batch_questions_var).pack(side=tk.LEFT)
+        ttk.Label(batch_frame, text="Question set:").pack(side=tk.LEFT, padx=(15, 2))
+        self.question_set_var = tk.StringVar()
+        self.question_set_combo = ttk.Combobox(batch_frame, textvariable=self.question_set_var,
+                                               state="readonly", width=16)
+        self.question_set_combo.pack(side=tk.LEFT)
+        self.question_set_combo.bind("<<ComboboxSelected>>", lambda e: self.load_question_set())
+        ttk.Button(batch_frame, text="Save Set...", command=self.save_question_set).pack(side=tk.LEFT, padx=2)
+        ttk.Button(batch_frame, text="Delete Set", command=self.delete_question_set).pack(side=tk.LEFT, padx=2)
+        
+        # Follow-up mode: later questions continue a conversation about the same capture
+        followup_frame = ttk.Frame(question_frame)
+        followup_frame.pack(fill=tk.X)
+        
+        self.follow_ups_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(followup_frame, text="Follow-up questions (send the capture once)",
+                        variable=self.follow_ups_var).pack(side=tk.LEFT)
+        ttk.Button(followup_frame, text="New Conversation",
+                   command=self._reset_chat_session).pack(side=tk.LEFT, padx=10)
+        self.session_info_label = ttk.Label(followup_frame, text="", foreground="gray")
+        self.session_info_label.pack(side=tk.LEFT)
+        
         # Analysis buttons frame
         analysis_btn_frame = ttk.Frame(question_frame)
         analysis_btn_frame.pack(pady=5)
@@ -160,7 +334,7 @@ class ScreenAnalysisApp:
                   command=self.analyze_screen, style="Accent.TButton")
         self.analyze_btn.pack(side=tk.LEFT, padx=5)
         
-        self.monitor_btn = ttk.Button(analysis_btn_frame, text="Start Monitoring (1 min)", 
+        self.monitor_btn = ttk.Button(analysis_btn_frame, text="Start Monitoring", 
                   command=self.toggle_monitoring)
         self.monitor_btn.pack(side=tk.LEFT, padx=5)
         
@@ -168,12 +342,77 @@ class ScreenAnalysisApp:
                   command=self.open_teleprompter)
         self.teleprompter_btn.pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(analysis_btn_frame, text="🕘 History", 
+                  command=self.open_history).pack(side=tk.LEFT, padx=5)
+        
         self.monitor_status_label = ttk.Label(question_frame, text="", foreground="green")
         self.monitor_status_label.pack()
         
+        # Change detection settings for monitoring
+        change_frame = ttk.Frame(question_frame)
+        change_frame.pack(pady=2)
+        
+        ttk.Label(change_frame, text="Change threshold (%):").pack(side=tk.LEFT, padx=5)
+        self.change_threshold_var = tk.DoubleVar(value=self.change_detector.threshold)
+        ttk.Spinbox(change_frame, from_=0.0, to=5.0, increment=0.01, width=6,
+                    textvariable=self.change_threshold_var).pack(side=tk.LEFT, padx=5)
+        self.crop_changes_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(change_frame, text="Send changed region only",
+                        variable=self.crop_changes_var).pack(side=tk.LEFT, padx=5)
+        self.change_counter_label = ttk.Label(change_frame, text="Sent: 0 | Skipped: 0", foreground="gray")
+        self.change_counter_label.pack(side=tk.LEFT, padx=10)
+        
+        # Monitoring timing: settle time after a change and interval bounds
+        timing_frame = ttk.Frame(question_frame)
+        timing_frame.pack(pady=2)
+        
+        self.debounce_var = tk.DoubleVar(value=self.monitor_scheduler.debounce)
+        self.min_interval_var = tk.DoubleVar(value=self.monitor_scheduler.min_interval)
+        self.max_interval_var = tk.DoubleVar(value=self.monitor_scheduler.max_interval)
+        for label, var, upper in (("Settle (s):", self.debounce_var, 60),
+                                  ("Min interval (s):", self.min_interval_var, 3600),
+                                  ("Max interval (s):", self.max_interval_var, 3600)):
+            ttk.Label(timing_frame, text=label).pack(side=tk.LEFT, padx=(10, 2))
+            ttk.Spinbox(timing_frame, from_=0, to=upper, increment=0.5, width=6,
+                        textvariable=var).pack(side=tk.LEFT)
+        
+        # Questions about recent frames from the rolling buffer
+        recent_frame = ttk.Frame(question_frame)
+        recent_frame.pack(pady=2)
+        
+        ttk.Label(recent_frame, text="Last (min):").pack(side=tk.LEFT, padx=(10, 2))
+        self.recent_minutes_var = tk.DoubleVar(value=5)
+        ttk.Spinbox(recent_frame, from_=0.5, to=120, increment=0.5, width=5,
+                    textvariable=self.recent_minutes_var).pack(side=tk.LEFT)
+        ttk.Label(recent_frame, text="Frames:").pack(side=tk.LEFT, padx=(10, 2))
+        self.recent_frames_var = tk.IntVar(value=6)
+        ttk.Spinbox(recent_frame, from_=2, to=16, increment=1, width=4,
+                    textvariable=self.recent_frames_var).pack(side=tk.LEFT)
+        ttk.Button(recent_frame, text="Ask About Recent Frames",
+                   command=self.ask_recent_frames).pack(side=tk.LEFT, padx=10)
+        self.buffer_info_label = ttk.Label(recent_frame, text="Buffer: empty", foreground="gray")
+        self.buffer_info_label.pack(side=tk.LEFT)
+        
+        # Capture queue: accumulate captures and ask one question about all of them
+        queue_frame = ttk.Frame(question_frame)
+        queue_frame.pack(pady=2)
+        
+        ttk.Label(queue_frame, text="Caption:").pack(side=tk.LEFT, padx=(10, 2))
+        self.queue_caption_var = tk.StringVar()
+        ttk.Entry(queue_frame, textvariable=self.queue_caption_var, width=18).pack(side=tk.LEFT)
+        ttk.Button(queue_frame, text="Add to Queue",
+                   command=self.add_to_queue).pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Button(queue_frame, text="Ask About Queue",
+                   command=self.ask_about_queue).pack(side=tk.LEFT, padx=2)
+        ttk.Button(queue_frame, text="Clear Queue",
+                   command=self.clear_queue).pack(side=tk.LEFT, padx=2)
+        self.queue_info_label = ttk.Label(queue_frame, text="Queue: empty", foreground="gray")
+        self.queue_info_label.pack(side=tk.LEFT, padx=10)
+        
         ttk.Label(question_frame, text="Answer:").pack(anchor=tk.W)
         self.answer_text = scrolledtext.ScrolledText(question_frame, height=15, wrap=tk.WORD)
         self.answer_text.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.answer_text.tag_configure("batch_question", font=('Segoe UI', 10, 'bold'))
         
         # Right column - Preview
         right_frame = ttk.Frame(main_frame)
@@ -194,6 +433,29 @@ class ScreenAnalysisApp:
                     config = json.load(f)
                     self.api_key_var.set(config.get('api_key', ''))
                     self.remember_key_var.set(config.get('remember_key', True))
+                    self.change_threshold_var.set(config.get('change_threshold', self.change_detector.threshold))
+                    self.poll_interval = config.get('poll_interval', self.poll_interval)
+                    self.debounce_var.set(config.get('debounce', self.monitor_scheduler.debounce))
+                    self.min_interval_var.set(config.get('min_interval', self.monitor_scheduler.min_interval))
+                    self.max_interval_var.set(config.get('max_interval', self.monitor_scheduler.max_interval))
+                    self.crop_changes_var.set(config.get('crop_changes', False))
+                    self.requests_per_minute_var.set(config.get('requests_per_minute', 10))
+                    if config.get('encoding_profile') in image_codec.PROFILES:
+                        self.encoding_profile_var.set(config['encoding_profile'])
+                    self.monitors_var.set(config.get('monitors', 'all'))
+                    if config.get('screenshot_format') in SCREENSHOT_FORMATS:
+                        self.screenshot_format_var.set(config['screenshot_format'])
+                    self.png_level_var.set(config.get('png_compress_level', self.screenshot_writer.compress_level))
+                    self.auto_save_var.set(config.get('auto_save', False))
+                    self.frame_buffer.memory_budget = int(config.get('frame_buffer_mb', 64) * 1024 * 1024)
+                    if config.get('monitor_requests') in ('combined', 'separate'):
+                        self.monitor_requests_var.set(config['monitor_requests'])
+                    self.batch_questions_var.set(config.get('batch_questions', False))
+                    self.follow_ups_var.set(config.get('follow_ups', False))
+                    self.persist_cache_var.set(config.get('persist_cache', True))
+                    self.metrics_export_path = config.get('metrics_export') or None
+                    self.question_sets = dict(config.get('question_sets', {}))
+                    self._update_question_sets()
                     
                     # Auto-initialize if API key is saved
                     if config.get('api_key'):
@@ -211,6 +473,26 @@ class ScreenAnalysisApp:
             else:
                 config['api_key'] = ''
                 config['remember_key'] = False
+            config['change_threshold'] = self._get_change_threshold()
+            config['poll_interval'] = self.poll_interval
+            self._apply_monitor_timing()
+            config['debounce'] = self.monitor_scheduler.debounce
+            config['min_interval'] = self.monitor_scheduler.min_interval
+            config['max_interval'] = self.monitor_scheduler.max_interval
+            config['crop_changes'] = self.crop_changes_var.get()
+            config['requests_per_minute'] = self._get_requests_per_minute()
+            config['encoding_profile'] = self.encoding_profile_var.get()
+            config['monitors'] = self.monitors_var.get()
+            config['monitor_requests'] = self.monitor_requests_var.get()
+            config['screenshot_format'] = self.screenshot_format_var.get()
+            config['png_compress_level'] = self.screenshot_writer.compress_level
+            config['auto_save'] = self.auto_save_var.get()
+            config['frame_buffer_mb'] = self.frame_buffer.memory_budget / (1024 * 1024)
+            config['batch_questions'] = self.batch_questions_var.get()
+            config['follow_ups'] = self.follow_ups_var.get()
+            config['persist_cache'] = self.persist_cache_var.get()
+            config['metrics_export'] = self.metrics_export_path or ''
+            config['question_sets'] = self.question_sets
             
             with open(self.config_file, 'w') as f:
                 json.dump(config, f)
@@ -222,7 +504,8 @@ class ScreenAnalysisApp:
         try:
             api_key = self.api_key_var.get() if self.api_key_var.get() else None
             
-            self.analyzer = LLMAnalyzer(api_key=api_key)
+            self.analyzer = LLMAnalyzer(api_key=api_key, cache=self.response_cache)
+            self.request_scheduler.set_rate(self._get_requests_per_minute())
             
             # Save config if remember is checked
             self.save_config()
@@ -253,7 +536,7 @@ class ScreenAnalysisApp:
     def set_fixed_region(self):
         """Set a fixed region for capture"""
         try:
-            selector = RegionSelector()
+            selector = self._region_selector()
             region = selector.select_region()
             if region:
                 self.fixed_region = region
@@ -267,91 +550,457 @@ class ScreenAnalysisApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to select region:\n{str(e)}")
     
-    def capture_screen(self):
-        """Capture the screen based on selected mode"""
-        try:
-            mode = self.capture_mode.get()
-            
-            if mode == "fullscreen":
-                self.current_image = self.capturer.capture_screen()
-                self.capture_info_label.config(text="✓ Full screen captured")
-            
-            elif mode == "window":
-                if sys.platform != 'win32':
+    def _region_selector(self, max_age=10.0):
+        """
+        Create a RegionSelector, reusing the latest captured frame as its background
+        
+        Only frames of the whole desktop or a whole monitor are reused; a region
+        capture would leave most of the overlay blank.
+        
+        Args:
+            max_age: Oldest frame (seconds) worth reusing instead of grabbing the screen
+        """
+        frame = self.capture_worker.latest()
+        if frame is not None and frame.bounds and time.time() - frame.timestamp <= max_age:
+            screens = [self.capturer.desktop_bounds()] + [bounds for _, bounds in self.capturer.list_monitors()]
+            if tuple(frame.bounds) in screens:
+                return RegionSelector(frame.image, frame.bounds)
+        return RegionSelector()
+    
+    def _capture_source(self, mode, interactive=True):
+        """
+        Build a capture source for the CaptureWorker from the selected mode
+        
+        Args:
+            mode: Capture mode name
+            interactive: Show warnings/region selector; when False, missing
+                settings silently yield no source
+        
+        Returns:
+            Tuple of (source callable, description) or None
+        """
+        if mode == "fullscreen":
+            return (lambda capturer: capturer.capture_screen()), "Full screen captured"
+        
+        elif mode == "monitors":
+            # Monitoring polls the whole virtual desktop and splits it per monitor
+            return (lambda capturer: capturer.capture_screen(0)), "All monitors captured"
+        
+        elif mode == "window":
+            if sys.platform != 'win32':
+                if interactive:
                     messagebox.showwarning("Not Supported", "Window capture is only supported on Windows")
-                    return
-                
-                # Get selected window
-                selected_index = self.window_combo.current()
-                if selected_index < 0:
-                    messagebox.showwarning("No Window", "Please select a window to capture")
-                    return
-                
-                window_handle, window_title = self.window_list[selected_index]
-                self.current_image = self.capturer.capture_window(window_handle)
-                self.capture_info_label.config(text=f"✓ Window captured: {window_title}")
+                return None
             
-            elif mode == "region":
-                selector = RegionSelector()
-                region = selector.select_region()
-                if region:
-                    left, top, width, height = region
-                    self.current_image = self.capturer.capture_region(left, top, width, height)
-                    self.capture_info_label.config(text=f"✓ Region captured: {width}x{height}")
-                else:
-                    messagebox.showinfo("Cancelled", "Region selection cancelled")
-                    return
+            # Get selected window
+            selected_index = self.window_combo.current()
+            if selected_index < 0:
+                if interactive:
+                    messagebox.showwarning("No Window", "Please select a window to capture")
+                return None
             
-            elif mode == "fixed":
-                if not self.fixed_region:
+            window_handle, window_title = self.window_list[selected_index]
+            return (lambda capturer: capturer.capture_window(window_handle)), f"Window captured: {window_title}"
+        
+        elif mode == "region":
+            if not interactive:
+                return None
+            selector = self._region_selector()
+            region = selector.select_region()
+            if not region:
+                messagebox.showinfo("Cancelled", "Region selection cancelled")
+                return None
+            left, top, width, height = region
+            return (lambda capturer: capturer.capture_region(left, top, width, height)), \
+                f"Region captured: {width}x{height}"
+        
+        elif mode == "fixed":
+            if not self.fixed_region:
+                if interactive:
                     messagebox.showwarning("No Fixed Region", 
                                          "Please set a fixed region first using 'Set Fixed Region' button")
-                    return
-                
-                left, top, width, height = self.fixed_region
-                self.current_image = self.capturer.capture_region(left, top, width, height)
-                self.capture_info_label.config(text=f"✓ Fixed region captured: {width}x{height}")
-            
-            # Convert to base64
-            self.current_image_base64 = self.capturer.image_to_base64(self.current_image, max_size=1024)
+                return None
             
-            # Update preview
-            self.update_preview()
+            left, top, width, height = self.fixed_region
+            return (lambda capturer: capturer.capture_region(left, top, width, height)), \
+                f"Fixed region captured: {width}x{height}"
+        
+        return None
+    
+    def capture_screen(self):
+        """Capture the screen based on selected mode"""
+        if self.capture_mode.get() == "monitors":
+            self._capture_monitors()
+            return
+        
+        try:
+            capture = self._capture_source(self.capture_mode.get())
+            if capture is None:
+                return
+            source, description = capture
             
+            # Grab on the capture worker so the UI stays responsive
+            self.capture_info_label.config(text="Capturing...")
+            future = self.capture_worker.grab_now(source)
+            future.add_done_callback(
+                lambda f: self.root.after(0, self._on_manual_capture, f, description)
+            )
         except Exception as e:
             messagebox.showerror("Error", f"Failed to capture:\n{str(e)}")
     
-    def update_preview(self):
-        """Update the preview image"""
-        if self.current_image:
-            # Resize for preview
-            preview_size = (400, 300)
-            img_copy = self.current_image.copy()
-            img_copy.thumbnail(preview_size, Image.Resampling.LANCZOS)
+    def _on_manual_capture(self, future, description):
+        """Handle a frame captured by the Capture button"""
+        try:
+            self.current_image = future.result().image
+            self.current_image_bytes = None  # Set once the new frame is encoded
+            self.current_capture_timings = dict(future.result().timings or {})
+            self.metrics.observe_timings(self.current_capture_timings)
+            self.current_monitors = None
+            self.capture_info_label.config(text=f"✓ {description}")
+            self._auto_save(self.current_image)
+            self._buffer_frame(future.result().timestamp, self.current_image)
+            
+            # Encode for analysis and render the preview off the UI thread
+            preview_id = self._next_preview_id()
+            image = self.current_image
+            encode_future = self.preview_executor.submit(
+                self._encode_with_preview, image, self.encoding_profile_var.get()
+            )
+            encode_future.add_done_callback(
+                lambda f: self.root.after(0, self._on_capture_encoded, f, preview_id, image)
+            )
             
-            photo = ImageTk.PhotoImage(img_copy)
-            self.preview_label.config(image=photo, text="")
-            self.preview_label.image = photo  # Keep a reference
+        except Exception as e:
+            self.capture_info_label.config(text="")
+            messagebox.showerror("Error", f"Failed to capture:\n{str(e)}")
     
-    def save_screenshot(self):
-        """Save the current screenshot"""
-        if self.current_image:
+    def _on_capture_encoded(self, future, preview_id, image):
+        """Handle a captured frame (image) once it is encoded"""
+        try:
+            encoded, thumb = future.result()
+        except Exception as e:
+            self.capture_info_label.config(text="")
+            messagebox.showerror("Error", f"Failed to encode capture:\n{str(e)}")
+            return
+        
+        self._set_encoded_image(encoded, image)
+        self._show_preview(thumb, preview_id)
+    
+    def _encode_with_preview(self, image, profile, preview=True):
+        """
+        Encode a frame for analysis (runs on a worker thread)
+        
+        Returns:
+            Tuple of (EncodedImage, preview thumbnail or None). The thumbnail is
+            derived from the already downscaled image that was encoded.
+        """
+        encoded = self.capturer.encode_adaptive(image, profile=profile, model=DEFAULT_MODEL)
+        self._observe_encode(encoded)
+        thumb = image_codec.make_thumbnail(encoded.image, PREVIEW_SIZE) if preview else None
+        return encoded, thumb
+    
+    def _selected_monitors(self):
+        """Monitor numbers and bounds chosen in the Monitors field"""
+        monitors = dict(self.capturer.list_monitors())
+        numbers = multi_monitor.parse_monitor_selection(self.monitors_var.get(), len(monitors))
+        return [(number, monitors[number]) for number in numbers]
+    
+    def _capture_monitors(self):
+        """Capture the selected monitors in parallel (All Monitors mode)"""
+        try:
+            numbers = [number for number, _ in self._selected_monitors()]
+        except ValueError as e:
+            messagebox.showwarning("Monitors", str(e))
+            return
+        
+        self.capture_info_label.config(text=f"Capturing {len(numbers)} monitor(s)...")
+        preview_id = self._next_preview_id()
+        future = self.preview_executor.submit(
+            self._capture_and_encode_monitors, numbers, self.encoding_profile_var.get()
+        )
+        future.add_done_callback(lambda f: self.root.after(0, self._on_monitors_captured, f, preview_id))
+    
+    def _capture_and_encode_monitors(self, numbers, profile):
+        """
+        Grab and encode monitors concurrently (runs on a worker thread)
+        
+        Returns:
+            Tuple of (shots, encoded images, desktop composite, preview thumbnail, elapsed ms)
+        """
+        start = time.perf_counter()
+        shots = self.multi_capture.capture(numbers)
+        encoded = self.multi_capture.encode(shots, profile, DEFAULT_MODEL)
+        for shot, image in zip(shots, encoded):
+            self.metrics.observe('capture', shot.capture_ms)
+            self._observe_encode(image)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        image = multi_monitor.composite(shots)
+        return shots, encoded, image, image_codec.make_thumbnail(image, PREVIEW_SIZE), elapsed_ms
+    
+    def _on_monitors_captured(self, future, preview_id):
+        """Handle monitors captured in All Monitors mode"""
+        try:
+            shots, encoded, image, thumb, elapsed_ms = future.result()
+        except Exception as e:
+            self.capture_info_label.config(text="")
+            messagebox.showerror("Error", f"Failed to capture monitors:\n{str(e)}")
+            return
+        
+        self.current_image = image
+        self.current_image_bytes = None
+        self.current_capture_timings = {}  # Per-monitor timings are recorded with each analysis
+        self.current_monitors = list(zip(shots, encoded))
+        self._reset_chat_session()
+        self._auto_save(image)
+        self._buffer_frame(time.time(), image)
+        self.capture_info_label.config(
+            text=f"✓ {len(shots)} monitor(s) captured and encoded in {elapsed_ms:.0f} ms"
+        )
+        self._show_monitor_timings(shots, encoded)
+        self._show_preview(thumb, preview_id)
+    
+    def _show_monitor_timings(self, shots, encoded, request_times=None):
+        """Report per-monitor capture/encode timings (and request times once known)"""
+        parts = []
+        for index, (shot, image) in enumerate(zip(shots, encoded)):
+            text = (f"Monitor {shot.number}: capture {shot.capture_ms:.0f} ms, "
+                    f"{image.format} {len(image.data) / 1024:.0f} KB in {image.encode_ms:.0f} ms")
+            if request_times and request_times[index] is not None:
+                text += f", answer {request_times[index]:.1f} s"
+            parts.append(text)
+        self.encode_info_label.config(text=" | ".join(parts))
+    
+    def _analyze_monitor_frame(self, frame, question):
+        """Split a polled virtual-desktop frame per monitor and analyze it (monitoring)"""
+        shots = multi_monitor.split_frame(frame.image, frame.bounds or (0, 0) + frame.image.size,
+                                          self._selected_monitors())
+        if not shots:
+            return
+        
+        self.update_preview()
+        
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.answer_text.delete("1.0", tk.END)
+        self.answer_text.insert("1.0", f"[{timestamp}] Analyzing {len(shots)} monitor(s)... Please wait...")
+        self._submit_monitor_analysis(question, shots, frame_image=frame.image)
+    
+    def _submit_monitor_analysis(self, question, shots, encoded=None, frame_image=None):
+        """
+        Submit an analysis of several monitors to the async runner
+        
+        Args:
+            question: Question to ask
+            shots: List of MonitorShot
+            encoded: Matching EncodedImages (encoded off the UI thread first if None)
+            frame_image: Frame the shots were split from; once they are encoded they
+                become the current capture for Analyze Screen (if the frame is still current)
+        """
+        self.analysis_request_id += 1
+        request_id = self.analysis_request_id
+        self.analyses_in_flight += 1
+        record = self._new_history_record(question, self.current_image)
+        
+        coro = self._analyze_monitors(request_id, question, shots, encoded,
+                                      profile=self.encoding_profile_var.get(),
+                                      combined=self.monitor_requests_var.get() == "combined", record=record,
+                                      frame_image=frame_image)
+        future = self.async_runner.submit(coro)
+        future.add_done_callback(lambda f: self.root.after(0, self._on_analysis_done, f, request_id, record))
+    
+    async def _analyze_monitors(self, request_id, question, shots, encoded, profile, combined, record=None,
+                                frame_image=None):
+        """
+        Coroutine that analyzes several monitors
+        
+        Combined mode streams one request with every monitor as a separate image
+        part; separate mode runs one request per monitor concurrently and merges
+        the answers as they complete.
+        """
+        if encoded is None:
+            loop = asyncio.get_running_loop()
+            encoded = await loop.run_in_executor(None, self.multi_capture.encode, shots, profile, DEFAULT_MODEL)
+        if frame_image is not None:
+            self.root.after(0, self._set_current_monitors, shots, encoded, frame_image)
+        self.root.after(0, self._show_monitor_timings, shots, encoded)
+        if record is not None:
+            record['image_data'] = b"".join(image.data for image in encoded)
+            record['timings']['capture_ms'] = max(shot.capture_ms for shot in shots)
+            record['timings']['encode_ms'] = sum(image.encode_ms for image in encoded)
+            record['timings']['resize_ms'] = sum(image.resize_ms or 0 for image in encoded)
+        
+        if combined:
+            images = [(image.data, image.mime_type) for image in encoded]
+            captions = [f"Monitor {shot.number} ({shot.bounds[2]}x{shot.bounds[3]}):" for shot in shots]
+            start = time.monotonic()
+            chunks = []
+            stream = self.request_scheduler.stream(
+                lambda: self.analyzer.stream_images_async(images, question, captions=captions),
+                timeout=self.request_timeout
+            )
+            async for chunk in stream:
+                chunks.append(chunk)
+                if record is not None and len(chunks) == 1:
+                    record['timings']['first_chunk_ms'] = (time.monotonic() - start) * 1000
+                self.root.after(0, self._append_answer_chunk, request_id, chunk, len(chunks) == 1,
+                                record, time.monotonic())
+            elapsed = time.monotonic() - start
+            self.root.after(0, self._show_monitor_timings, shots, encoded, [elapsed] * len(shots))
+            if record is not None:
+                record['timings']['request_ms'] = elapsed * 1000
+            return "".join(chunks)
+        
+        answers = [None] * len(shots)
+        request_times = [None] * len(shots)
+        
+        async def analyze(index):
+            start = time.monotonic()
+            image = encoded[index]
             try:
-                filename = self.capturer.save_screenshot(self.current_image)
-                messagebox.showinfo("Success", f"Screenshot saved as:\n{filename}")
+                answers[index] = await self.request_scheduler.run(
+                    lambda: self.analyzer.analyze_image_data_async(image.data, question, mime_type=image.mime_type),
+                    timeout=self.request_timeout
+                )
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to save screenshot:\n{str(e)}")
+                answers[index] = f"Error: {e}"
+            request_times[index] = time.monotonic() - start
+            merged = self._merge_monitor_answers(shots, answers, request_times)
+            self.root.after(0, self._show_monitor_answers, request_id, merged, shots, encoded,
+                            list(request_times), None not in answers)
+        
+        start = time.monotonic()
+        await asyncio.gather(*(analyze(index) for index in range(len(shots))))
+        if record is not None:
+            record['timings']['request_ms'] = (time.monotonic() - start) * 1000
+        return self._merge_monitor_answers(shots, answers, request_times)
+    
+    def _set_current_monitors(self, shots, encoded, image):
+        """Make encoded monitor shots the current capture, unless a newer frame replaced image"""
+        if image is self.current_image:
+            self.current_monitors = list(zip(shots, encoded))
+    
+    @staticmethod
+    def _merge_monitor_answers(shots, answers, request_times):
+        """Combine per-monitor answers into one text, in monitor order"""
+        sections = []
+        for shot, answer, elapsed in zip(shots, answers, request_times):
+            if answer is None:
+                sections.append(f"Monitor {shot.number}: (waiting...)")
+            else:
+                sections.append(f"Monitor {shot.number} ({elapsed:.1f} s):\n{answer}")
+        return "\n\n".join(sections)
+    
+    def _show_monitor_answers(self, request_id, text, shots, encoded, request_times, complete):
+        """Show merged per-monitor answers as they arrive (separate-request mode)"""
+        if request_id != self.analysis_request_id:
+            return
+        
+        if self.monitoring:
+            from datetime import datetime
+            text = f"[{datetime.now().strftime('%H:%M:%S')}] {text}"
+        self.answer_text.delete("1.0", tk.END)
+        self.answer_text.insert("1.0", text)
+        if complete:
+            self._set_teleprompter_text(text)
+        self._show_monitor_timings(shots, encoded, request_times)
+    
+    def update_preview(self, image=None):
+        """
+        Update the preview image
+        
+        The thumbnail is rendered on a worker thread and shown when ready.
+        
+        Args:
+            image: PIL Image to show (default: the current capture)
+        """
+        if image is None:
+            image = self.current_image
+        if image is None:
+            return
+        
+        preview_id = self._next_preview_id()
+        future = self.preview_executor.submit(image_codec.make_thumbnail, image, PREVIEW_SIZE)
+        future.add_done_callback(lambda f: self.root.after(0, self._on_preview_ready, f, preview_id))
+    
+    def _next_preview_id(self):
+        """Allocate an id so previews that finish out of order are dropped"""
+        self.preview_request_id += 1
+        return self.preview_request_id
+    
+    def _on_preview_ready(self, future, preview_id):
+        """Show a thumbnail rendered by update_preview"""
+        try:
+            thumb = future.result()
+        except Exception as e:
+            print(f"Preview error: {e}")
+            return
+        self._show_preview(thumb, preview_id)
+    
+    def _show_preview(self, thumb, preview_id):
+        """Display a thumbnail, updating the existing PhotoImage in place when the size matches"""
+        if preview_id != self.preview_request_id:
+            return
+        
+        photo = self.preview_photo
+        if photo is not None and (photo.width(), photo.height()) == thumb.size:
+            photo.paste(thumb)
+        else:
+            self.preview_photo = ImageTk.PhotoImage(thumb)
+            self.preview_label.config(image=self.preview_photo, text="")
+    
+    def save_screenshot(self):
+        """Save the current screenshot (written in the background)"""
+        if self.current_image:
+            self._queue_screenshot(self.current_image, notify=True)
         else:
             messagebox.showwarning("Warning", "No screenshot to save. Capture a screen first.")
     
+    def _auto_save(self, image):
+        """Queue a captured frame for saving when auto-save is on"""
+        if self.auto_save_var.get():
+            self._queue_screenshot(image, notify=False)
+    
+    def _queue_screenshot(self, image, notify):
+        """Hand an image to the screenshot writer with the format chosen in the UI"""
+        try:
+            self.screenshot_writer.compress_level = max(0, min(9, int(self.png_level_var.get())))
+        except (tk.TclError, ValueError):
+            pass
+        future = self.screenshot_writer.save(image, format=self.screenshot_format_var.get())
+        future.add_done_callback(lambda f: self.root.after(0, self._on_screenshot_saved, f, notify))
+    
+    def _on_screenshot_saved(self, future, notify):
+        """Report a finished screenshot write"""
+        try:
+            saved = future.result()
+        except Exception as e:
+            if notify:
+                messagebox.showerror("Error", f"Failed to save screenshot:\n{str(e)}")
+            else:
+                self.save_info_label.config(text=f"Save failed: {e}")
+            return
+        
+        writer = self.screenshot_writer
+        self.save_info_label.config(
+            text=f"Saved {writer.written}, duplicates {writer.duplicates}, queued {writer.pending()}"
+        )
+        if notify:
+            if saved.written:
+                messagebox.showinfo("Success", f"Screenshot saved as:\n{saved.path}")
+            else:
+                messagebox.showinfo("Already Saved", f"This screenshot was already saved as:\n{saved.path}")
+    
     def analyze_screen(self):
         """Analyze the captured screen with Gemini"""
         if not self.analyzer:
             messagebox.showwarning("Warning", "Please initialize Gemini first.")
             return
         
-        if not self.current_image_base64:
-            messagebox.showwarning("Warning", "Please capture a screen first.")
+        if not self.current_image_bytes and not self.current_monitors:
+            if self.current_image is not None:
+                messagebox.showinfo("Please Wait", "The capture is still being encoded. Try again in a moment.")
+            else:
+                messagebox.showwarning("Warning", "Please capture a screen first.")
             return
         
         question = self.question_text.get("1.0", tk.END).strip()
@@ -359,15 +1008,180 @@ class ScreenAnalysisApp:
             messagebox.showwarning("Warning", "Please enter a question.")
             return
         
+        questions = self._batch_questions(question)
+        if questions and self.current_monitors:
+            messagebox.showwarning("Warning", "Batch questions need a single capture. "
+                                              "Switch off All Monitors or untick the batch option.")
+            return
+        
         # Show loading message
         self.answer_text.delete("1.0", tk.END)
+        if questions:
+            self.answer_text.insert("1.0", f"Analyzing {len(questions)} questions... Please wait...")
+            self._submit_batch_analysis(questions)
+            return
         self.answer_text.insert("1.0", "Analyzing... Please wait...")
         self.root.update()
         
-        # Run analysis in a separate thread to avoid freezing UI
-        thread = threading.Thread(target=self._analyze_thread, args=(question,))
-        thread.daemon = True
-        thread.start()
+        if self.follow_ups_var.get() and not self.current_monitors:
+            self._submit_chat_analysis(question)
+            return
+        
+        # Run analysis on the background event loop to avoid freezing UI
+        if self.current_monitors:
+            shots = [shot for shot, _ in self.current_monitors]
+            encoded = [image for _, image in self.current_monitors]
+            self._submit_monitor_analysis(question, shots, encoded)
+        else:
+            self._submit_analysis(question)
+    
+    def _batch_questions(self, text):
+        """Questions to batch (one per non-empty line), or None when batch mode does not apply"""
+        if not self.batch_questions_var.get():
+            return None
+        questions = [line.strip() for line in text.splitlines() if line.strip()]
+        return questions if len(questions) > 1 else None
+    
+    def _update_question_sets(self):
+        """Refresh the question set dropdown"""
+        self.question_set_combo['values'] = sorted(self.question_sets)
+        if self.question_set_var.get() not in self.question_sets:
+            self.question_set_var.set("")
+    
+    def load_question_set(self):
+        """Put the selected question set into the question box and enable batch mode"""
+        questions = self.question_sets.get(self.question_set_var.get())
+        if not questions:
+            return
+        self.question_text.delete("1.0", tk.END)
+        self.question_text.insert("1.0", "\n".join(questions))
+        self.batch_questions_var.set(True)
+    
+    def save_question_set(self):
+        """Save the questions in the question box (one per line) as a named set"""
+        questions = [line.strip() for line in self.question_text.get("1.0", tk.END).splitlines() if line.strip()]
+        if not questions:
+            messagebox.showwarning("Warning", "Please enter one question per line first.")
+            return
+        name = simpledialog.askstring("Save Question Set", "Name for this question set:",
+                                      initialvalue=self.question_set_var.get(), parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        self.question_sets[name] = questions
+        self._update_question_sets()
+        self.question_set_var.set(name)
+        self.save_config()
+    
+    def delete_question_set(self):
+        """Delete the selected question set"""
+        name = self.question_set_var.get()
+        if name in self.question_sets and messagebox.askyesno("Delete Question Set", f"Delete '{name}'?"):
+            del self.question_sets[name]
+            self._update_question_sets()
+            self.save_config()
+    
+    def _submit_batch_analysis(self, questions):
+        """Ask several questions about the current capture in one structured request"""
+        self.analysis_request_id += 1
+        request_id = self.analysis_request_id
+        self.analyses_in_flight += 1
+        record = self._new_history_record(None, self.current_image, self.current_image_bytes)
+        record['timings'].update(self._current_encode_timings())
+        
+        coro = self._run_batch_analysis(self.current_image_bytes, self.current_image_mime, questions, record)
+        future = self.async_runner.submit(coro)
+        future.add_done_callback(
+            lambda f: self.root.after(0, self._on_batch_done, f, request_id, questions, record)
+        )
+    
+    async def _run_batch_analysis(self, image_bytes, mime_type, questions, record):
+        """Coroutine returning one answer per question"""
+        start = time.monotonic()
+        answers = await self.request_scheduler.run(
+            lambda: self.analyzer.analyze_questions_async(image_bytes, questions, mime_type=mime_type),
+            timeout=self.request_timeout
+        )
+        record['timings']['request_ms'] = (time.monotonic() - start) * 1000
+        return answers
+    
+    def _on_batch_done(self, future, request_id, questions, record):
+        """Handle a completed batch analysis: store and show each answer separately"""
+        self.analyses_in_flight -= 1
+        error = future.exception()
+        if error is None:
+            self._observe_analysis(record, "\n".join(future.result()))
+            for question, answer in zip(questions, future.result()):
+                self._store_history(dict(record, question=question), answer)
+        if request_id != self.analysis_request_id:
+            return
+        if error is not None:
+            self._show_error(str(error))
+            return
+        
+        self._show_batch_answers(questions, future.result())
+        self._update_cache_status()
+    
+    def _show_batch_answers(self, questions, answers):
+        """Render each question as a heading followed by its answer"""
+        self.answer_text.delete("1.0", tk.END)
+        sections = []
+        for index, (question, answer) in enumerate(zip(questions, answers), 1):
+            heading = f"Q{index}. {question}"
+            self.answer_text.insert(tk.END, heading + "\n", "batch_question")
+            self.answer_text.insert(tk.END, (answer or "(No answer)") + "\n\n")
+            sections.append(f"{heading}\n{answer or '(No answer)'}")
+        self._set_teleprompter_text("\n\n".join(sections))
+    
+    def _submit_chat_analysis(self, question):
+        """Ask a question in the conversation about the current capture (started on first use)"""
+        if self.chat_session is None:
+            self.chat_session = self.analyzer.chat_session(self.current_image_bytes, self.current_image_mime,
+                                                           model=DEFAULT_MODEL)
+        session = self.chat_session
+        
+        self.analysis_request_id += 1
+        request_id = self.analysis_request_id
+        self.analyses_in_flight += 1
+        record = self._new_history_record(question, self.current_image, self.current_image_bytes)
+        if not session.started:
+            record['timings'].update(self._current_encode_timings())
+        
+        future = self.async_runner.submit(self._stream_chat_analysis(request_id, session, question, record))
+        future.add_done_callback(
+            lambda f: self.root.after(0, self._on_chat_done, f, request_id, session, record)
+        )
+    
+    async def _stream_chat_analysis(self, request_id, session, question, record):
+        """Coroutine that streams a conversation turn to the UI"""
+        start = time.monotonic()
+        chunks = []
+        stream = self.request_scheduler.stream(lambda: session.stream_async(question),
+                                               timeout=self.request_timeout)
+        async for chunk in stream:
+            chunks.append(chunk)
+            if len(chunks) == 1:
+                record['timings']['first_chunk_ms'] = (time.monotonic() - start) * 1000
+            self.root.after(0, self._append_answer_chunk, request_id, chunk, len(chunks) == 1,
+                            record, time.monotonic())
+        record['timings']['request_ms'] = (time.monotonic() - start) * 1000
+        return "".join(chunks)
+    
+    def _on_chat_done(self, future, request_id, session, record):
+        """Handle a finished conversation turn"""
+        self._on_analysis_done(future, request_id, record)
+        if session is self.chat_session:
+            how = "uploaded once" if session.uploaded_file is not None else "sent inline"
+            self.session_info_label.config(
+                text=f"Conversation: {session.turns} question(s), image {how}"
+            )
+    
+    def _reset_chat_session(self):
+        """End the conversation so the next question starts a new one (e.g. after a new capture)"""
+        session, self.chat_session = self.chat_session, None
+        self.session_info_label.config(text="")
+        if session is not None and session.started:
+            self.async_runner.submit(session.close_async())
     
     def toggle_monitoring(self):
         """Toggle continuous monitoring on/off"""
@@ -384,98 +1198,749 @@ class ScreenAnalysisApp:
             # Start monitoring
             self.monitoring = True
             self.monitor_btn.config(text="Stop Monitoring")
-            self.monitor_status_label.config(text="🟢 Monitoring active - analyzing every 1 minute")
+            self.monitor_status_label.config(text="🟢 Monitoring active - waiting for changes")
             self.analyze_btn.config(state="disabled")
             
-            # Do first analysis
-            self._auto_capture_and_analyze()
+            # Start change detection from a clean reference frame
+            self.change_detector.reset()
+            self.last_monitor_question = None
+            self.last_poll_signature = None
+            self.last_poll_timestamp = None
+            self.last_sent_image = None
+            self.monitor_scheduler.reset()
+            self._update_change_counter()
+            self.save_config()
+            
+            # Capture continuously in the background; ticks pick up the latest frame
+            capture = self._capture_source(mode, interactive=False)
+            if capture is not None:
+                source, _ = capture
+                future = self.capture_worker.grab_now(source)
+                self.capture_worker.set_interval(self.poll_interval)
+                
+                # Do first analysis once the first frame is in
+                future.add_done_callback(lambda f: self.root.after(0, self._auto_capture_and_analyze))
+            else:
+                self._auto_capture_and_analyze()
         else:
             # Stop monitoring
             self.monitoring = False
             if self.monitor_timer:
                 self.root.after_cancel(self.monitor_timer)
                 self.monitor_timer = None
-            self.monitor_btn.config(text="Start Monitoring (1 min)")
+            self.capture_worker.set_interval(None)
+            self.monitor_btn.config(text="Start Monitoring")
             self.monitor_status_label.config(text="")
             self.analyze_btn.config(state="normal")
     
     def _auto_capture_and_analyze(self):
-        """Automatically capture and analyze screen"""
+        """
+        Monitoring poll: compare the latest frame with the previous poll and the
+        last analyzed frame, and analyze once a change has settled
+        """
         if not self.monitoring:
             return
         
         try:
-            # Auto-capture based on current mode
-            mode = self.capture_mode.get()
-            
-            if mode == "fullscreen":
-                self.current_image = self.capturer.capture_screen()
-            elif mode == "window":
-                if sys.platform == 'win32':
-                    selected_index = self.window_combo.current()
-                    if selected_index >= 0:
-                        window_handle, window_title = self.window_list[selected_index]
-                        self.current_image = self.capturer.capture_window(window_handle)
-            elif mode == "fixed":
-                if self.fixed_region:
-                    left, top, width, height = self.fixed_region
-                    self.current_image = self.capturer.capture_region(left, top, width, height)
+            # Take the newest frame from the capture worker without blocking
+            if self.capture_worker.last_error:
+                raise self.capture_worker.last_error
+            frame = self.capture_worker.latest()
             
-            if self.current_image:
-                # Convert to base64
-                self.current_image_base64 = self.capturer.image_to_base64(self.current_image, max_size=1024)
-                
-                # Update preview
-                self.update_preview()
-                
-                # Analyze
-                question = self.question_text.get("1.0", tk.END).strip()
-                if question:
-                    # Show analyzing message with timestamp
-                    from datetime import datetime
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    self.answer_text.delete("1.0", tk.END)
-                    self.answer_text.insert("1.0", f"[{timestamp}] Analyzing... Please wait...")
-                    self.root.update()
-                    
-                    # Run analysis
-                    thread = threading.Thread(target=self._analyze_thread, args=(question,))
-                    thread.daemon = True
-                    thread.start()
+            if frame is not None and frame.timestamp != self.last_poll_timestamp:
+                self.last_poll_timestamp = frame.timestamp
+                self.metrics.observe_timings(frame.timings or {})
+                self._poll_frame(frame)
         
         except Exception as e:
             self.answer_text.delete("1.0", tk.END)
             self.answer_text.insert("1.0", f"Error during auto-capture: {str(e)}")
         
-        # Schedule next capture in 60 seconds
         if self.monitoring:
-            self.monitor_timer = self.root.after(60000, self._auto_capture_and_analyze)
+            self.monitor_timer = self.root.after(int(self.poll_interval * 1000), self._auto_capture_and_analyze)
+    
+    def _poll_frame(self, frame):
+        """Feed one polled frame to the change detector and monitor scheduler"""
+        question = self.question_text.get("1.0", tk.END).strip()
+        self.change_detector.threshold = self._get_change_threshold()
+        self._apply_monitor_timing()
+        
+        # Low-resolution signature: motion since the last poll, and change since the last analysis.
+        # An edited question always counts as a change.
+        signature = self.change_detector.signature(frame.image)
+        moving = (self.last_poll_signature is not None
+                  and self.change_detector.differs(signature, self.last_poll_signature))
+        self.last_poll_signature = signature
+        
+        # Keep changing frames (and one every 30 s otherwise) for questions about recent history
+        if moving or self.last_buffered_time is None or frame.timestamp - self.last_buffered_time >= 30:
+            self._buffer_frame(frame.timestamp, frame.image)
+        dirty = question != self.last_monitor_question or self.change_detector.is_changed(signature)
+        
+        # Back off while the API is rate limiting us
+        min_interval = self.request_scheduler.adjusted_interval(self.monitor_scheduler.min_interval)
+        now = time.monotonic()
+        fire = (self.monitor_scheduler.observe(now, moving, dirty, min_interval=min_interval)
+                and not self.analyses_in_flight and bool(question))
+        
+        # Count skips as avoided analyses, not as polls
+        if not dirty and self.monitor_scheduler.skipped(now, min_interval):
+            self.change_detector.mark_skipped()
+        self._update_change_counter()
+        self._update_monitor_status(min_interval)
+        if not fire:
+            return
+        
+        self.monitor_scheduler.fired(now)
+        self.change_detector.mark_sent(signature)
+        self._update_change_counter()
+        self.last_monitor_question = question
+        self.current_image = frame.image
+        self.current_image_bytes = None  # Set once the new frame is encoded
+        self.current_monitors = None  # Set once the monitor shots are encoded (All Monitors mode)
+        self.current_capture_timings = dict(frame.timings or {})
+        self._auto_save(frame.image)
+        
+        if self.capture_mode.get() == "monitors":
+            self._analyze_monitor_frame(frame, question)
+            return
+        
+        # Optionally send only the part of the screen that changed
+        image, prompt = self.current_image, question
+        if self.crop_changes_var.get():
+            image, prompt = self._crop_to_changes(self.current_image, question)
+        self.last_sent_image = self.current_image
+        full_frame = image is self.current_image
+        
+        # Update preview (derived from the encoded frame)
+        preview_id = self._next_preview_id()
+        if not full_frame:
+            # The crop only goes with this request; Analyze and follow-ups use the full frame
+            full_image = self.current_image
+            encode_future = self.preview_executor.submit(
+                self._encode_with_preview, full_image, self.encoding_profile_var.get()
+            )
+            encode_future.add_done_callback(
+                lambda f: self.root.after(0, self._on_capture_encoded, f, preview_id, full_image)
+            )
+        
+        # Show analyzing message with timestamp
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.answer_text.delete("1.0", tk.END)
+        self.answer_text.insert("1.0", f"[{timestamp}] Analyzing... Please wait...")
+        
+        # Run analysis (encoding happens off the UI thread)
+        self._submit_analysis(prompt, image=image, preview_id=preview_id if full_frame else None,
+                              full_frame=full_frame)
     
-    def _analyze_thread(self, question):
-        """Thread function for analysis"""
+    def _buffer_frame(self, timestamp, image):
+        """Add a frame to the rolling buffer (downscaled and compressed off the UI thread)"""
+        self.last_buffered_time = timestamp
+        future = self.preview_executor.submit(self.frame_buffer.add, timestamp, image)
+        future.add_done_callback(lambda f: self.root.after(0, self._update_buffer_status))
+    
+    def _update_buffer_status(self):
+        """Show how many frames the rolling buffer holds and its memory use"""
+        stats = self.frame_buffer.stats()
+        if not stats['frames']:
+            self.buffer_info_label.config(text="Buffer: empty")
+            return
+        minutes, seconds = divmod(int(stats['span']), 60)
+        self.buffer_info_label.config(
+            text=f"Buffer: {stats['frames']} frames over {minutes}:{seconds:02d}, "
+                 f"{stats['bytes'] / 1048576:.1f} of {stats['budget'] / 1048576:.0f} MB "
+                 f"({stats['raw_bytes'] / 1048576:.0f} MB raw)"
+        )
+    
+    def ask_recent_frames(self):
+        """Ask the question about frames from the selected time window, in one request"""
+        if not self.analyzer:
+            messagebox.showwarning("Warning", "Please initialize Gemini first.")
+            return
+        
+        question = self.question_text.get("1.0", tk.END).strip()
+        if not question:
+            messagebox.showwarning("Warning", "Please enter a question.")
+            return
+        if not len(self.frame_buffer):
+            messagebox.showwarning("Warning", "No frames buffered yet. Capture or start monitoring first.")
+            return
+        
         try:
-            response = self.analyzer.analyze_image(self.current_image_base64, question)
-            
-            # Add timestamp to response if monitoring
+            minutes = float(self.recent_minutes_var.get())
+            max_frames = max(2, int(self.recent_frames_var.get()))
+        except (tk.TclError, ValueError):
+            minutes, max_frames = 5, 6
+        start = time.time() - minutes * 60
+        
+        def load_frames():
+            from datetime import datetime
+            frames = self.frame_buffer.window(start, max_frames=max_frames)
+            if not frames:
+                raise ValueError(f"No frames were captured in the last {minutes:g} minutes")
+            first, last = (datetime.fromtimestamp(frames[i][0]).strftime("%H:%M:%S") for i in (0, -1))
+            intro = (f"The following {len(frames)} screenshots were captured between {first} and {last}, "
+                     f"oldest first.")
+            captions = [f"Screenshot at {datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')}:"
+                        for timestamp, _ in frames]
+            return intro, [(caption, image) for caption, (_, image) in zip(captions, frames)]
+        
+        self.answer_text.delete("1.0", tk.END)
+        self.answer_text.insert("1.0", "Analyzing recent frames... Please wait...")
+        self._submit_images_analysis(question, load_frames)
+    
+    def add_to_queue(self):
+        """Add the current capture to the capture queue"""
+        if self.current_image is None:
+            messagebox.showwarning("Warning", "Please capture the screen first.")
+            return
+        if len(self.capture_queue) >= MAX_QUEUED_CAPTURES:
+            messagebox.showwarning("Queue Full",
+                                   f"The queue holds at most {MAX_QUEUED_CAPTURES} captures.")
+            return
+        if self.capture_queue and self.capture_queue[-1][1] is self.current_image:
+            messagebox.showinfo("Already Queued", "This capture is already in the queue.")
+            return
+        
+        caption = self.queue_caption_var.get().strip()
+        if not caption:
+            caption = f"Capture {len(self.capture_queue) + 1} ({time.strftime('%H:%M:%S')})"
+        self.capture_queue.append((caption, self.current_image))
+        self.queue_caption_var.set("")
+        self._update_queue_status()
+    
+    def clear_queue(self):
+        """Empty the capture queue"""
+        self.capture_queue.clear()
+        self._update_queue_status()
+    
+    def _update_queue_status(self):
+        """Show the number of queued captures and their captions"""
+        if not self.capture_queue:
+            self.queue_info_label.config(text="Queue: empty")
+            return
+        captions = ", ".join(caption for caption, _ in self.capture_queue)
+        if len(captions) > 60:
+            captions = captions[:57] + "..."
+        self.queue_info_label.config(text=f"Queue: {len(self.capture_queue)} ({captions})")
+    
+    def ask_about_queue(self):
+        """Ask the question about all queued captures, in order, in one request"""
+        if not self.analyzer:
+            messagebox.showwarning("Warning", "Please initialize Gemini first.")
+            return
+        
+        question = self.question_text.get("1.0", tk.END).strip()
+        if not question:
+            messagebox.showwarning("Warning", "Please enter a question.")
+            return
+        if not self.capture_queue:
+            messagebox.showwarning("Warning", "The queue is empty. Capture the screen and click 'Add to Queue'.")
+            return
+        
+        queued = list(self.capture_queue)
+        intro = (f"The following {len(queued)} screenshots are in order; each is preceded by its caption."
+                 if len(queued) > 1 else None)
+        frames = [(f"{caption.rstrip(':')}:", image) for caption, image in queued]
+        
+        self.answer_text.delete("1.0", tk.END)
+        self.answer_text.insert("1.0", f"Analyzing {len(queued)} queued captures... Please wait...")
+        self._submit_images_analysis(question, lambda: (intro, frames))
+    
+    def _submit_images_analysis(self, question, load_frames):
+        """
+        Submit one request over several images
+        
+        Args:
+            question: Question to ask
+            load_frames: Callable run off the UI thread returning (intro text or
+                None, list of (caption, PIL Image)) in the order to send them
+        """
+        self.analysis_request_id += 1
+        request_id = self.analysis_request_id
+        self.analyses_in_flight += 1
+        record = self._new_history_record(question, None)
+        
+        coro = self._stream_images_analysis(request_id, question, load_frames,
+                                            profile=self.encoding_profile_var.get(), record=record)
+        future = self.async_runner.submit(coro)
+        future.add_done_callback(lambda f: self.root.after(0, self._on_analysis_done, f, request_id, record))
+    
+    async def _stream_images_analysis(self, request_id, question, load_frames, profile, record=None):
+        """Coroutine that encodes several frames and streams one answer about all of them"""
+        loop = asyncio.get_running_loop()
+        intro, frames = await loop.run_in_executor(None, load_frames)
+        encoded = await loop.run_in_executor(
+            None, lambda: [image_codec.encode_frame(image, profile, DEFAULT_MODEL) for _, image in frames]
+        )
+        for image in encoded:
+            self._observe_encode(image)
+        images = [(image.data, image.mime_type) for image in encoded]
+        captions = [caption for caption, _ in frames]
+        prompt = f"{intro}\n\n{question}" if intro else question
+        if record is not None:
+            record['image'] = frames[-1][1]
+            record['image_data'] = b"".join(image.data for image in encoded)
+            record['timings']['encode_ms'] = sum(image.encode_ms for image in encoded)
+            record['timings']['resize_ms'] = sum(image.resize_ms or 0 for image in encoded)
+        
+        start = time.monotonic()
+        chunks = []
+        stream = self.request_scheduler.stream(
+            lambda: self.analyzer.stream_images_async(images, prompt, captions=captions),
+            timeout=self.request_timeout
+        )
+        async for chunk in stream:
+            chunks.append(chunk)
+            if record is not None and len(chunks) == 1:
+                record['timings']['first_chunk_ms'] = (time.monotonic() - start) * 1000
+            self.root.after(0, self._append_answer_chunk, request_id, chunk, len(chunks) == 1,
+                            record, time.monotonic())
+        if record is not None:
+            record['timings']['request_ms'] = (time.monotonic() - start) * 1000
+        return "".join(chunks)
+    
+    def _crop_to_changes(self, image, question, max_area=0.6, min_size=256):
+        """
+        Crop a frame to the region that changed since the last analyzed frame
+        
+        Args:
+            image: Full frame
+            question: User question
+            max_area: Send the full frame when the change covers more than this fraction
+            min_size: Smallest crop edge, so tiny changes keep some context
+        
+        Returns:
+            Tuple of (image to send, prompt to send)
+        """
+        if self.last_sent_image is None:
+            return image, question
+        
+        box = changed_region(self.last_sent_image, image)
+        if box is None:
+            return image, question
+        
+        # Grow small boxes around their center, staying inside the frame
+        width, height = image.size
+        left, top, right, bottom = box
+        if right - left < min_size:
+            left = max(0, min(width - min_size, (left + right - min_size) // 2))
+            right = min(width, left + min_size)
+        if bottom - top < min_size:
+            top = max(0, min(height - min_size, (top + bottom - min_size) // 2))
+            bottom = min(height, top + min_size)
+        
+        if (right - left) * (bottom - top) > max_area * width * height:
+            return image, question
+        
+        prompt = (f"{question}\n\n(This image is only the part of the screen that changed: "
+                  f"a {right - left}x{bottom - top} region at ({left}, {top}) of a {width}x{height} screen.)")
+        return image.crop((left, top, right, bottom)), prompt
+    
+    def _update_monitor_status(self, min_interval):
+        """Describe what the monitoring loop is waiting for"""
+        if min_interval > self.monitor_scheduler.min_interval:
+            text = f"🟠 Rate limited - at most one analysis every {min_interval:.0f} s"
+        elif self.monitor_scheduler.pending:
+            text = "🟡 Change detected - waiting for the screen to settle"
+        else:
+            text = "🟢 Monitoring active - waiting for changes"
+        self.monitor_status_label.config(text=text)
+    
+    def _apply_monitor_timing(self):
+        """Copy the settle time and interval bounds from the UI into the monitor scheduler"""
+        scheduler = self.monitor_scheduler
+        for attr, var in (('debounce', self.debounce_var), ('min_interval', self.min_interval_var),
+                          ('max_interval', self.max_interval_var)):
+            try:
+                setattr(scheduler, attr, max(0.0, float(var.get())))
+            except (tk.TclError, ValueError):
+                pass
+        scheduler.max_interval = max(scheduler.max_interval, scheduler.min_interval)
+    
+    def _get_change_threshold(self):
+        """Read the change threshold from the UI, falling back to the current value"""
+        try:
+            return max(0.0, float(self.change_threshold_var.get()))
+        except (tk.TclError, ValueError):
+            return self.change_detector.threshold
+    
+    def _update_change_counter(self):
+        """Show how many monitoring frames were sent vs skipped"""
+        self.change_counter_label.config(
+            text=f"Sent: {self.change_detector.sent_count} | Skipped: {self.change_detector.skipped_count}"
+        )
+    
+    def _submit_analysis(self, question, image=None, preview_id=None, full_frame=True):
+        """
+        Submit a streaming analysis to the async runner
+        
+        Args:
+            question: Question to ask
+            image: PIL Image to encode off the UI thread first (default: use
+                the already encoded current image)
+            preview_id: Preview id to show a thumbnail of the encoded image under
+            full_frame: image is the whole current capture, so its encoding becomes
+                current_image_bytes (False for a crop sent with this request only)
+        """
+        # Newer requests supersede older ones still streaming
+        self.analysis_request_id += 1
+        request_id = self.analysis_request_id
+        self.analyses_in_flight += 1
+        record = self._new_history_record(question, self.current_image, self.current_image_bytes)
+        if image is None:
+            record['timings'].update(self._current_encode_timings())
+        
+        coro = self._stream_analysis(request_id, self.current_image_bytes, self.current_image_mime, question,
+                                     image=image, profile=self.encoding_profile_var.get(),
+                                     preview_id=preview_id, record=record, full_frame=full_frame)
+        future = self.async_runner.submit(coro)
+        
+        # Deliver the result back on the Tk thread
+        future.add_done_callback(lambda f: self.root.after(0, self._on_analysis_done, f, request_id, record))
+    
+    async def _stream_analysis(self, request_id, image_bytes, mime_type, question, image=None,
+                               profile=image_codec.DEFAULT_PROFILE, preview_id=None, record=None,
+                               full_frame=True):
+        """Coroutine that forwards response chunks to the UI as they arrive"""
+        if image is not None:
+            loop = asyncio.get_running_loop()
+            encoded, thumb = await loop.run_in_executor(
+                None, self._encode_with_preview, image, profile, preview_id is not None
+            )
+            image_bytes, mime_type = encoded.data, encoded.mime_type
+            if full_frame:
+                self.root.after(0, self._set_encoded_image, encoded, image)
+            if thumb is not None:
+                self.root.after(0, self._show_preview, thumb, preview_id)
+            if record is not None:
+                record['image_data'] = encoded.data
+                record['timings']['encode_ms'] = encoded.encode_ms
+                record['timings']['resize_ms'] = encoded.resize_ms
+        
+        start = time.monotonic()
+        chunks = []
+        stream = self.request_scheduler.stream(
+            lambda: self.analyzer.stream_image_data_async(image_bytes, question, mime_type=mime_type),
+            timeout=self.request_timeout
+        )
+        async for chunk in stream:
+            chunks.append(chunk)
+            if record is not None and len(chunks) == 1:
+                record['timings']['first_chunk_ms'] = (time.monotonic() - start) * 1000
+            self.root.after(0, self._append_answer_chunk, request_id, chunk, len(chunks) == 1,
+                            record, time.monotonic())
+        if record is not None:
+            record['timings']['request_ms'] = (time.monotonic() - start) * 1000
+        return "".join(chunks)
+    
+    def _set_encoded_image(self, encoded, image=None):
+        """
+        Store an encoded image and report its payload size and encode time
+        
+        image is the frame that was encoded; the result is dropped if a newer
+        capture replaced it while it was being encoded.
+        """
+        if image is not None and image is not self.current_image:
+            return
+        if encoded.data is not self.current_image_bytes:
+            self._reset_chat_session()
+        self.current_image_bytes = encoded.data
+        self.current_image_mime = encoded.mime_type
+        self.current_encode_ms = encoded.encode_ms
+        self.current_resize_ms = encoded.resize_ms
+        width, height = encoded.size
+        self.encode_info_label.config(
+            text=f"Encoded: {encoded.format} {width}x{height}, "
+                 f"{len(encoded.data) / 1024:.0f} KB in {encoded.encode_ms:.0f} ms"
+        )
+    
+    def _append_answer_chunk(self, request_id, chunk, first, record=None, arrived=None):
+        """
+        Append a streamed chunk to the answer box and teleprompter
+        
+        record and arrived (time.monotonic() when the chunk was received) time the
+        render stage: the delay until the latest chunk is on screen.
+        """
+        if request_id != self.analysis_request_id:
+            return
+        
+        if first:
+            # Replace the "Analyzing..." placeholder
+            prefix = ""
             if self.monitoring:
+                # Add timestamp to response if monitoring
                 from datetime import datetime
                 timestamp = datetime.now().strftime("%H:%M:%S")
-                response = f"[{timestamp}] {response}"
-            
-            self.root.after(0, self._update_answer, response)
+                prefix = f"[{timestamp}] "
+            self.answer_text.delete("1.0", tk.END)
+            self.answer_text.insert("1.0", prefix)
+            self._set_teleprompter_text(prefix)
+        
+        self.answer_text.insert("end-1c", chunk)
+        self._append_teleprompter_text(chunk)
+        if record is not None and arrived is not None:
+            record['timings']['render_ms'] = (time.monotonic() - arrived) * 1000
+    
+    def _on_analysis_done(self, future, request_id, record=None):
+        """Handle a completed analysis future"""
+        self.analyses_in_flight -= 1
+        error = future.exception()
+        if error is None and record is not None:
+            self._observe_analysis(record, future.result())
+            self._store_history(record, future.result())
+        if request_id != self.analysis_request_id:
+            return
+        
+        try:
+            response = future.result()
         except Exception as e:
-            self.root.after(0, self._show_error, str(e))
+            self._show_error(str(e))
+            return
+        
+        if not response:
+            self._update_answer("(No response)")
+            return
+        
+        self._update_cache_status()
+    
+    def _new_history_record(self, question, image, image_data=None):
+        """
+        Start a history record for an analysis; the coroutine fills in data and timings
+        
+        The record starts with the capture timings of the current frame so its
+        stages all describe the same pipeline run.
+        """
+        timings = dict(self.current_capture_timings) if image is not None and image is self.current_image else {}
+        return {'question': question, 'image': image, 'image_data': image_data, 'timings': timings,
+                'started': time.monotonic()}
+    
+    def _current_encode_timings(self):
+        """Encode timings of current_image_bytes, for a record that sends them"""
+        return {'encode_ms': self.current_encode_ms, 'resize_ms': self.current_resize_ms}
+    
+    def _store_history(self, record, answer):
+        """Queue a finished analysis for the history store (written off the UI thread)"""
+        if self.history is None or not answer:
+            return
+        timings = {name: round(value, 1) for name, value in record['timings'].items() if value is not None}
+        self.history.add(record['question'], answer, DEFAULT_MODEL, image_data=record['image_data'],
+                         image=record['image'], timings=timings)
+        if self._history_is_open():
+            self._schedule_history_refresh()
+    
+    def _observe_encode(self, encoded):
+        """Record the resize and encode stages and payload size of an encoded image (any thread)"""
+        self.metrics.observe('resize', encoded.resize_ms)
+        self.metrics.observe('encode', encoded.encode_ms - (encoded.resize_ms or 0))
+        self.metrics.observe_size('image', len(encoded.data))
+    
+    def _observe_analysis(self, record, answer):
+        """Record the request, generation, render and end-to-end stages of a finished analysis"""
+        timings = record['timings']
+        timings['total_ms'] = (time.monotonic() - record['started']) * 1000
+        first_chunk, request = timings.get('first_chunk_ms'), timings.get('request_ms')
+        # A non-streamed answer arrives all at once
+        self.metrics.observe('first_chunk', first_chunk if first_chunk is not None else request)
+        if first_chunk is not None and request is not None:
+            self.metrics.observe('generate', request - first_chunk)
+        self.metrics.observe('render', timings.get('render_ms'))
+        self.metrics.observe('total', timings['total_ms'])
+        self.metrics.observe_size('answer', len(answer.encode()))
+        self.metrics_label.config(text=breakdown(self._analysis_stages(timings)))
+        self._export_metrics()
+    
+    @staticmethod
+    def _analysis_stages(timings):
+        """Per-stage durations of one analysis from its record timings"""
+        first_chunk, request = timings.get('first_chunk_ms'), timings.get('request_ms')
+        encode, resize = timings.get('encode_ms'), timings.get('resize_ms')
+        return {
+            'capture': timings.get('capture_ms'),
+            'convert': timings.get('convert_ms'),
+            'resize': resize,
+            'encode': encode - (resize or 0) if encode is not None else None,
+            'first_chunk': first_chunk if first_chunk is not None else request,
+            'generate': request - first_chunk if first_chunk is not None and request is not None else None,
+            'render': timings.get('render_ms'),
+            'total': timings.get('total_ms'),
+        }
+    
+    def export_metrics(self):
+        """Choose a file the metrics are exported to (rewritten after each analysis)"""
+        path = filedialog.asksaveasfilename(
+            title="Export Metrics", defaultextension=".prom",
+            initialfile=os.path.basename(self.metrics_export_path or "answerlens_metrics.prom"),
+            filetypes=[("Prometheus text", "*.prom"), ("JSON", "*.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        self.metrics_export_path = path
+        self.last_metrics_export = 0.0
+        self.save_config()
+        self._export_metrics()
+    
+    def _export_metrics(self, min_interval=5.0):
+        """Write the metrics file off the UI thread, at most every min_interval seconds"""
+        if not self.metrics_export_path or time.monotonic() - self.last_metrics_export < min_interval:
+            return
+        self.last_metrics_export = time.monotonic()
+        self.preview_executor.submit(self._write_metrics, self.metrics_export_path)
+    
+    def _write_metrics(self, path):
+        """Write the metrics file (worker thread); failures are logged, not shown"""
+        try:
+            self.metrics.export(path)
+        except Exception as e:
+            print(f"Could not export metrics to {path}: {e}")
     
     def _update_answer(self, response):
         """Update the answer text box"""
         self.answer_text.delete("1.0", tk.END)
         self.answer_text.insert("1.0", response)
+        self._update_cache_status()
+    
+    def _apply_cache_settings(self):
+        """Turn the response cache's on-disk persistence on or off (sweeping old entries when on)"""
+        self.response_cache.set_cache_dir(CACHE_DIR if self.persist_cache_var.get() else None)
+    
+    def _update_cache_status(self):
+        """Show response cache hit rate in the status bar"""
+        cache = self.response_cache
+        lookups = cache.hits + cache.misses
+        self.status_label.config(
+            text=f"Status: Initialized | Cache: {cache.hits}/{lookups} hits ({cache.hit_rate():.0%})",
+            foreground="green"
+        )
     
     def _show_error(self, error_msg):
-        """Show error message"""
+        """Show error message (inline only while monitoring, so ticks don't stack dialogs)"""
         self.answer_text.delete("1.0", tk.END)
         self.answer_text.insert("1.0", f"Error: {error_msg}")
-        messagebox.showerror("Analysis Error", f"Failed to analyze screen:\n{error_msg}")
+        if not self.monitoring:
+            messagebox.showerror("Analysis Error", f"Failed to analyze screen:\n{error_msg}")
+    
+    def _apply_requests_per_minute(self):
+        """Push a Requests/min change into the running scheduler"""
+        self.request_scheduler.set_rate(self._get_requests_per_minute())
+    
+    def _get_requests_per_minute(self):
+        """Read the requests-per-minute limit from the UI"""
+        try:
+            return max(1, int(self.requests_per_minute_var.get()))
+        except (tk.TclError, ValueError):
+            return 10
+    
+    def open_history(self):
+        """Open or focus the history window"""
+        if self.history is None:
+            messagebox.showwarning("History", "History is not available.")
+            return
+        if self._history_is_open():
+            self.history_window.lift()
+            self.history_window.focus_force()
+            return
+        
+        self.history_window = tk.Toplevel(self.root)
+        self.history_window.title("History")
+        self.history_window.geometry("700x450")
+        
+        search_frame = ttk.Frame(self.history_window, padding=5)
+        search_frame.pack(fill=tk.X)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=5)
+        self.history_search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.history_search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind('<KeyRelease>', lambda e: self._schedule_history_refresh())
+        search_entry.focus_set()
+        self.history_count_label = ttk.Label(search_frame, text="", foreground="gray")
+        self.history_count_label.pack(side=tk.LEFT, padx=5)
+        
+        list_frame = ttk.Frame(self.history_window, padding=5)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.history_listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set, activestyle='none')
+        scrollbar.config(command=self.history_listbox.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.history_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.history_listbox.bind('<<ListboxSelect>>', self._on_history_select)
+        
+        ttk.Label(self.history_window, text="Select an entry to restore its answer (no new request is made)",
+                  foreground="gray").pack(pady=(0, 5))
+        
+        self.history_window.protocol("WM_DELETE_WINDOW", self.close_history)
+        self._refresh_history()
+    
+    def _history_is_open(self):
+        """Check whether the history window is currently shown"""
+        return bool(self.history_window and self.history_window.winfo_exists())
+    
+    def _schedule_history_refresh(self, delay=250):
+        """Refresh the history list shortly (coalesces keystrokes and batched writes)"""
+        if self.history_search_timer:
+            self.root.after_cancel(self.history_search_timer)
+        self.history_search_timer = self.root.after(delay, self._refresh_history)
+    
+    def _refresh_history(self):
+        """Reload the history list for the current search"""
+        self.history_search_timer = None
+        if not self._history_is_open():
+            return
+        
+        try:
+            self.history_entries = self.history.search(self.history_search_var.get())
+        except Exception as e:
+            self.history_count_label.config(text=f"Search error: {e}")
+            return
+        
+        from datetime import datetime
+        self.history_listbox.delete(0, tk.END)
+        for entry in self.history_entries:
+            timestamp = datetime.fromtimestamp(entry.created).strftime("%Y-%m-%d %H:%M:%S")
+            question = " ".join(entry.question.split())
+            self.history_listbox.insert(tk.END, f"{timestamp}  {question[:80]}")
+        entries, frames = self.history.count()
+        status = f"{len(self.history_entries)} shown | {entries} answers, {frames} frames"
+        if self.history.last_error:
+            status += f" | Last save failed: {self.history.last_error}"
+        self.history_count_label.config(text=status)
+    
+    def _on_history_select(self, event=None):
+        """Restore the selected history entry"""
+        selection = self.history_listbox.curselection()
+        if not selection:
+            return
+        self._restore_history_entry(self.history_entries[selection[0]])
+    
+    def _restore_history_entry(self, entry):
+        """Show a stored answer, question and thumbnail without calling the LLM"""
+        # Ignore any answer still streaming in
+        self.analysis_request_id += 1
+        
+        self.question_text.delete("1.0", tk.END)
+        self.question_text.insert("1.0", entry.question)
+        self.answer_text.delete("1.0", tk.END)
+        self.answer_text.insert("1.0", entry.answer)
+        self._set_teleprompter_text(entry.answer)
+        
+        thumbnail = self.history.thumbnail(entry.frame_hash) if entry.frame_hash else None
+        if thumbnail:
+            with Image.open(io.BytesIO(thumbnail)) as thumb:
+                self._show_preview(thumb.convert('RGB'), self._next_preview_id())
+        
+        timings = ", ".join(f"{name.replace('_ms', '')} {value:.0f} ms" for name, value in entry.timings.items())
+        self.capture_info_label.config(text=f"Restored from history ({entry.model})")
+        self.encode_info_label.config(text=timings)
+    
+    def close_history(self):
+        """Close the history window"""
+        if self.history_search_timer:
+            self.root.after_cancel(self.history_search_timer)
+            self.history_search_timer = None
+        if self.history_window:
+            self.history_window.destroy()
+            self.history_window = None
     
     def open_teleprompter(self):
         """Open or focus the teleprompter window"""
@@ -678,16 +2143,44 @@ class ScreenAnalysisApp:
         # Auto-start scrolling after 5 seconds
         self.root.after(5000, self._auto_start_teleprompter)
     
-    # Sync feature removed - teleprompter content is set once when window opens
-    # def _sync_teleprompter(self):
-    #     """Continuously sync the teleprompter with the main answer text"""
-    #     pass
+    def _teleprompter_is_open(self):
+        """Check whether the teleprompter window is currently shown"""
+        return bool(self.teleprompter_window and self.teleprompter_window.winfo_exists())
+    
+    def _set_teleprompter_text(self, text):
+        """Replace the teleprompter content (used when a new answer starts streaming)"""
+        if not self._teleprompter_is_open():
+            return
+        
+        if self.teleprompter_scroll_active:
+            self.toggle_teleprompter_scroll()
+        
+        self.teleprompter_text.delete("1.0", tk.END)
+        self.teleprompter_text.insert("1.0", text)
+        self.teleprompter_text.tag_config("highlight", background="#ffff00", foreground="#000000", font=('Arial', 24, 'normal'))
+        self.teleprompter_text.yview_moveto(0)
+        self.highlighted_word_index = None
+        self._parse_words()
+        self.teleprompter_auto_start = True
+    
+    def _append_teleprompter_text(self, chunk):
+        """Append streamed text to the teleprompter, parsing only the new tail"""
+        if not self._teleprompter_is_open():
+            return
+        
+        self.teleprompter_text.insert("end-1c", chunk)
+        self._parse_words(incremental=True)
+        
+        # Start scrolling once the first words have arrived (once per answer, so a pause sticks)
+        if self.teleprompter_auto_start and self.word_index:
+            self.teleprompter_auto_start = False
+            self._auto_start_teleprompter()
     
     def _auto_start_teleprompter(self):
         """Auto-start scrolling after delay"""
         if self.teleprompter_window and self.teleprompter_window.winfo_exists():
             # Only start if not already scrolling and we have words to highlight
-            if not self.teleprompter_scroll_active and len(self.word_positions) > 0:
+            if not self.teleprompter_scroll_active and len(self.word_index) > 0:
                 self.toggle_teleprompter_scroll()
     
     def toggle_teleprompter_scroll(self):
@@ -699,106 +2192,82 @@ class ScreenAnalysisApp:
         
         if self.teleprompter_scroll_active:
             self.scroll_toggle_btn.config(text="⏸ Pause", bg='#cc0000')
-            # Reset delay counter when starting
-            self.scroll_delay_counter = 0
-            # Start both continuous scrolling and word highlighting
-            self._continuous_scroll()
-            self._highlight_next_word()
+            # One frame clock drives both scrolling and word highlighting
+            self.teleprompter_engine.start(time.monotonic(), self.current_word_index)
+            self._teleprompter_frame()
         else:
             self.scroll_toggle_btn.config(text="▶ Play", bg='#00aa00')
-            # Cancel both timers
-            if self.teleprompter_scroll_timer:
-                self.root.after_cancel(self.teleprompter_scroll_timer)
-                self.teleprompter_scroll_timer = None
-            if self.teleprompter_word_timer:
-                self.root.after_cancel(self.teleprompter_word_timer)
-                self.teleprompter_word_timer = None
-    
-    def _continuous_scroll(self):
-        """Continuously scroll the text at a fixed smooth speed"""
-        if not self.teleprompter_scroll_active:
-            return
-        
-        if self.teleprompter_window and self.teleprompter_window.winfo_exists():
-            try:
-                # Get current scroll position
-                yview_result = self.teleprompter_text.yview()
-                if not yview_result or len(yview_result) < 2:
-                    # Invalid yview result, skip this frame
-                    self.teleprompter_scroll_timer = self.root.after(50, self._continuous_scroll)
-                    return
-                    
-                current_pos = yview_result[0]
-                
-                # Sanity check: ensure position is valid
-                if current_pos < 0 or current_pos > 1:
-                    # Invalid position, don't scroll this frame
-                    self.teleprompter_scroll_timer = self.root.after(50, self._continuous_scroll)
-                    return
-                
-                # Check if we've reached the end - just stop, don't reset
-                if current_pos >= 0.95:
-                    # Stop scrolling without resetting position
-                    self.teleprompter_scroll_active = False
-                    self.scroll_toggle_btn.config(text="▶ Play", bg='#00aa00')
-                    if self.teleprompter_scroll_timer:
-                        self.root.after_cancel(self.teleprompter_scroll_timer)
-                        self.teleprompter_scroll_timer = None
-                    if self.teleprompter_word_timer:
-                        self.root.after_cancel(self.teleprompter_word_timer)
-                        self.teleprompter_word_timer = None
-                    return
-                
-                # Delay scrolling for first 3 seconds (60 frames at 50ms) so first line completes
-                if self.scroll_delay_counter < 60:
-                    self.scroll_delay_counter += 1
-                    self.teleprompter_scroll_timer = self.root.after(50, self._continuous_scroll)
-                    return
-                
-                # Calculate scroll speed based on slider (0-10)
-                speed_value = self.scroll_speed_var.get()
-                # Slightly increased scroll speed
-                scroll_increment = 0.00009 + (speed_value * 0.0001)  # Range: 0.00009 to 0.00109
-                
-                # Scroll smoothly
-                self.teleprompter_text.yview_moveto(current_pos + scroll_increment)
-                
-                # Schedule next scroll (fixed 50ms for smooth animation)
-                self.teleprompter_scroll_timer = self.root.after(100, self._continuous_scroll)
-            except:
-                self.teleprompter_scroll_active = False
+            self._cancel_teleprompter_animation()
+    
+    def _cancel_teleprompter_animation(self):
+        """Cancel the pending animation frame"""
+        if self.teleprompter_animation_timer:
+            self.root.after_cancel(self.teleprompter_animation_timer)
+            self.teleprompter_animation_timer = None
     
-    def _highlight_next_word(self):
-        """Highlight the next word based on speed"""
+    def _teleprompter_frame(self):
+        """Advance highlighting and scrolling by the wall-clock time since the last frame"""
+        self.teleprompter_animation_timer = None
         if not self.teleprompter_scroll_active:
             return
         
         if self.teleprompter_window and self.teleprompter_window.winfo_exists():
             try:
-                # Check if we have words to highlight
-                if not self.word_positions or self.current_word_index >= len(self.word_positions):
-                    return
-                
-                # Remove previous highlight
-                self.teleprompter_text.tag_remove("highlight", "1.0", tk.END)
-                
-                # Highlight current word
-                start_pos, end_pos = self.word_positions[self.current_word_index]
-                self.teleprompter_text.tag_add("highlight", start_pos, end_pos)
-                
-                # Calculate delay based on speed slider (0-10 range)
-                speed_value = self.scroll_speed_var.get()
-                # Convert speed: higher value = faster (shorter delay)
-                # Reduced delay for faster word highlighting
-                delay = max(80, int(600 - (speed_value * 50)))
+                word_count = len(self.word_index)
+                index, pixels = self.teleprompter_engine.advance(
+                    time.monotonic(), self.scroll_speed_var.get(), self._current_word_offset(), word_count
+                )
                 
-                # Move to next word
-                self.current_word_index += 1
+                # Stop at the end of the text without resetting position,
+                # unless more of the answer is still streaming in
+                if index >= word_count:
+                    if not self.analyses_in_flight:
+                        self.toggle_teleprompter_scroll()
+                        return
+                elif index != self.highlighted_word_index:
+                    self._highlight_word(index)
+                if pixels:
+                    self.teleprompter_text.yview_scroll(pixels, 'pixels')
                 
-                # Schedule next word highlight
-                self.teleprompter_word_timer = self.root.after(delay, self._highlight_next_word)
+                self.teleprompter_animation_timer = self.root.after(FRAME_MS, self._teleprompter_frame)
             except Exception as e:
-                print(f"Word highlight error: {e}")
+                print(f"Teleprompter animation error: {e}")
+                self.teleprompter_scroll_active = False
+    
+    def _highlight_word(self, index):
+        """Move the highlight to the word at index"""
+        # Remove the previous word's highlight only
+        previous = self.highlighted_word_index
+        if previous is not None and previous < len(self.word_index):
+            self.teleprompter_text.tag_remove("highlight", *self.word_index.span(previous))
+        
+        # Highlight current word
+        start_pos, end_pos = self.word_index.span(index)
+        self.teleprompter_text.tag_add("highlight", start_pos, end_pos)
+        self.highlighted_word_index = index
+        self.current_word_index = index + 1
+    
+    def _current_word_offset(self):
+        """
+        Distance in pixels from the highlighted word to the reading line
+        
+        Returns:
+            Positive if the word is below the line, negative if above, None if no word is highlighted
+        """
+        if self.highlighted_word_index is None or self.highlighted_word_index >= len(self.word_index):
+            return None
+        
+        start_pos = self.word_index.span(self.highlighted_word_index)[0]
+        height = self.teleprompter_text.winfo_height()
+        reading_line = height * self.teleprompter_engine.reading_line
+        bbox = self.teleprompter_text.bbox(start_pos)
+        if bbox:
+            return bbox[1] - reading_line
+        
+        # Off screen: scroll at full speed if it is below the view, not at all if above
+        if self.teleprompter_text.compare(start_pos, ">", f"@0,{height}"):
+            return height
+        return -height
     
     def reset_teleprompter(self):
         """Reset teleprompter to beginning"""
@@ -810,31 +2279,29 @@ class ScreenAnalysisApp:
             # Remove all highlights
             self.teleprompter_text.tag_remove("highlight", "1.0", tk.END)
             
-            # Reset word index, scroll counter, and scroll to top
+            # Reset word index and scroll to top
             self.current_word_index = 0
-            self.scroll_delay_counter = 0
+            self.highlighted_word_index = None
             self.teleprompter_text.yview_moveto(0)
     
-    def _parse_words(self):
-        """Parse text content and store word positions for highlighting"""
-        import re
-        self.word_positions = []
-        
-        # Get all text content
-        text = self.teleprompter_text.get("1.0", tk.END)
-        
-        # Find all words with their positions
-        for match in re.finditer(r'\S+', text):
-            start_idx = match.start()
-            end_idx = match.end()
-            
-            # Convert character positions to Tkinter text indices
-            start_pos = f"1.0 + {start_idx} chars"
-            end_pos = f"1.0 + {end_idx} chars"
-            
-            self.word_positions.append((start_pos, end_pos))
+    def _parse_words(self, incremental=False):
+        """
+        Parse text content and store word positions for highlighting
+        
+        Args:
+            incremental: Only parse text appended since the last call. The last
+                known word is re-parsed since a streamed chunk may continue it.
+        """
+        if incremental:
+            line, column = self.word_index.resume_position()
+        else:
+            self.word_index.clear()
+            self.current_word_index = 0
+            line, column = 1, 0
         
-        self.current_word_index = 0
+        # Get text content from the first unparsed word onwards
+        text = self.teleprompter_text.get(f"{line}.{column}", tk.END)
+        self.word_index.add_text(text, line, column)
     
     def toggle_teleprompter_controls(self):
         """Toggle visibility of teleprompter control panel"""
@@ -864,12 +2331,7 @@ class ScreenAnalysisApp:
     def close_teleprompter(self):
         """Clean up and close teleprompter window"""
         self.teleprompter_scroll_active = False
-        if self.teleprompter_scroll_timer:
-            self.root.after_cancel(self.teleprompter_scroll_timer)
-            self.teleprompter_scroll_timer = None
-        if self.teleprompter_word_timer:
-            self.root.after_cancel(self.teleprompter_word_timer)
-            self.teleprompter_word_timer = None
+        self._cancel_teleprompter_animation()
         if self.teleprompter_window:
             self.teleprompter_window.destroy()
             self.teleprompter_window = None
@@ -877,9 +2339,30 @@ class ScreenAnalysisApp:
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="AnswerLens - AI screen analysis")
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help="Profile capture, encode, analysis and teleprompter callbacks and write "
+                             "reports to DIR (default: profiles); also enabled by ANSWERLENS_PROFILE=1")
+    args = parser.parse_args()
+    
+    profiler = Profiler.from_settings(args.profile)
+    if profiler.enabled:
+        print(f"Profiling enabled: reports every {profiler.interval:.0f} s in {profiler.directory}")
+        profiler.start()
+    
     root = tk.Tk()
-    app = ScreenAnalysisApp(root)
+    app = ScreenAnalysisApp(root, profiler)
     root.mainloop()
+    app.async_runner.stop()
+    app.capture_worker.stop()
+    app.preview_executor.shutdown(wait=False)
+    app.multi_capture.close()
+    app.screenshot_writer.close()
+    if app.metrics_export_path:
+        app._write_metrics(app.metrics_export_path)
+    if app.history is not None:
+        app.history.close()
+    profiler.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""
+Background asyncio event loop for running LLM requests
+Lets the Tk application submit coroutines without spawning a thread per request
+"""
+
+import asyncio
+import threading
+
+
+class AsyncRunner:
+    """Runs coroutines on a dedicated event loop thread with bounded concurrency"""
+    
+    def __init__(self, max_concurrency=4):
+        """
+        Initialize the runner
+        
+        Args:
+            max_concurrency: Maximum number of coroutines running at once
+        """
+        self.max_concurrency = max_concurrency
+        self.loop = None
+        self._semaphore = None
+        self._thread = None
+        self._ready = threading.Event()
+    
+    def start(self):
+        """Start the event loop thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="AsyncRunner", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+    
+    def stop(self):
+        """Stop the event loop and wait for the thread to exit"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the event loop
+        
+        Args:
+            coro: Coroutine object to run
+        
+        Returns:
+            concurrent.futures.Future resolving to the coroutine result
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._limited(coro), self.loop)
+    
+    async def _limited(self, coro):
+        """Await a coroutine while holding a concurrency slot"""
+        async with self._semaphore:
+            return await coro
+    
+    def _run_loop(self):
+        """Thread target that owns the event loop"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
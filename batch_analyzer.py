@@ -0,0 +1,208 @@
+"""
+Headless batch analysis of screenshot archives
+Encodes images in a process pool, analyzes them with bounded concurrency and
+streams results to a JSONL file that can be resumed after interruption
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from screen_analyzer import ScreenCapture
+from llm_analyzer import LLMAnalyzer, DEFAULT_MODEL
+from request_scheduler import RequestScheduler
+import image_codec
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif')
+
+
+def find_images(inputs, recursive=False):
+    """
+    Expand directories and glob patterns into a sorted list of image paths
+    
+    Args:
+        inputs: Iterable of directories, files or glob patterns
+        recursive: Walk directories recursively
+    
+    Returns:
+        List of file paths
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for dirpath, _, filenames in os.walk(item):
+                    paths.update(os.path.join(dirpath, name) for name in filenames)
+            else:
+                paths.update(os.path.join(item, name) for name in os.listdir(item))
+        else:
+            paths.update(glob.glob(item, recursive=True))
+    
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def load_completed(output_path):
+    """
+    Read an existing results file to support resuming
+    
+    Returns:
+        Set of (path, question) pairs that already have an answer
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line
+            if record.get('answer') is not None and not record.get('error'):
+                completed.add((record['path'], record['question']))
+    return completed
+
+
+def encode_file(path, max_size, profile=None, model=None):
+    """
+    Load and encode one image (runs in a worker process)
+    
+    Args:
+        path: Image file path
+        max_size: Maximum dimension when no profile is given
+        profile: Optional image_codec profile name for adaptive encoding
+        model: Model name used for the profile's token budget
+    
+    Returns:
+        Tuple of (encoded bytes, MIME type, encode milliseconds)
+    """
+    start = time.perf_counter()
+    with Image.open(path) as img:
+        if profile:
+            encoded = ScreenCapture().encode_adaptive(img, profile=profile, model=model)
+            image_bytes, mime_type = encoded.data, encoded.mime_type
+        else:
+            image_bytes, mime_type = ScreenCapture().encode_image(img.convert('RGB'), max_size=max_size)
+    return image_bytes, mime_type, (time.perf_counter() - start) * 1000
+
+
+async def run_batch(paths, question, analyzer, output_path, workers=None, concurrency=4,
+                    max_size=1024, model=None, profile=None, scheduler=None):
+    """
+    Analyze images and append one JSON record per image to output_path
+    
+    Args:
+        paths: Image paths to analyze
+        question: Question asked about every image
+        analyzer: LLMAnalyzer instance
+        output_path: JSONL results file (appended to)
+        workers: Encoder processes (default: CPU count)
+        concurrency: Maximum LLM requests in flight
+        max_size: Maximum image dimension sent to the model
+        model: Model name (default: LLMAnalyzer default)
+        profile: image_codec profile name (None for plain PNG at max_size)
+        scheduler: RequestScheduler for rate limiting and retries (default: retries only)
+    
+    Returns:
+        Tuple of (succeeded, failed) counts
+    """
+    loop = asyncio.get_running_loop()
+    scheduler = scheduler or RequestScheduler()
+    llm_slots = asyncio.Semaphore(concurrency)
+    # Bound images held in memory between encoding and upload
+    pipeline_slots = asyncio.Semaphore(concurrency * 2 + (workers or os.cpu_count() or 1))
+    counts = {'ok': 0, 'failed': 0}
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(output_path, 'a', encoding='utf-8') as out:
+        
+        async def process(path):
+            async with pipeline_slots:
+                record = {'path': path, 'question': question, 'answer': None, 'error': None}
+                try:
+                    image_bytes, mime_type, encode_ms = await loop.run_in_executor(
+                        pool, encode_file, path, max_size, profile, model or DEFAULT_MODEL
+                    )
+                    record['bytes'] = len(image_bytes)
+                    record['encode_ms'] = round(encode_ms, 1)
+                    
+                    async with llm_slots:
+                        start = time.perf_counter()
+                        record['answer'] = await scheduler.run(
+                            lambda: analyzer.analyze_image_data_async(
+                                image_bytes, question, mime_type=mime_type, model=model
+                            )
+                        )
+                        record['analyze_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                    counts['ok'] += 1
+                except Exception as e:
+                    record['error'] = str(e)
+                    counts['failed'] += 1
+                
+                # Stream results so an interrupted run can be resumed
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                done = counts['ok'] + counts['failed']
+                print(f"[{done}/{len(paths)}] {path}" + (f" - error: {record['error']}" if record['error'] else ""),
+                      file=sys.stderr)
+        
+        await asyncio.gather(*(process(path) for path in paths))
+    
+    return counts['ok'], counts['failed']
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Analyze a directory of screenshots with Google Gemini")
+    parser.add_argument('inputs', nargs='+', help="Directories, files or glob patterns")
+    parser.add_argument('-q', '--question', required=True, help="Question to ask about every image")
+    parser.add_argument('-o', '--output', default="answers.jsonl", help="JSONL results file")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Walk directories recursively")
+    parser.add_argument('--workers', type=int, default=None, help="Encoder processes (default: CPU count)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum LLM requests in flight")
+    parser.add_argument('--rpm', type=int, default=None, help="Client-side requests-per-minute limit")
+    parser.add_argument('--max-size', type=int, default=1024, help="Maximum image dimension")
+    parser.add_argument('--profile', choices=sorted(image_codec.PROFILES), default=None,
+                        help="Adaptive encoding profile (default: PNG at --max-size)")
+    parser.add_argument('--model', default=None, help="Gemini model name")
+    parser.add_argument('--api-key', default=None, help="Gemini API key (default: GEMINI_API_KEY)")
+    parser.add_argument('--no-resume', action='store_true', help="Re-analyze images already in the output file")
+    args = parser.parse_args(argv)
+    
+    paths = find_images(args.inputs, recursive=args.recursive)
+    if not args.no_resume:
+        completed = load_completed(args.output)
+        paths = [p for p in paths if (p, args.question) not in completed]
+    
+    if not paths:
+        print("Nothing to analyze.", file=sys.stderr)
+        return 0
+    
+    try:
+        analyzer = LLMAnalyzer(api_key=args.api_key)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"Analyzing {len(paths)} images...", file=sys.stderr)
+    start = time.perf_counter()
+    ok, failed = asyncio.run(run_batch(
+        paths, args.question, analyzer, args.output,
+        workers=args.workers, concurrency=args.concurrency,
+        max_size=args.max_size, model=args.model, profile=args.profile,
+        scheduler=RequestScheduler(requests_per_minute=args.rpm)
+    ))
+    print(f"Done: {ok} succeeded, {failed} failed in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
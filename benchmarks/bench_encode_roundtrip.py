@@ -0,0 +1,63 @@
+"""
+Benchmark: CPU time per request for the base64 round trip vs raw bytes
+Usage: python benchmarks/bench_encode_roundtrip.py [--runs N]
+"""
+
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from screen_analyzer import ScreenCapture  # noqa: E402
+from synthetic import make_frame  # noqa: E402
+
+
+def legacy_path(capturer, img):
+    """Old pipeline: resize + PNG + base64, then decode + Image.open + SDK re-encode"""
+    image_base64 = capturer.image_to_base64(img, max_size=1024)
+    image = Image.open(io.BytesIO(base64.b64decode(image_base64)))
+    buffered = io.BytesIO()
+    image.save(buffered, format='PNG')  # What the SDK does with a PIL part
+    return buffered.getvalue()
+
+
+def direct_path(capturer, img):
+    """New pipeline: resize + PNG, bytes passed straight through"""
+    image_bytes, _ = capturer.encode_image(img, max_size=1024)
+    return image_bytes
+
+
+def time_path(func, capturer, img, runs):
+    """Return mean CPU milliseconds per call"""
+    func(capturer, img)  # Warm up
+    start = time.process_time()
+    for _ in range(runs):
+        func(capturer, img)
+    return (time.process_time() - start) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help="Iterations per path")
+    args = parser.parse_args()
+    
+    capturer = ScreenCapture()
+    img = make_frame()
+    
+    legacy_ms = time_path(legacy_path, capturer, img, args.runs)
+    direct_ms = time_path(direct_path, capturer, img, args.runs)
+    
+    print(f"Frame: {img.size[0]}x{img.size[1]}, runs: {args.runs}")
+    print(f"base64 round trip: {legacy_ms:8.2f} ms CPU/request")
+    print(f"raw bytes:         {direct_ms:8.2f} ms CPU/request")
+    print(f"saved:             {legacy_ms - direct_ms:8.2f} ms CPU/request "
+          f"({(legacy_ms - direct_ms) / legacy_ms:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: memory use and cost of the rolling frame buffer over a long session
+Usage: python benchmarks/bench_frame_buffer.py [--frames N] [--budget-mb MB]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from PIL import ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_buffer import FrameBuffer  # noqa: E402
+from synthetic import make_frame  # noqa: E402
+
+
+def session_frames(count, size):
+    """Yield frames where a small part of the screen changes each time"""
+    base = make_frame(*size)
+    for index in range(count):
+        frame = base.copy()
+        draw = ImageDraw.Draw(frame)
+        draw.rectangle([60, 60, 900, 140], fill=(255, 255, 255))
+        draw.text((70, 80), f"Frame {index}: counter {index * 7 % 1000}", fill=(200, 0, 0))
+        yield frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300, help="Frames added")
+    parser.add_argument('--budget-mb', type=float, default=8, help="Buffer memory budget")
+    parser.add_argument('--width', type=int, default=2560)
+    parser.add_argument('--height', type=int, default=1440)
+    args = parser.parse_args()
+    
+    frames = list(session_frames(args.frames, (args.width, args.height)))
+    for delta in (False, True):
+        buffer = FrameBuffer(memory_budget=int(args.budget_mb * 1024 * 1024), max_frames=args.frames,
+                             delta=delta)
+        peak = 0
+        start = time.perf_counter()
+        for index, frame in enumerate(frames):
+            buffer.add(float(index), frame)
+            peak = max(peak, buffer.stats()['bytes'])
+        add_ms = (time.perf_counter() - start) * 1000 / len(frames)
+        
+        start = time.perf_counter()
+        window = buffer.window(0, max_frames=6)
+        window_ms = (time.perf_counter() - start) * 1000
+        
+        stats = buffer.stats()
+        print(f"delta={'on ' if delta else 'off'}: {stats['frames']:4d}/{len(frames)} frames kept, "
+              f"{stats['bytes'] / 1048576:6.2f} MB (peak {peak / 1048576:.2f}, budget {args.budget_mb:g}), "
+              f"{stats['raw_bytes'] / max(1, stats['bytes']):5.1f}x smaller than raw, "
+              f"add {add_ms:.1f} ms/frame, decode {len(window)} frames {window_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Benchmark suite for the capture -> encode -> analyze pipeline
+Runs without network access: analysis goes to a local fake Gemini server.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--runs N] [--latency S] [--jitter S] [--output FILE]
+    xvfb-run python benchmarks/bench_pipeline.py --capture screen    # real mss grabs
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/<old>.json
+
+Results are written as JSON (default: benchmarks/results/<commit>.json).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from screen_analyzer import ScreenCapture  # noqa: E402
+from llm_analyzer import LLMAnalyzer  # noqa: E402
+import image_codec  # noqa: E402
+from fake_gemini_server import FakeGeminiServer  # noqa: E402
+from synthetic import make_frame, make_photo_frame, make_raw_grab  # noqa: E402
+
+
+FRAME_SIZES = [(1280, 720), (1920, 1080), (2560, 1440), (3840, 2160)]
+QUESTION = "What do you see on this screen? Give answer in around 100 words"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize(latencies_ms, payload_bytes=None, wall_s=None):
+    """Build a result entry from per-iteration latencies"""
+    result = {
+        'runs': len(latencies_ms),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 3),
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+    }
+    total_s = wall_s if wall_s is not None else sum(latencies_ms) / 1000
+    result['throughput_per_s'] = round(len(latencies_ms) / total_s, 2) if total_s else None
+    if payload_bytes:
+        result['bytes_per_request'] = int(sum(payload_bytes) / len(payload_bytes))
+    return result
+
+
+def timed(func, runs):
+    """Run func repeatedly, returning (latencies_ms, results)"""
+    latencies, results = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        results.append(func())
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def bench_capture(mode, runs):
+    """Time screen grabs (mss under a real/Xvfb display) or Image.frombytes on synthetic grabs"""
+    if mode == 'auto':
+        mode = 'screen' if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin') else 'synthetic'
+    
+    results = {}
+    if mode == 'screen':
+        capturer = ScreenCapture()
+        latencies, images = timed(capturer.capture_screen, runs)
+        width, height = images[0].size
+        results[f'screen_{width}x{height}'] = summarize(latencies)
+        capturer.close()
+    else:
+        for size in FRAME_SIZES:
+            raw_size, raw = make_raw_grab(*size)
+            latencies, _ = timed(lambda: Image.frombytes('RGB', raw_size, raw), runs)
+            results[f'frombytes_{size[0]}x{size[1]}'] = summarize(latencies)
+    return mode, results
+
+
+def bench_encode(runs):
+    """Time encoding across frame sizes, content types and encoding profiles"""
+    capturer = ScreenCapture()
+    results = {}
+    for size in FRAME_SIZES:
+        for content, frame in (('text', make_frame(*size)), ('photo', make_photo_frame(*size))):
+            key = f'{content}_{size[0]}x{size[1]}'
+            latencies, payloads = timed(lambda: capturer.encode_image(frame, max_size=1024)[0], runs)
+            results[f'{key}_legacy_png'] = summarize(latencies, [len(p) for p in payloads])
+            for profile in image_codec.PROFILES:
+                latencies, encoded = timed(lambda: capturer.encode_adaptive(frame, profile=profile), runs)
+                entry = summarize(latencies, [len(e.data) for e in encoded])
+                entry['format'] = encoded[0].format
+                entry['size'] = list(encoded[0].size)
+                results[f'{key}_{profile}'] = entry
+    return results
+
+
+def bench_analyze(server, runs, concurrency):
+    """Time analyze_image_data sequentially and concurrently against the fake server"""
+    analyzer = LLMAnalyzer(api_key="benchmark", base_url=server.base_url)
+    image_bytes, mime_type = ScreenCapture().encode_image(make_frame(), max_size=1024)
+    results = {}
+    
+    latencies, _ = timed(lambda: analyzer.analyze_image_data(image_bytes, QUESTION, mime_type=mime_type), runs)
+    results['sequential'] = summarize(latencies, [len(image_bytes)] * runs)
+    
+    async def run_concurrent():
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                await analyzer.analyze_image_data_async(image_bytes, QUESTION, mime_type=mime_type)
+                latencies.append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(runs)))
+        return latencies, time.perf_counter() - start
+    
+    latencies, wall_s = asyncio.run(run_concurrent())
+    results[f'concurrent_{concurrency}'] = summarize(latencies, [len(image_bytes)] * runs, wall_s=wall_s)
+    
+    request_bytes = server.request_bytes[-runs:]
+    results['http_request_bytes'] = int(sum(request_bytes) / len(request_bytes))
+    return results
+
+
+def git_commit():
+    """Short hash of the current commit, or 'unknown'"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path):
+    """Print p50 changes against an earlier results file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    print(f"\nComparison with {baseline.get('commit', baseline_path)} (p50 ms):")
+    for stage, entries in current['results'].items():
+        old_entries = baseline.get('results', {}).get(stage, {})
+        for name, entry in entries.items():
+            old = old_entries.get(name)
+            if not isinstance(entry, dict) or not isinstance(old, dict):
+                continue
+            change = (entry['p50_ms'] - old['p50_ms']) / old['p50_ms'] if old['p50_ms'] else 0.0
+            print(f"  {stage}/{name:<32} {old['p50_ms']:>9.2f} -> {entry['p50_ms']:>9.2f} ({change:+.0%})")
+
+
+def print_results(results):
+    """Print a table of results"""
+    for stage, entries in results.items():
+        print(f"\n[{stage}]")
+        for name, entry in entries.items():
+            if not isinstance(entry, dict):
+                print(f"  {name:<34} {entry}")
+                continue
+            payload = f"{entry['bytes_per_request'] / 1024:8.1f} KB" if 'bytes_per_request' in entry else ""
+            print(f"  {name:<34} p50 {entry['p50_ms']:9.2f}  p95 {entry['p95_ms']:9.2f}  "
+                  f"p99 {entry['p99_ms']:9.2f} ms  {entry['throughput_per_s']:>8}/s {payload}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the capture -> encode -> analyze pipeline")
+    parser.add_argument('--runs', type=int, default=20, help="Iterations per measurement")
+    parser.add_argument('--capture', choices=['auto', 'screen', 'synthetic'], default='auto',
+                        help="Grab the real (or Xvfb) screen, or time conversion of synthetic grabs")
+    parser.add_argument('--latency', type=float, default=0.2, help="Fake server latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Fake server latency std-dev in seconds")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent requests for the async run")
+    parser.add_argument('--stages', default="capture,encode,analyze", help="Comma-separated stages to run")
+    parser.add_argument('--output', default=None, help="Results JSON path")
+    parser.add_argument('--compare', default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+    
+    stages = set(args.stages.split(','))
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': vars(args),
+        'results': {},
+    }
+    
+    if 'capture' in stages:
+        mode, report['results']['capture'] = bench_capture(args.capture, args.runs)
+        report['config']['capture'] = mode
+    if 'encode' in stages:
+        report['results']['encode'] = bench_encode(args.runs)
+    if 'analyze' in stages:
+        with FakeGeminiServer(latency=args.latency, jitter=args.jitter) as server:
+            report['results']['analyze'] = bench_analyze(server, args.runs, args.concurrency)
+    
+    print_results(report['results'])
+    
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+    
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: request strategies for several images or questions
+Each scenario runs its strategies against a local fake Gemini server on the
+same synthetic capture(s) and reports, per round, the time taken, the number
+of generate requests and the bytes sent (request bodies plus file uploads):
+  multi-image      one request per capture vs one request for all captures
+  batch-questions  one request per question vs one structured request
+  chat-session     stateless questions vs a chat session (inline / uploaded image)
+
+Usage: python benchmarks/bench_requests.py [scenario ...] [--count 4] [--latency 0.3] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from llm_analyzer import LLMAnalyzer  # noqa: E402
+import image_codec  # noqa: E402
+from fake_gemini_server import FakeGeminiServer  # noqa: E402
+from synthetic import make_frame, make_photo_frame  # noqa: E402
+
+
+QUESTIONS = [
+    "What application is open?",
+    "Summarize the visible text in one sentence.",
+    "Are there any error messages?",
+    "What should the user do next?",
+]
+
+
+def numbered_questions(count):
+    """count distinct questions (repeats get a number so answers are not cached)"""
+    return [QUESTIONS[index % len(QUESTIONS)] + f" ({index + 1})" for index in range(count)]
+
+
+def multi_image(analyzer, count):
+    """Strategies for asking one question about count captures"""
+    encoded = [image_codec.encode_frame(make_frame(1920, 1080)) for _ in range(count)]
+    images = [(image.data, image.mime_type) for image in encoded]
+    captions = [f"Capture {index + 1}:" for index in range(count)]
+    question = "What changed between these screenshots?"
+    
+    async def separate():
+        for data, mime_type in images:
+            await analyzer.analyze_image_data_async(data, question, mime_type=mime_type)
+    
+    async def batched():
+        await analyzer.analyze_images_async(images, question, captions=captions)
+    
+    return [("separate", separate), ("batched", batched)]
+
+
+def batch_questions(analyzer, count):
+    """Strategies for asking count questions about one capture"""
+    encoded = image_codec.encode_frame(make_frame(1920, 1080))
+    questions = numbered_questions(count)
+    
+    async def separate():
+        for question in questions:
+            await analyzer.analyze_image_data_async(encoded.data, question, mime_type=encoded.mime_type)
+    
+    async def batched():
+        answers = await analyzer.analyze_questions_async(encoded.data, questions, mime_type=encoded.mime_type)
+        assert len(answers) == len(questions)
+    
+    return [("separate", separate), ("batched", batched)]
+
+
+def chat_session(analyzer, count):
+    """Strategies for count follow-up questions about one capture"""
+    encoded = image_codec.encode_frame(make_photo_frame(1920, 1080))
+    questions = numbered_questions(count)
+    
+    async def stateless():
+        for question in questions:
+            await analyzer.analyze_image_data_async(encoded.data, question, mime_type=encoded.mime_type)
+    
+    def session(upload):
+        async def run():
+            chat = analyzer.chat_session(encoded.data, encoded.mime_type, upload=upload)
+            for question in questions:
+                async for _ in chat.stream_async(question):
+                    pass
+            await chat.close_async()
+        return run
+    
+    return [("stateless", stateless), ("chat inline", session(False)), ("chat uploaded", session(True))]
+
+
+SCENARIOS = {
+    'multi-image': multi_image,
+    'batch-questions': batch_questions,
+    'chat-session': chat_session,
+}
+
+
+async def measure(server, run, rounds):
+    """
+    Run one strategy rounds times
+    
+    Returns:
+        (ms, generate requests, bytes sent) per round
+    """
+    before_requests, before_uploads = len(server.request_bytes), len(server.upload_bytes)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await run()
+    elapsed_ms = (time.perf_counter() - start) * 1000 / rounds
+    requests = server.request_bytes[before_requests:]
+    sent = sum(requests) + sum(server.upload_bytes[before_uploads:])
+    return elapsed_ms, len(requests) / rounds, sent / rounds
+
+
+async def run_benchmarks(names, count, latency, rounds):
+    """Run the named scenarios on a fresh fake server and print one line per strategy"""
+    with FakeGeminiServer(latency=latency) as server:
+        analyzer = LLMAnalyzer(api_key="benchmark", base_url=server.base_url)
+        for name in names:
+            print(f"{name} ({count}):")
+            for strategy, run in SCENARIOS[name](analyzer, count):
+                elapsed_ms, requests, sent = await measure(server, run, rounds)
+                print(f"  {strategy:>14}: {elapsed_ms:8.1f} ms, {requests:.0f} request(s), "
+                      f"{sent / 1024:.0f} KB sent")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--count', type=int, default=4, help="Captures or questions per round")
+    parser.add_argument('--latency', type=float, default=0.3, help="Fake server latency per request (s)")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    
+    asyncio.run(run_benchmarks(args.scenarios or list(SCENARIOS), args.count, args.latency, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
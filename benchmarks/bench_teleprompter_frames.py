@@ -0,0 +1,79 @@
+"""
+Benchmark: teleprompter animation frame times under event-loop jitter
+Usage: xvfb-run -a python benchmarks/bench_teleprompter_frames.py [--seconds N] [--jitter-ms MS]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import ScreenAnalysisApp  # noqa: E402
+from synthetic import make_answer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0, help="Playback duration")
+    parser.add_argument('--words', type=int, default=2000, help="Answer length in words")
+    parser.add_argument('--speed', type=float, default=6, help="Speed slider value (0-10)")
+    parser.add_argument('--jitter-ms', type=float, default=20.0,
+                        help="Longest simulated UI stall injected between frames")
+    parser.add_argument('--max-stdev-ms', type=float, default=None,
+                        help="Exit with status 1 if the frame-time stdev exceeds this")
+    args = parser.parse_args()
+    
+    root = tk.Tk()
+    app = ScreenAnalysisApp(root)
+    app.answer_text.delete("1.0", tk.END)
+    app.answer_text.insert("1.0", make_answer(args.words))
+    app.open_teleprompter()
+    app.scroll_speed_var.set(args.speed)
+    app.teleprompter_engine.start_delay = 0.5
+    root.update()
+    
+    rng = random.Random(1)
+    visible = [0, 0]
+    
+    def stall():
+        """Block the event loop for a random moment, like a slow UI callback"""
+        time.sleep(rng.uniform(0, args.jitter_ms) / 1000)
+        root.after(rng.randint(10, 60), stall)
+    
+    def sample():
+        """Count frames where the highlighted word is on screen"""
+        if app.highlighted_word_index is not None:
+            start_pos = app.word_positions[app.highlighted_word_index][0]
+            visible[0] += app.teleprompter_text.bbox(start_pos) is not None
+            visible[1] += 1
+        root.after(50, sample)
+    
+    app.toggle_teleprompter_scroll()
+    if args.jitter_ms > 0:
+        root.after(10, stall)
+    root.after(50, sample)
+    root.after(int(args.seconds * 1000), root.quit)
+    root.mainloop()
+    
+    stats = app.teleprompter_engine.frame_time_stats()
+    app.async_runner.stop()
+    app.capture_worker.stop()
+    root.destroy()
+    
+    print(f"Playback: {args.seconds:.1f} s, speed {args.speed}, jitter up to {args.jitter_ms:.0f} ms")
+    print(f"Frames:   {stats['frames']} (target interval {1000 / 60:.1f} ms)")
+    print(f"Frame time: mean {stats['mean_ms']:.2f} ms, stdev {stats['stdev_ms']:.2f} ms, "
+          f"p99 {stats['p99_ms']:.2f} ms")
+    print(f"Words highlighted: {app.current_word_index}, "
+          f"highlight on screen: {visible[0] / max(1, visible[1]):.0%} of samples")
+    
+    if args.max_stdev_ms is not None and stats['stdev_ms'] > args.max_stdev_ms:
+        print(f"FAIL: frame-time stdev above {args.max_stdev_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: cost of one teleprompter highlight step vs answer length
+Usage: xvfb-run -a python benchmarks/bench_teleprompter_highlight.py [--steps N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from word_index import WordIndex  # noqa: E402
+from synthetic import make_answer  # noqa: E402
+
+
+def offset_spans(text):
+    """Old index: "1.0 + N chars" strings resolved from the top of the document"""
+    return [(f"1.0 + {m.start()} chars", f"1.0 + {m.end()} chars") for m in re.finditer(r'\S+', text)]
+
+
+def step_offsets(widget, spans, index, previous):
+    """Old step: clear the tag over the whole document, then tag the word"""
+    widget.tag_remove("highlight", "1.0", tk.END)
+    widget.tag_add("highlight", *spans[index])
+
+
+def step_indexed(widget, word_index, index, previous):
+    """New step: clear only the previous word, then tag the word"""
+    if previous is not None:
+        widget.tag_remove("highlight", *word_index.span(previous))
+    widget.tag_add("highlight", *word_index.span(index))
+
+
+def time_steps(step, widget, positions, count, steps):
+    """Mean microseconds per step over the last words of the document"""
+    widget.tag_remove("highlight", "1.0", tk.END)
+    first = max(0, count - steps)
+    previous = None
+    start = time.perf_counter()
+    for index in range(first, count):
+        step(widget, positions, index, previous)
+        previous = index
+    return (time.perf_counter() - start) * 1e6 / (count - first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=300, help="Highlight steps timed per length")
+    parser.add_argument('--lengths', type=int, nargs='+', default=[500, 2000, 8000, 32000],
+                        help="Answer lengths in words")
+    args = parser.parse_args()
+    
+    root = tk.Tk()
+    widget = tk.Text(root, wrap=tk.WORD, font=('Arial', 24))
+    widget.pack()
+    widget.tag_config("highlight", background="#ffff00")
+    
+    print(f"{'words':>8} {'parse ms':>9} {'offsets us/step':>16} {'indexed us/step':>16}")
+    for length in args.lengths:
+        text = make_answer(length)
+        widget.delete("1.0", tk.END)
+        widget.insert("1.0", text)
+        root.update()
+        
+        start = time.perf_counter()
+        word_index = WordIndex()
+        word_index.add_text(widget.get("1.0", tk.END))
+        parse_ms = (time.perf_counter() - start) * 1000
+        
+        spans = offset_spans(text)
+        old_us = time_steps(step_offsets, widget, spans, len(spans), args.steps)
+        new_us = time_steps(step_indexed, widget, word_index, len(word_index), args.steps)
+        print(f"{length:>8} {parse_ms:>9.2f} {old_us:>16.1f} {new_us:>16.1f}")
+    
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
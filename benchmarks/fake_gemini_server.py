@@ -0,0 +1,234 @@
+"""
+Local HTTP stand-in for the Gemini API
+Answers generateContent / streamGenerateContent with canned text after a
+configurable latency, so the client side can be measured without a network.
+Resumable file uploads (the Files API) are accepted and kept in memory.
+
+Usage: python benchmarks/fake_gemini_server.py [--port 8765] [--latency 0.2] [--jitter 0.05]
+Point LLMAnalyzer at it with base_url="http://127.0.0.1:8765".
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_ANSWER = ("The screen shows a text editor with several paragraphs of sample text "
+                  "arranged in light panels on a grey background.")
+
+# /v1beta/models/<model>:generateContent or :streamGenerateContent
+PATH_PATTERN = re.compile(r"^/[^/]+/models/(?P<model>[^:]+):(?P<method>generateContent|streamGenerateContent)")
+# Numbered question lines in a batch prompt ("1. What ...")
+QUESTION_PATTERN = re.compile(r"^\d+\. ", re.MULTILINE)
+
+
+class FakeGeminiServer:
+    """Threaded HTTP server emulating the Gemini generateContent endpoints"""
+    
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, jitter=0.0, answer=DEFAULT_ANSWER,
+                 stream_chunks=4):
+        """
+        Initialize the server
+        
+        Args:
+            host, port: Address to listen on (port 0 picks a free port)
+            latency: Seconds before responding (time to first token for streams)
+            jitter: Standard deviation of random extra latency in seconds
+            answer: Response text
+            stream_chunks: Number of chunks a streamed answer is split into
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.answer = answer
+        self.stream_chunks = stream_chunks
+        self.request_count = 0
+        self.request_bytes = []
+        self.contents = []  # Request bodies' "contents", for tests that inspect them
+        self.files = {}  # Uploaded files: name -> (mime type, bytes)
+        self.upload_bytes = []
+        self._uploads = {}  # Upload id -> (mime type, bytearray) while an upload is in progress
+        self._upload_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+    
+    @property
+    def base_url(self):
+        """URL to pass as LLMAnalyzer(base_url=...)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="FakeGeminiServer", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def respond_text(self, body):
+        """Build the answer for a request body (override for scripted replies)"""
+        if body.get('generationConfig', {}).get('responseMimeType') == 'application/json':
+            # Batch questions: one canned answer per numbered question in the prompt
+            prompt = " ".join(part.get('text', '') for content in body.get('contents', [])
+                              for part in content.get('parts', []))
+            count = len(QUESTION_PATTERN.findall(prompt)) or 1
+            return json.dumps({"answers": [{"index": index, "answer": self.answer}
+                                           for index in range(1, count + 1)]})
+        return self.answer
+    
+    def _delay(self):
+        """Sleep for the configured latency plus jitter"""
+        delay = self.latency
+        if self.jitter:
+            delay += random.gauss(0.0, self.jitter)
+        time.sleep(max(0.0, delay))
+    
+    def _make_handler(self):
+        """Build the request handler class bound to this server"""
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+            
+            def do_POST(self):
+                match = PATH_PATTERN.match(self.path)
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length)
+                if self.path.startswith('/upload/'):
+                    self._handle_upload(raw)
+                    return
+                if not match:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                    return
+                
+                body = json.loads(raw or b"{}")
+                with server._lock:
+                    server.request_count += 1
+                    server.request_bytes.append(length)
+                    server.contents.append(body.get('contents'))
+                
+                text = server.respond_text(body)
+                server._delay()
+                if match.group('method') == 'streamGenerateContent':
+                    self._send_stream(text)
+                else:
+                    self._send_json(200, _response_payload(text))
+            
+            def do_DELETE(self):
+                name = self.path.split('/v1beta/', 1)[-1].split('?', 1)[0]
+                with server._lock:
+                    server.files.pop(name, None)
+                self._send_json(200, {})
+            
+            def _handle_upload(self, raw):
+                """Resumable upload: a 'start' request returns an upload URL that receives the bytes"""
+                command = self.headers.get('X-Goog-Upload-Command', '')
+                if 'start' in command:
+                    with server._lock:
+                        server._upload_count += 1
+                        upload_id = str(server._upload_count)
+                        mime_type = self.headers.get('X-Goog-Upload-Header-Content-Type', 'application/octet-stream')
+                        server._uploads[upload_id] = (mime_type, bytearray())
+                    upload_url = f"{server.base_url}/upload/v1beta/files?upload_id={upload_id}"
+                    self._send_json(200, {}, headers={'X-Goog-Upload-URL': upload_url, 'X-Goog-Upload-Status': 'active'})
+                    return
+                
+                upload_id = self.path.rsplit('upload_id=', 1)[-1]
+                with server._lock:
+                    if upload_id not in server._uploads:
+                        self._send_json(404, {"error": {"code": 404, "message": "Unknown upload", "status": "NOT_FOUND"}})
+                        return
+                    mime_type, data = server._uploads[upload_id]
+                    data.extend(raw)
+                    if 'finalize' not in command:
+                        self._send_json(200, {}, headers={'X-Goog-Upload-Status': 'active'})
+                        return
+                    del server._uploads[upload_id]
+                    name = f"files/fake{upload_id}"
+                    server.files[name] = (mime_type, bytes(data))
+                    server.upload_bytes.append(len(data))
+                file_info = {"name": name, "uri": f"{server.base_url}/v1beta/{name}", "mimeType": mime_type,
+                             "sizeBytes": str(len(data)), "state": "ACTIVE"}
+                self._send_json(200, {"file": file_info}, headers={'X-Goog-Upload-Status': 'final'})
+            
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def _send_stream(self, text):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                
+                words = text.split(' ')
+                step = max(1, -(-len(words) // server.stream_chunks))
+                for i in range(0, len(words), step):
+                    piece = ' '.join(words[i:i + step]) + (' ' if i + step < len(words) else '')
+                    event = f"data: {json.dumps(_response_payload(piece))}\r\n\r\n".encode()
+                    self.wfile.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+        
+        return Handler
+
+
+def _response_payload(text):
+    """GenerateContentResponse JSON for a piece of text"""
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": len(text.split()),
+                          "totalTokenCount": len(text.split())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini API")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help="Response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latency standard deviation in seconds")
+    args = parser.parse_args()
+    
+    server = FakeGeminiServer(args.host, args.port, latency=args.latency, jitter=args.jitter)
+    print(f"Fake Gemini API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Synthetic frames and answers for benchmarks that run without a display
+"""
+
+import random
+
+from PIL import Image, ImageDraw
+
+
+ANSWER_WORDS = ("the quick brown fox jumps over the lazy dog while answer lens reads "
+                "each highlighted word aloud at a steady pace").split()
+
+
+def make_frame(width=2560, height=1440):
+    """Create a synthetic screenshot-like frame (flat panels with text)"""
+    img = Image.new('RGB', (width, height), (240, 240, 240))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, height, 120):
+        draw.rectangle([40, i + 10, width - 40, i + 100], fill=(255, 255, 255), outline=(200, 200, 200))
+        for j in range(4):
+            draw.text((60, i + 20 + j * 18), f"Line {i // 120}.{j}: The quick brown fox jumps over the lazy dog",
+                      fill=(20, 20, 20))
+    return img
+
+
+def make_photo_frame(width=2560, height=1440):
+    """Create a synthetic photographic frame (smooth gradients plus noise)"""
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    return Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+def make_raw_grab(width=2560, height=1440):
+    """Return (size, rgb bytes) shaped like an mss grab, for timing Image.frombytes"""
+    return (width, height), make_frame(width, height).tobytes()
+
+
+def make_answer(word_count, seed=0):
+    """Build a long multi-paragraph answer for the teleprompter"""
+    rng = random.Random(seed)
+    paragraphs = []
+    for start in range(0, word_count, 60):
+        paragraphs.append(" ".join(rng.choice(ANSWER_WORDS) for _ in range(min(60, word_count - start))))
+    return "\n\n".join(paragraphs)
@@ -0,0 +1,156 @@
+"""
+Background screen capture worker
+Owns its own mss handle and keeps a ring buffer of recent timestamped frames
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+from screen_analyzer import ScreenCapture
+
+
+# bounds is the (left, top, width, height) desktop area the image covers, if known;
+# timings holds the capture_ms / convert_ms of the grab
+Frame = namedtuple('Frame', ['timestamp', 'image', 'bounds', 'timings'], defaults=(None, None))
+
+
+class CaptureWorker:
+    """Captures frames on a dedicated thread so grabs never block the UI"""
+    
+    def __init__(self, interval=None, buffer_size=8):
+        """
+        Initialize the worker
+        
+        Args:
+            interval: Seconds between periodic captures (None to capture only on request)
+            buffer_size: Number of recent frames kept in the ring buffer
+        """
+        self.interval = interval
+        self.last_error = None
+        self._frames = deque(maxlen=buffer_size)
+        self._source = None
+        self._requests = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def set_source(self, source):
+        """
+        Set what to capture
+        
+        Args:
+            source: Callable taking a ScreenCapture and returning a PIL Image,
+                e.g. lambda capturer: capturer.capture_screen()
+        """
+        with self._lock:
+            self._source = source
+            self._frames.clear()
+        self._wake.set()
+    
+    def set_interval(self, interval):
+        """
+        Change the periodic capture interval
+        
+        Args:
+            interval: Seconds between captures (None to capture only on request)
+        """
+        self.interval = interval
+        if interval is not None:
+            self.start()
+        self._wake.set()
+    
+    def start(self):
+        """Start the capture thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="CaptureWorker", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the capture thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def latest(self):
+        """
+        Get the newest frame without blocking
+        
+        Returns:
+            Frame tuple, or None if nothing has been captured yet
+        """
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+    
+    def frames(self):
+        """Return a snapshot of the buffered frames, oldest first"""
+        with self._lock:
+            return list(self._frames)
+    
+    def grab_now(self, source=None):
+        """
+        Request an immediate capture
+        
+        Args:
+            source: Optional source to switch to before capturing
+        
+        Returns:
+            concurrent.futures.Future resolving to a Frame
+        """
+        future = Future()
+        with self._lock:
+            # Switch source and queue the request together so the worker wakes (and grabs) once
+            if source is not None:
+                self._source = source
+                self._frames.clear()
+            self._requests.append(future)
+        self.start()
+        self._wake.set()
+        return future
+    
+    def _grab(self, capturer, source):
+        """Capture one frame from source (on the worker thread)"""
+        capturer.last_bounds = None
+        capturer.last_timings = {}
+        return Frame(time.time(), source(capturer), capturer.last_bounds, capturer.last_timings)
+    
+    def _run(self):
+        """Thread target - the ScreenCapture (and its mss handle) lives only on this thread"""
+        capturer = ScreenCapture()
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(timeout=self.interval)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                
+                with self._lock:
+                    source = self._source
+                    requests, self._requests = self._requests, []
+                if source is None:
+                    for future in requests:
+                        future.set_exception(RuntimeError("No capture source set"))
+                    continue
+                
+                try:
+                    frame = self._grab(capturer, source)
+                except Exception as e:
+                    self.last_error = e
+                    for future in requests:
+                        future.set_exception(e)
+                    continue
+                
+                self.last_error = None
+                with self._lock:
+                    self._frames.append(frame)
+                for future in requests:
+                    future.set_result(frame)
+        finally:
+            capturer.close()
@@ -0,0 +1,171 @@
+"""
+Rolling buffer of recent frames for questions about what changed over time
+Frames are downscaled and compressed; frames between keyframes are stored as
+deltas against their keyframe, and the total size is bounded by a memory budget
+"""
+
+import threading
+import zlib
+from collections import deque
+
+from PIL import Image, ImageChops
+
+import image_codec
+
+
+class BufferedFrame:
+    """One compressed frame (a keyframe when base is None, otherwise a delta against base)"""
+    
+    __slots__ = ('timestamp', 'size', 'data', 'base', 'dependents', 'evicted')
+    
+    def __init__(self, timestamp, size, data, base=None):
+        self.timestamp = timestamp
+        self.size = size
+        self.data = data
+        self.base = base
+        self.dependents = 0
+        self.evicted = False
+
+
+class FrameBuffer:
+    """Memory-bounded rolling buffer of downscaled frames"""
+    
+    def __init__(self, max_size=768, memory_budget=64 * 1024 * 1024, max_frames=600, keyframe_interval=10,
+                 delta=True):
+        """
+        Initialize the buffer
+        
+        Args:
+            max_size: Longest edge of the stored frames
+            memory_budget: Maximum bytes of compressed frame data kept
+            max_frames: Maximum number of frames kept
+            keyframe_interval: Frames per keyframe when delta encoding
+            delta: Store frames between keyframes as deltas against the keyframe
+        """
+        self.max_size = max_size
+        self.memory_budget = memory_budget
+        self.max_frames = max_frames
+        self.keyframe_interval = keyframe_interval
+        self.delta = delta
+        self._frames = deque()
+        self._keyframe = None
+        self._keyframe_image = None
+        self._since_keyframe = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._frames)
+    
+    def add(self, timestamp, image):
+        """
+        Downscale, compress and append a frame, evicting the oldest frames as needed
+        
+        Args:
+            timestamp: Capture time (time.time())
+            image: PIL Image object
+        """
+        scale = min(1.0, self.max_size / max(image.size))
+        target_size = tuple(max(1, int(dim * scale)) for dim in image.size)
+        small = image_codec.resize_image(image, target_size)
+        if small.mode != 'RGB':
+            small = small.convert('RGB')
+        
+        with self._lock:
+            keyframe = self._keyframe
+            use_delta = (self.delta and keyframe is not None and keyframe.size == small.size
+                         and self._since_keyframe < self.keyframe_interval)
+            if use_delta:
+                delta = ImageChops.subtract_modulo(small, self._keyframe_image)
+                frame = BufferedFrame(timestamp, small.size, zlib.compress(delta.tobytes(), 1), base=keyframe)
+                keyframe.dependents += 1
+                self._since_keyframe += 1
+            else:
+                frame = BufferedFrame(timestamp, small.size, zlib.compress(small.tobytes(), 1))
+                self._keyframe = frame
+                self._keyframe_image = small
+                self._since_keyframe = 1
+            
+            self._frames.append(frame)
+            self._bytes += len(frame.data)
+            while len(self._frames) > 1 and (self._bytes > self.memory_budget
+                                             or len(self._frames) > self.max_frames):
+                self._evict_oldest()
+    
+    def clear(self):
+        """Drop all frames"""
+        with self._lock:
+            self._frames.clear()
+            self._keyframe = None
+            self._keyframe_image = None
+            self._since_keyframe = 0
+            self._bytes = 0
+    
+    def window(self, start, end=None, max_frames=6):
+        """
+        Decode frames captured within a time window
+        
+        Args:
+            start: Earliest capture time
+            end: Latest capture time (None for now)
+            max_frames: Maximum frames returned, evenly spaced and always
+                including the first and last frame of the window
+        
+        Returns:
+            List of (timestamp, PIL Image) tuples, oldest first
+        """
+        with self._lock:
+            frames = [frame for frame in self._frames
+                      if frame.timestamp >= start and (end is None or frame.timestamp <= end)]
+        if len(frames) > max_frames:
+            if max_frames <= 1:
+                frames = frames[-1:]
+            else:
+                step = (len(frames) - 1) / (max_frames - 1)
+                frames = [frames[round(index * step)] for index in range(max_frames)]
+        return [(frame.timestamp, self._decode(frame)) for frame in frames]
+    
+    def stats(self):
+        """
+        Report the buffer's size
+        
+        Returns:
+            Dict with frame and keyframe counts, stored bytes, the uncompressed
+            equivalent, the memory budget and the time span covered in seconds
+        """
+        with self._lock:
+            frames = list(self._frames)
+            stored = self._bytes
+        return {
+            'frames': len(frames),
+            'keyframes': sum(1 for frame in frames if frame.base is None),
+            'bytes': stored,
+            'raw_bytes': sum(frame.size[0] * frame.size[1] * 3 for frame in frames),
+            'budget': self.memory_budget,
+            'span': frames[-1].timestamp - frames[0].timestamp if frames else 0.0,
+        }
+    
+    def _evict_oldest(self):
+        """Remove the oldest frame (caller holds the lock)"""
+        frame = self._frames.popleft()
+        if frame.base is None:
+            # A keyframe's data stays while deltas still refer to it
+            frame.evicted = True
+            if not frame.dependents:
+                self._bytes -= len(frame.data)
+            return
+        
+        self._bytes -= len(frame.data)
+        base = frame.base
+        base.dependents -= 1
+        if base.evicted and not base.dependents:
+            self._bytes -= len(base.data)
+    
+    @staticmethod
+    def _decode(frame):
+        """Rebuild a frame's image"""
+        image = Image.frombytes('RGB', frame.size, zlib.decompress(frame.data))
+        if frame.base is None:
+            return image
+        base = Image.frombytes('RGB', frame.base.size, zlib.decompress(frame.base.data))
+        return ImageChops.add_modulo(base, image)
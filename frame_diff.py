@@ -0,0 +1,185 @@
+"""
+Frame change detection for monitoring mode
+Decides whether a newly captured frame differs enough from the last analyzed one
+to be worth sending to the LLM
+"""
+
+from collections import namedtuple
+
+from PIL import Image, ImageChops
+
+
+# Difference hash plus a reduced grayscale copy of a frame
+FrameSignature = namedtuple('FrameSignature', ['hash', 'sample'])
+
+
+def changed_region(previous, current, pixel_threshold=24, padding=24, reduce_factor=4):
+    """
+    Bounding box of the pixels that changed between two frames
+    
+    The difference is computed on box-reduced grayscale copies and mapped back
+    to full-resolution coordinates with some padding.
+    
+    Args:
+        previous: PIL Image of the earlier frame
+        current: PIL Image of the new frame
+        pixel_threshold: Per-pixel grayscale difference (0-255) that counts as a change
+        padding: Pixels added around the box on every side
+        reduce_factor: Downscale factor used for the comparison
+    
+    Returns:
+        (left, top, right, bottom) box in current's coordinates, the full frame if
+        the sizes differ, or None if nothing changed
+    """
+    width, height = current.size
+    if previous.size != current.size:
+        return (0, 0, width, height)
+    
+    factor = max(1, reduce_factor)
+    small_previous = (previous.reduce(factor) if factor > 1 else previous).convert('L')
+    small_current = (current.reduce(factor) if factor > 1 else current).convert('L')
+    
+    diff = ImageChops.difference(small_previous, small_current)
+    mask = diff.point(lambda value: 255 if value > pixel_threshold else 0)
+    box = mask.getbbox()
+    if box is None:
+        return None
+    
+    left, top, right, bottom = box
+    return (max(0, left * factor - padding), max(0, top * factor - padding),
+            min(width, right * factor + padding), min(height, bottom * factor + padding))
+
+
+class FrameChangeDetector:
+    """Compares frames by the share of pixels that changed"""
+    
+    def __init__(self, threshold=0.02, hash_size=8, sample_size=480, pixel_threshold=24):
+        """
+        Initialize the detector
+        
+        Args:
+            threshold: Share of changed pixels (0-100 %) above which a frame counts as
+                changed; on a 1080p screen a new line of text is about 0.2 % and a
+                reworded question about 0.08 %, a ticking clock under 0.01 %
+            hash_size: Width/height of the difference hash grid
+            sample_size: Approximate longest edge of the grayscale copy that is compared
+            pixel_threshold: Per-pixel grayscale difference (0-255) that counts as a change
+        """
+        self.threshold = threshold
+        self.hash_size = hash_size
+        self.sample_size = sample_size
+        self.pixel_threshold = pixel_threshold
+        self.sent_count = 0
+        self.skipped_count = 0
+        self._reference = None
+    
+    def reset(self):
+        """Forget the reference frame and clear the counters"""
+        self.sent_count = 0
+        self.skipped_count = 0
+        self._reference = None
+    
+    def signature(self, img):
+        """
+        Compute the signature used for comparisons
+        
+        The frame is box-reduced before grayscale conversion so the cost stays
+        small even for full-resolution captures, while text stays legible enough
+        for edits to show up in the pixel comparison.
+        
+        Args:
+            img: PIL Image object
+        
+        Returns:
+            FrameSignature
+        """
+        factor = max(1, max(img.size) // self.sample_size)
+        if factor > 1:
+            img = img.reduce(factor)
+        gray = img.convert('L')
+        
+        small = gray.resize((self.hash_size + 1, self.hash_size), Image.Resampling.BILINEAR)
+        pixels = small.tobytes()
+        row_width = self.hash_size + 1
+        
+        value = 0
+        for row in range(self.hash_size):
+            offset = row * row_width
+            for col in range(self.hash_size):
+                value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+        
+        return FrameSignature(value, gray)
+    
+    def dhash(self, img):
+        """
+        Compute a difference hash of an image
+        
+        Args:
+            img: PIL Image object
+        
+        Returns:
+            Integer with hash_size * hash_size bits
+        """
+        return self.signature(img).hash
+    
+    def changed_pixels(self, sample_a, sample_b):
+        """
+        Share of pixels that differ by more than pixel_threshold between two grayscale samples
+        
+        Returns:
+            Share as a percentage (0-100), 100 if the sizes differ
+        """
+        if sample_a.size != sample_b.size:
+            return 100.0
+        diff = ImageChops.difference(sample_a, sample_b)
+        changed = sum(diff.histogram()[self.pixel_threshold + 1:])
+        return changed * 100.0 / (diff.width * diff.height)
+    
+    def differs(self, signature_a, signature_b):
+        """
+        Check whether two signatures differ by more than the change threshold
+        
+        Always compares pixels: an edited line of text barely moves the hash or
+        the mean brightness, but it does change a measurable share of pixels.
+        """
+        return self.changed_pixels(signature_a.sample, signature_b.sample) > self.threshold
+    
+    def is_changed(self, signature):
+        """
+        Compare a signature with the last sent frame without updating anything
+        
+        Returns:
+            True if there is no reference frame yet or the frame differs from it
+        """
+        return self._reference is None or self.differs(signature, self._reference)
+    
+    def mark_sent(self, signature):
+        """Record a frame as analyzed; it becomes the new reference"""
+        self._reference = signature
+        self.sent_count += 1
+    
+    def mark_skipped(self):
+        """Record a frame that was not analyzed"""
+        self.skipped_count += 1
+    
+    def has_changed(self, img, force=False):
+        """
+        Check a frame against the last frame that was reported as changed
+        
+        The reference frame only advances when a change is detected, so slow drift
+        still accumulates until it crosses the threshold.
+        
+        Args:
+            img: PIL Image object
+            force: Treat the frame as changed regardless of its content
+        
+        Returns:
+            True if the frame should be analyzed, False if it can be skipped
+        """
+        signature = self.signature(img)
+        changed = force or self.is_changed(signature)
+        if changed:
+            self.mark_sent(signature)
+        else:
+            self.mark_skipped()
+        return changed
@@ -0,0 +1,223 @@
+"""
+Session history store
+Keeps every analyzed capture with its question, answer and timings in SQLite,
+with identical frames stored once and full-text search over questions and answers
+"""
+
+import hashlib
+import io
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import image_codec
+
+
+HistoryEntry = namedtuple('HistoryEntry', ['id', 'created', 'frame_hash', 'question', 'answer', 'model',
+                                           'timings'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    hash TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    thumbnail BLOB
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    frame_hash TEXT REFERENCES frames(hash),
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    model TEXT,
+    timings TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS entries_dedup ON entries(
+    COALESCE(frame_hash, ''), question, COALESCE(model, ''), answer
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries(created);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    question, answer, content='entries', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+END;
+"""
+
+# Same expressions as entries_dedup
+DEDUP_KEY = "COALESCE(frame_hash, ''), question, COALESCE(model, ''), answer"
+
+
+def content_hash(image_data):
+    """Hex SHA-256 of encoded image bytes"""
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query matching every word as a prefix
+
+    Returns:
+        Query string, or None if text has no words
+    """
+    terms = [f'"{word.replace(chr(34), chr(34) * 2)}"*' for word in text.split()]
+    return " ".join(terms) or None
+
+
+class HistoryStore:
+    """SQLite history of analyses, written in batches on a background thread"""
+
+    def __init__(self, path="answerlens_history.db", batch_size=32, thumbnail_size=(320, 240)):
+        """
+        Open (or create) the history database
+
+        Args:
+            path: SQLite database file
+            batch_size: Maximum number of records committed in one transaction
+            thumbnail_size: Bounding box of the stored JPEG thumbnails
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.thumbnail_size = thumbnail_size
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+
+        # Create the schema before the writer starts; WAL lets the UI read while it writes
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._reader.execute("PRAGMA journal_mode=WAL")
+        self._reader.executescript(SCHEMA)
+        self._reader.commit()
+
+        self._thread = threading.Thread(target=self._run, name="HistoryWriter", daemon=True)
+        self._thread.start()
+
+    def add(self, question, answer, model, image_data=None, image=None, timings=None):
+        """
+        Queue an analysis for storage (returns immediately)
+
+        Args:
+            question: Question asked
+            answer: Answer text
+            model: Model name
+            image_data: Encoded image bytes that were sent (hashed to deduplicate frames)
+            image: PIL Image for the thumbnail (only rendered for frames not stored yet)
+            timings: Dict of stage timings in milliseconds
+        """
+        self._queue.put((time.time(), question, answer, model, image_data, image, timings or {}))
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued record has been committed"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Commit pending records and stop the writer"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        with self._read_lock:
+            self._reader.close()
+
+    def search(self, text="", limit=100):
+        """
+        Find past analyses, newest first
+
+        Args:
+            text: Words that must appear in the question or answer (empty for all)
+            limit: Maximum number of entries
+
+        Returns:
+            List of HistoryEntry
+        """
+        columns = "e.id, e.created, e.frame_hash, e.question, e.answer, e.model, e.timings"
+        query = fts_query(text)
+        with self._read_lock:
+            if query:
+                rows = self._reader.execute(
+                    f"SELECT {columns} FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+                    f"WHERE entries_fts MATCH ? ORDER BY e.created DESC LIMIT ?", (query, limit)
+                ).fetchall()
+            else:
+                rows = self._reader.execute(
+                    f"SELECT {columns} FROM entries e ORDER BY e.created DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [HistoryEntry(*row[:6], json.loads(row[6]) if row[6] else {}) for row in rows]
+
+    def thumbnail(self, frame_hash):
+        """Return the JPEG thumbnail bytes stored for a frame, or None"""
+        with self._read_lock:
+            row = self._reader.execute("SELECT thumbnail FROM frames WHERE hash = ?", (frame_hash,)).fetchone()
+        return row[0] if row else None
+
+    def count(self):
+        """Return (entries, distinct frames) stored"""
+        with self._read_lock:
+            entries = self._reader.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            frames = self._reader.execute("SELECT COUNT(*) FROM frames").fetchone()[0]
+        return entries, frames
+
+    def _run(self):
+        """Writer thread: commit queued records in batches"""
+        conn = sqlite3.connect(self.path)
+        try:
+            stop = False
+            while not stop:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                records = [item for item in batch if isinstance(item, tuple)]
+                if records:
+                    try:
+                        with conn:
+                            for record in records:
+                                self._insert(conn, *record)
+                        self.last_error = None
+                    except Exception as e:
+                        self.last_error = e  # Shown by the history window; the batch is dropped
+
+                for item in batch:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        item.set()
+        finally:
+            conn.close()
+
+    def _insert(self, conn, created, question, answer, model, image_data, image, timings):
+        """Insert one record inside the writer's transaction"""
+        frame_hash = content_hash(image_data) if image_data else None
+        if frame_hash:
+            known = conn.execute("SELECT 1 FROM frames WHERE hash = ?", (frame_hash,)).fetchone()
+            if not known:
+                thumbnail, width, height = None, None, None
+                if image is not None:
+                    width, height = image.size
+                    thumbnail = self._encode_thumbnail(image)
+                conn.execute("INSERT INTO frames (hash, created, width, height, thumbnail) VALUES (?, ?, ?, ?, ?)",
+                             (frame_hash, created, width, height, thumbnail))
+
+        # The same answer to the same question about the same frame (or no frame) is stored once
+        conn.execute(
+            "INSERT INTO entries (created, frame_hash, question, answer, model, timings) VALUES (?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT({DEDUP_KEY}) DO UPDATE SET created = excluded.created",
+            (created, frame_hash, question, answer, model, json.dumps(timings))
+        )
+
+    def _encode_thumbnail(self, image):
+        """Compress a small JPEG thumbnail of an image"""
+        thumb = image_codec.make_thumbnail(image, self.thumbnail_size)
+        buffered = io.BytesIO()
+        thumb.save(buffered, format='JPEG', quality=70)
+        return buffered.getvalue()
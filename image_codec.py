@@ -0,0 +1,205 @@
+"""
+Adaptive image encoding for LLM requests
+Picks format, quality and downscale target per frame from an encoding profile
+and the model's image-token budget
+"""
+
+import io
+import math
+import time
+from collections import namedtuple
+
+from PIL import Image, features
+
+
+# Gemini bills images up to 384px (both sides) as one 258-token tile; larger
+# images are split into 768x768 tiles of 258 tokens each.
+TOKENS_PER_TILE = 258
+TILE_SIZE = 768
+SMALL_IMAGE_SIZE = 384
+
+# Image-token budget per model (tokens spent on one frame)
+IMAGE_TOKEN_BUDGETS = {
+    "gemini-3-flash-preview": 1120,
+    "gemini-2.5-flash": 1032,
+    "gemini-2.0-flash": 1032,
+}
+DEFAULT_IMAGE_TOKEN_BUDGET = 1032
+
+# Frames with at most this many distinct colors (in a small sample) are treated
+# as text/UI content and encoded losslessly
+TEXT_COLOR_LIMIT = 256
+
+EncodingProfile = namedtuple('EncodingProfile', [
+    'name',
+    'text_format',     # Format for flat text/UI frames
+    'photo_format',    # Format for photographic frames
+    'quality',         # Quality for lossy formats
+    'max_size',        # Upper bound on the longest side
+    'fast_resample',   # Use reduce() + BILINEAR instead of LANCZOS
+    'token_budget',    # Size the frame from the model's image-token budget
+])
+
+PROFILES = {
+    # Matches the original behaviour: PNG, LANCZOS, 1024px
+    'lossless': EncodingProfile('lossless', 'PNG', 'PNG', None, 1024, False, False),
+    'auto': EncodingProfile('auto', 'PNG', 'WEBP', 80, 1536, True, True),
+    'compact': EncodingProfile('compact', 'WEBP', 'JPEG', 70, 1024, True, True),
+}
+DEFAULT_PROFILE = 'auto'
+
+# image is the downscaled frame that was encoded (reused for previews)
+# encode_ms is the total time including resize_ms
+EncodedImage = namedtuple('EncodedImage', ['data', 'mime_type', 'format', 'size', 'encode_ms', 'image', 'resize_ms'],
+                          defaults=(None, None))
+
+
+def estimate_image_tokens(size):
+    """
+    Estimate the tokens Gemini charges for an image
+    
+    Args:
+        size: (width, height) in pixels
+    
+    Returns:
+        Token count
+    """
+    width, height = size
+    if width <= SMALL_IMAGE_SIZE and height <= SMALL_IMAGE_SIZE:
+        return TOKENS_PER_TILE
+    return math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE) * TOKENS_PER_TILE
+
+
+def scale_for_budget(size, token_budget):
+    """
+    Find the largest downscale factor that keeps an image within a token budget
+    
+    Args:
+        size: (width, height) in pixels
+        token_budget: Maximum image tokens
+    
+    Returns:
+        Scale factor in (0, 1]
+    """
+    width, height = size
+    max_tiles = max(1, token_budget // TOKENS_PER_TILE)
+    if estimate_image_tokens(size) <= token_budget:
+        return 1.0
+    
+    # Try every tile grid that fits the budget and keep the one allowing the largest image
+    best = SMALL_IMAGE_SIZE / max(width, height)
+    for cols in range(1, max_tiles + 1):
+        rows = max_tiles // cols
+        best = max(best, min(1.0, cols * TILE_SIZE / width, rows * TILE_SIZE / height))
+    return best
+
+
+def is_text_like(img):
+    """
+    Heuristic: screenshots of text/UI use few distinct colors, photos use many
+    
+    Args:
+        img: PIL Image object
+    
+    Returns:
+        True if the frame should be encoded losslessly
+    """
+    sample = img
+    factor = max(1, max(img.size) // 128)
+    if factor > 1:
+        sample = img.reduce(factor)
+    return sample.getcolors(maxcolors=TEXT_COLOR_LIMIT) is not None
+
+
+def resize_image(img, target_size, fast=True):
+    """
+    Downscale an image to target_size
+    
+    Args:
+        img: PIL Image object
+        target_size: (width, height)
+        fast: Use integer reduce() followed by BILINEAR instead of LANCZOS
+    
+    Returns:
+        Resized PIL Image
+    """
+    if tuple(target_size) == img.size:
+        return img
+    if not fast:
+        return img.resize(target_size, Image.Resampling.LANCZOS)
+    
+    # Box-reduce by the largest integer factor that stays above the target,
+    # then finish with a cheap bilinear pass
+    factor = min(img.size[0] // target_size[0], img.size[1] // target_size[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img.resize(target_size, Image.Resampling.BILINEAR)
+
+
+def make_thumbnail(img, max_size=(400, 300)):
+    """
+    Downscale an image to fit within max_size for on-screen previews
+    
+    Uses the same integer reduce() + BILINEAR pass as fast encoding profiles,
+    which is much cheaper than a LANCZOS thumbnail of a full-resolution frame.
+    
+    Args:
+        img: PIL Image object
+        max_size: (width, height) bounding box
+    
+    Returns:
+        RGB PIL Image no larger than max_size
+    """
+    scale = min(1.0, max_size[0] / img.size[0], max_size[1] / img.size[1])
+    target_size = tuple(max(1, int(dim * scale)) for dim in img.size)
+    thumb = resize_image(img, target_size)
+    if thumb.mode != 'RGB':
+        thumb = thumb.convert('RGB')
+    return thumb
+
+
+def encode_frame(img, profile=DEFAULT_PROFILE, model=None):
+    """
+    Encode a frame according to an encoding profile
+    
+    Args:
+        img: PIL Image object
+        profile: Profile name or EncodingProfile
+        model: Model name used to look up the image-token budget
+    
+    Returns:
+        EncodedImage with the bytes, MIME type, format, final size, encode time
+        and the part of it spent resizing
+    """
+    start = time.perf_counter()
+    if isinstance(profile, str):
+        profile = PROFILES[profile]
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    
+    # Pick the downscale target
+    scale = min(1.0, profile.max_size / max(img.size))
+    if profile.token_budget:
+        budget = IMAGE_TOKEN_BUDGETS.get(model, DEFAULT_IMAGE_TOKEN_BUDGET)
+        scale = min(scale, scale_for_budget(img.size, budget))
+    target_size = tuple(max(1, int(dim * scale)) for dim in img.size)
+    resize_start = time.perf_counter()
+    img = resize_image(img, target_size, fast=profile.fast_resample)
+    resize_ms = (time.perf_counter() - resize_start) * 1000
+    
+    # Pick the codec from the frame content
+    format = profile.text_format if is_text_like(img) else profile.photo_format
+    if format == 'WEBP' and not features.check('webp'):
+        format = 'JPEG' if profile.quality else 'PNG'
+    
+    buffered = io.BytesIO()
+    if format == 'PNG':
+        img.save(buffered, format='PNG', compress_level=6 if profile.name == 'lossless' else 3)
+    elif format == 'WEBP':
+        img.save(buffered, format='WEBP', quality=profile.quality or 80, method=4)
+    else:
+        img.save(buffered, format='JPEG', quality=profile.quality or 85, optimize=False)
+    
+    data = buffered.getvalue()
+    return EncodedImage(data, Image.MIME[format], format, img.size, (time.perf_counter() - start) * 1000, img,
+                        resize_ms)
@@ -3,22 +3,203 @@ LLM Integration for Screen Analysis using Google Gemini
 """
 
 import os
-from typing import Optional
+import io
+import json
+import asyncio
+from typing import AsyncIterator, Iterator, List, Optional, Tuple, Union
 import base64
+import hashlib
 from google import genai
+from google.genai import types
 from PIL import Image
-import io
+from response_cache import ResponseCache
+
+
+DEFAULT_MODEL = "gemini-3-flash-preview"  # Official model from docs
+
+# Structured response for several questions asked in one request
+BATCH_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        'answers': types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    'index': types.Schema(type=types.Type.INTEGER),
+                    'answer': types.Schema(type=types.Type.STRING),
+                },
+                required=['index', 'answer'],
+            ),
+        ),
+    },
+    required=['answers'],
+)
+
+
+def sniff_mime_type(image_data: bytes) -> str:
+    """Guess the MIME type of encoded image bytes from their signature"""
+    if image_data.startswith(b'\xff\xd8'):
+        return "image/jpeg"
+    if image_data[:4] == b'RIFF' and image_data[8:12] == b'WEBP':
+        return "image/webp"
+    return "image/png"
+
+
+def batch_prompt(questions: List[str]) -> str:
+    """Build the prompt asking several numbered questions at once"""
+    lines = [f"{index}. {question}" for index, question in enumerate(questions, 1)]
+    return ("Answer each of the following questions about the image separately and completely, "
+            "following any length or format instructions in the question. Return one entry per "
+            "question with its number as the index.\n\n" + "\n".join(lines))
+
+
+def parse_batch_answers(text: str, count: int) -> List[str]:
+    """
+    Split a structured batch response into per-question answers
+    
+    Args:
+        text: JSON response text ({"answers": [{"index": 1, "answer": ...}, ...]})
+        count: Number of questions asked
+    
+    Returns:
+        List of count answers in question order ("" for any the model skipped)
+    
+    Raises:
+        ValueError: If the response is not the expected JSON
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Batch response was not valid JSON: {e}") from e
+    entries = data.get('answers') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("Batch response has no answers list")
+    
+    entries = [entry for entry in entries if isinstance(entry, dict)]
+    indexes = []
+    for position, entry in enumerate(entries):
+        try:
+            indexes.append(int(entry.get('index', position + 1)))
+        except (TypeError, ValueError):
+            indexes.append(position + 1)
+    if 0 in indexes and count not in indexes:
+        indexes = [index + 1 for index in indexes]  # Numbered from 0 instead of 1
+    
+    answers = [""] * count
+    misplaced = []
+    for position, (index, entry) in enumerate(zip(indexes, entries)):
+        answer = str(entry.get('answer', "")).strip()
+        if 1 <= index <= count and not answers[index - 1]:
+            answers[index - 1] = answer
+        else:
+            misplaced.append((position, answer))
+    # An out-of-range or repeated index falls back to the entry's position if that answer is missing
+    for position, answer in misplaced:
+        if position < count and not answers[position]:
+            answers[position] = answer
+    return answers
+
+
+class ChatSession:
+    """
+    Multi-turn conversation about one image
+    
+    The image is uploaded with the Files API when possible, so the chat history
+    only carries a file reference and follow-up questions send just their text.
+    If the upload fails the image is sent inline with the first question.
+    """
+    
+    def __init__(self, client, image_data: Union[bytes, Image.Image], mime_type: str = "image/png",
+                 model: Optional[str] = None, upload: bool = True):
+        """
+        Initialize the session (nothing is sent until the first question)
+        
+        Args:
+            client: genai.Client to use
+            image_data: Encoded image bytes or a PIL Image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+            upload: Upload the image with the Files API instead of sending it inline
+        """
+        self.client = client
+        self.image_data = image_data
+        self.mime_type = mime_type
+        self.model = model or DEFAULT_MODEL
+        self.upload = upload and not isinstance(image_data, Image.Image)
+        self.turns = 0
+        self.uploaded_file = None
+        self._chat = None
+        self._image_part = None
+        self._lock = None  # Created on the event loop (asyncio.Lock binds to the current loop before 3.10)
+    
+    @property
+    def started(self):
+        """True once the image has been sent"""
+        return self._chat is not None
+    
+    async def stream_async(self, question: str) -> AsyncIterator[str]:
+        """
+        Ask a question, yielding the response as it is generated
+        
+        The first question is sent together with the image; later questions are
+        text only and see the earlier turns. Questions are answered one at a time.
+        
+        Yields:
+            Response text chunks
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._chat is None:
+                await self._start()
+            # The image goes with the first question that completes (a failed attempt is not in the history)
+            message = [self._image_part, question] if not self.turns else question
+            
+            stream = await self._chat.send_message_stream(message)
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+            self.turns += 1
+    
+    async def close_async(self):
+        """Delete the uploaded image, if any (best effort)"""
+        uploaded, self.uploaded_file = self.uploaded_file, None
+        if uploaded is None:
+            return
+        try:
+            await self.client.aio.files.delete(name=uploaded.name)
+        except Exception:
+            pass  # Uploaded files expire on their own
+    
+    async def _start(self):
+        """Upload the image (falling back to inline bytes) and open the chat"""
+        if self.upload:
+            try:
+                self.uploaded_file = await self.client.aio.files.upload(
+                    file=io.BytesIO(self.image_data),
+                    config=types.UploadFileConfig(mime_type=self.mime_type)
+                )
+                self._image_part = types.Part.from_uri(file_uri=self.uploaded_file.uri,
+                                                       mime_type=self.uploaded_file.mime_type or self.mime_type)
+            except Exception:
+                self.uploaded_file = None
+        if self._image_part is None:
+            self._image_part = LLMAnalyzer._image_part(self.image_data, self.mime_type)
+        self._chat = self.client.aio.chats.create(model=self.model)
 
 
 class LLMAnalyzer:
     """Gemini LLM integration for screen analysis"""
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache: Optional[ResponseCache] = None, base_url: Optional[str] = None):
         """
         Initialize Gemini analyzer
         
         Args:
             api_key: Gemini API key (or set GEMINI_API_KEY environment variable)
+            cache: Optional ResponseCache for repeated image/question/model requests
+            base_url: Override the API endpoint (e.g. a local stand-in for benchmarks)
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         if not self.api_key:
@@ -26,34 +207,395 @@ class LLMAnalyzer:
         
         # Set environment variable for client
         os.environ['GEMINI_API_KEY'] = self.api_key
-        self.client = genai.Client(api_key=self.api_key)
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=self.api_key, http_options=http_options)
+        self.cache = cache
     
     def analyze_image(self, image_base64: str, question: str, model: Optional[str] = None) -> str:
         """
+        Analyze a base64 encoded image using Gemini
+        
+        Compatibility wrapper around analyze_image_data; prefer passing raw bytes.
+        
+        Args:
+            image_base64: Base64 encoded image (PNG, JPEG or WebP)
+            question: Question to ask about the image
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Returns:
+            Gemini response text
+        """
+        image_data = base64.b64decode(image_base64)
+        return self.analyze_image_data(image_data, question, mime_type=sniff_mime_type(image_data), model=model)
+    
+    async def analyze_image_async(self, image_base64: str, question: str, model: Optional[str] = None) -> str:
+        """
+        Analyze a base64 encoded image using the Gemini async client
+        
+        Compatibility wrapper around analyze_image_data_async.
+        """
+        image_data = base64.b64decode(image_base64)
+        return await self.analyze_image_data_async(image_data, question, mime_type=sniff_mime_type(image_data),
+                                                   model=model)
+    
+    def analyze_image_data(self, image_data: Union[bytes, Image.Image], question: str,
+                           mime_type: str = "image/png", model: Optional[str] = None) -> str:
+        """
         Analyze an image using Gemini
         
         Args:
-            image_base64: Base64 encoded image
+            image_data: Encoded image bytes or a PIL Image
             question: Question to ask about the image
+            mime_type: MIME type of image_data when it is bytes
             model: Model to use (default: gemini-3-flash-preview for free tier)
         
         Returns:
             Gemini response text
         """
         if model is None:
-            model = "gemini-3-flash-preview"  # Official model from docs
+            model = DEFAULT_MODEL
         
-        # Convert base64 to PIL Image
-        image_data = base64.b64decode(image_base64)
-        image = Image.open(io.BytesIO(image_data))
+        # Serve repeated requests from the cache
+        cache_key, cached = self._cache_lookup(image_data, question, model)
+        if cached is not None:
+            return cached
         
-        # Generate content directly with the image
+        # Send the encoded bytes straight through as an inline image part
         response = self.client.models.generate_content(
             model=model,
-            contents=[question, image]
+            contents=[question, self._image_part(image_data, mime_type)]
+        )
+        
+        self._cache_store(cache_key, response.text)
+        return response.text
+    
+    async def analyze_image_data_async(self, image_data: Union[bytes, Image.Image], question: str,
+                                       mime_type: str = "image/png", model: Optional[str] = None) -> str:
+        """
+        Analyze an image using the Gemini async client
+        
+        Args:
+            image_data: Encoded image bytes or a PIL Image
+            question: Question to ask about the image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Returns:
+            Gemini response text
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        cache_key, cached = self._cache_lookup(image_data, question, model)
+        if cached is not None:
+            return cached
+        
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=[question, self._image_part(image_data, mime_type)]
         )
         
+        self._cache_store(cache_key, response.text)
         return response.text
+    
+    def stream_image_data(self, image_data: Union[bytes, Image.Image], question: str,
+                          mime_type: str = "image/png", model: Optional[str] = None) -> Iterator[str]:
+        """
+        Analyze an image using Gemini, yielding the response as it is generated
+        
+        Args:
+            image_data: Encoded image bytes or a PIL Image
+            question: Question to ask about the image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Yields:
+            Response text chunks (a cached response is yielded as one chunk)
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        cache_key, cached = self._cache_lookup(image_data, question, model)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        for chunk in self.client.models.generate_content_stream(
+            model=model,
+            contents=[question, self._image_part(image_data, mime_type)]
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        
+        self._cache_store(cache_key, "".join(chunks))
+    
+    async def stream_image_data_async(self, image_data: Union[bytes, Image.Image], question: str,
+                                      mime_type: str = "image/png",
+                                      model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Analyze an image using the Gemini async client, yielding the response as it is generated
+        
+        Args:
+            image_data: Encoded image bytes or a PIL Image
+            question: Question to ask about the image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Yields:
+            Response text chunks (a cached response is yielded as one chunk)
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        cache_key, cached = self._cache_lookup(image_data, question, model)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model,
+            contents=[question, self._image_part(image_data, mime_type)]
+        )
+        async for chunk in stream:
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        
+        self._cache_store(cache_key, "".join(chunks))
+    
+    def analyze_images(self, images: List[Tuple[bytes, str]], question: str,
+                       captions: Optional[List[str]] = None, model: Optional[str] = None) -> str:
+        """
+        Analyze several images in one request
+        
+        Args:
+            images: Ordered list of (encoded bytes, MIME type) tuples
+            question: Question to ask about the images
+            captions: Optional text placed before each image (e.g. "Page 2:")
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Returns:
+            Gemini response text
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        cache_key, cached = self._cache_lookup(self._images_key_data(images, captions), question, model)
+        if cached is not None:
+            return cached
+        
+        response = self.client.models.generate_content(
+            model=model,
+            contents=self._images_contents(images, question, captions)
+        )
+        
+        self._cache_store(cache_key, response.text)
+        return response.text
+    
+    async def analyze_images_async(self, images: List[Tuple[bytes, str]], question: str,
+                                   captions: Optional[List[str]] = None, model: Optional[str] = None) -> str:
+        """
+        Analyze several images in one request using the Gemini async client
+        
+        Args:
+            images: Ordered list of (encoded bytes, MIME type) tuples
+            question: Question to ask about the images
+            captions: Optional text placed before each image (e.g. "Page 2:")
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Returns:
+            Gemini response text
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        cache_key, cached = self._cache_lookup(self._images_key_data(images, captions), question, model)
+        if cached is not None:
+            return cached
+        
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=self._images_contents(images, question, captions)
+        )
+        
+        self._cache_store(cache_key, response.text)
+        return response.text
+    
+    def analyze_questions(self, image_data: Union[bytes, Image.Image], questions: List[str],
+                          mime_type: str = "image/png", model: Optional[str] = None) -> List[str]:
+        """
+        Ask several questions about one image in a single request
+        
+        The image is uploaded once and the model returns a JSON object with one
+        answer per question.
+        
+        Args:
+            image_data: Encoded image bytes or a PIL Image
+            questions: Questions to ask about the image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Returns:
+            List of answers in the same order as questions
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        prompt = batch_prompt(questions)
+        cache_key, cached = self._cache_lookup(image_data, prompt, model)
+        if cached is not None:
+            return parse_batch_answers(cached, len(questions))
+        
+        response = self.client.models.generate_content(
+            model=model,
+            contents=[prompt, self._image_part(image_data, mime_type)],
+            config=self._batch_config()
+        )
+        
+        answers = parse_batch_answers(response.text, len(questions))
+        self._cache_store(cache_key, response.text)
+        return answers
+    
+    async def analyze_questions_async(self, image_data: Union[bytes, Image.Image], questions: List[str],
+                                      mime_type: str = "image/png", model: Optional[str] = None) -> List[str]:
+        """
+        Ask several questions about one image in a single request using the Gemini async client
+        
+        Args:
+            image_data: Encoded image bytes or a PIL Image
+            questions: Questions to ask about the image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Returns:
+            List of answers in the same order as questions
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        prompt = batch_prompt(questions)
+        cache_key, cached = self._cache_lookup(image_data, prompt, model)
+        if cached is not None:
+            return parse_batch_answers(cached, len(questions))
+        
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=[prompt, self._image_part(image_data, mime_type)],
+            config=self._batch_config()
+        )
+        
+        answers = parse_batch_answers(response.text, len(questions))
+        self._cache_store(cache_key, response.text)
+        return answers
+    
+    def chat_session(self, image_data: Union[bytes, Image.Image], mime_type: str = "image/png",
+                     model: Optional[str] = None, upload: bool = True) -> ChatSession:
+        """
+        Start a conversation about one image for cheap follow-up questions
+        
+        Args:
+            image_data: Encoded image bytes or a PIL Image
+            mime_type: MIME type of image_data when it is bytes
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+            upload: Upload the image once with the Files API (inline if False or on failure)
+        
+        Returns:
+            ChatSession (answers depend on the conversation, so they are not cached)
+        """
+        return ChatSession(self.client, image_data, mime_type=mime_type, model=model, upload=upload)
+    
+    async def stream_images_async(self, images: List[Tuple[bytes, str]], question: str,
+                                  captions: Optional[List[str]] = None,
+                                  model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Analyze several images in one request, yielding the response as it is generated
+        
+        Args:
+            images: Ordered list of (encoded bytes, MIME type) tuples
+            question: Question to ask about the images
+            captions: Optional text placed before each image (e.g. "Monitor 2:")
+            model: Model to use (default: gemini-3-flash-preview for free tier)
+        
+        Yields:
+            Response text chunks (a cached response is yielded as one chunk)
+        """
+        if model is None:
+            model = DEFAULT_MODEL
+        
+        cache_key, cached = self._cache_lookup(self._images_key_data(images, captions), question, model)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model,
+            contents=self._images_contents(images, question, captions)
+        )
+        async for chunk in stream:
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        
+        self._cache_store(cache_key, "".join(chunks))
+    
+    @staticmethod
+    def _batch_config():
+        """Request config for a JSON response holding one answer per question"""
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=BATCH_RESPONSE_SCHEMA
+        )
+    
+    def _images_contents(self, images, question, captions):
+        """Build request contents: the question, then each caption followed by its image"""
+        contents = [question]
+        for index, (image_data, mime_type) in enumerate(images):
+            if captions and captions[index]:
+                contents.append(captions[index])
+            contents.append(self._image_part(image_data, mime_type))
+        return contents
+    
+    @staticmethod
+    def _images_key_data(images, captions):
+        """Combine several images and their captions into one value for the cache key"""
+        if captions is not None and len(captions) != len(images):
+            raise ValueError(f"Got {len(captions)} captions for {len(images)} images")
+        digest = hashlib.sha256()
+        for index, (image_data, _) in enumerate(images):
+            digest.update(hashlib.sha256(image_data).digest())
+            digest.update((captions[index] if captions else "").encode())
+            digest.update(b"\0")
+        return digest.digest()
+    
+    @staticmethod
+    def _image_part(image_data, mime_type):
+        """Build a request part from encoded bytes (PIL Images are passed through to the SDK)"""
+        if isinstance(image_data, Image.Image):
+            return image_data
+        return types.Part.from_bytes(data=image_data, mime_type=mime_type)
+    
+    def _cache_lookup(self, image_data, question, model):
+        """
+        Look up a request in the response cache
+        
+        Returns:
+            Tuple of (cache_key, cached_text); both None when caching is disabled
+        """
+        if self.cache is None:
+            return None, None
+        if isinstance(image_data, Image.Image):
+            image_data = f"{image_data.mode}{image_data.size}".encode() + image_data.tobytes()
+        cache_key = ResponseCache.make_key(image_data, question, model)
+        return cache_key, self.cache.get(cache_key)
+    
+    def _cache_store(self, cache_key, text):
+        """Store a response in the cache if caching is enabled"""
+        if cache_key is not None and text:
+            self.cache.put(cache_key, text)
 
 
 if __name__ == "__main__":
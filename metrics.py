@@ -0,0 +1,212 @@
+"""
+Lightweight pipeline instrumentation
+Per-stage timings and payload sizes are kept in rolling histograms that can be
+shown in the UI and exported as JSON or Prometheus text for dashboards
+"""
+
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Pipeline stages in display order (timings are recorded in milliseconds)
+STAGES = ('capture', 'convert', 'resize', 'encode', 'first_chunk', 'generate', 'render', 'total')
+
+DURATION_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Cumulative bucket counts since start plus a rolling window of recent samples"""
+    
+    def __init__(self, buckets, window=500):
+        """
+        Initialize the histogram
+        
+        Args:
+            buckets: Ascending bucket upper bounds
+            window: Number of recent samples kept for percentiles
+        """
+        self.buckets = tuple(buckets)
+        self.window = window
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.last = None
+        self._recent = [0.0] * window
+        self._next = 0
+    
+    def observe(self, value):
+        """Record one sample"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.last = value
+        self._recent[self._next % self.window] = value
+        self._next += 1
+    
+    def recent(self):
+        """Samples in the rolling window (unordered)"""
+        return self._recent[:min(self._next, self.window)]
+    
+    def summary(self):
+        """
+        Summarize the histogram
+        
+        Returns:
+            Dict with the total count and sum, the last sample, and the mean,
+            p50, p95, p99 and max over the rolling window
+        """
+        recent = sorted(self.recent())
+        result = {'count': self.count, 'sum': round(self.sum, 3), 'last': self.last}
+        if recent:
+            result.update({
+                'mean': round(sum(recent) / len(recent), 3),
+                'p50': percentile(recent, 50),
+                'p95': percentile(recent, 95),
+                'p99': percentile(recent, 99),
+                'max': recent[-1],
+            })
+        return result
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted list"""
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def breakdown(stages):
+    """
+    One-line summary of the stage durations of a single pipeline run
+    
+    Args:
+        stages: Dict of stage name -> milliseconds (None for stages the run skipped)
+    """
+    ordered = [stage for stage in STAGES if stage in stages]
+    ordered += sorted(stage for stage in stages if stage not in STAGES)
+    parts = [f"{stage.replace('_', ' ')} {stages[stage]:.0f}" for stage in ordered if stages[stage] is not None]
+    return " · ".join(parts) + " ms" if parts else ""
+
+
+class Metrics:
+    """Thread-safe registry of stage durations and payload sizes"""
+    
+    def __init__(self, window=500):
+        """
+        Initialize the registry
+        
+        Args:
+            window: Recent samples kept per histogram for percentiles
+        """
+        self.window = window
+        self.started = time.time()
+        self._durations = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage, ms):
+        """Record a stage duration in milliseconds (None is ignored)"""
+        if ms is None:
+            return
+        with self._lock:
+            histogram = self._durations.get(stage)
+            if histogram is None:
+                histogram = self._durations[stage] = Histogram(DURATION_BUCKETS_MS, self.window)
+            histogram.observe(max(0.0, ms))
+    
+    def observe_size(self, name, size):
+        """Record a payload size (bytes or characters)"""
+        with self._lock:
+            histogram = self._sizes.get(name)
+            if histogram is None:
+                histogram = self._sizes[name] = Histogram(SIZE_BUCKETS, self.window)
+            histogram.observe(size)
+    
+    def observe_timings(self, timings):
+        """Record a dict of '<stage>_ms' timings"""
+        for name, ms in timings.items():
+            if name.endswith('_ms'):
+                self.observe(name[:-3], ms)
+    
+    @contextmanager
+    def timer(self, stage):
+        """Context manager recording the duration of its block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+    
+    def last(self):
+        """Most recent duration of each stage, in STAGES order then any others"""
+        with self._lock:
+            last = {stage: histogram.last for stage, histogram in self._durations.items()}
+        ordered = [stage for stage in STAGES if stage in last]
+        ordered += sorted(stage for stage in last if stage not in STAGES)
+        return {stage: last[stage] for stage in ordered}
+    
+    def snapshot(self):
+        """
+        Summaries of every histogram
+        
+        Returns:
+            Dict with 'durations_ms' and 'sizes' mapping names to Histogram.summary()
+        """
+        with self._lock:
+            return {
+                'started': self.started,
+                'exported': time.time(),
+                'durations_ms': {stage: histogram.summary() for stage, histogram in self._durations.items()},
+                'sizes': {name: histogram.summary() for name, histogram in self._sizes.items()},
+            }
+    
+    def to_prometheus(self, prefix="answerlens"):
+        """Render the histograms in the Prometheus text exposition format (durations in seconds)"""
+        lines = []
+        with self._lock:
+            families = (
+                (f"{prefix}_stage_duration_seconds", "Pipeline stage duration", 'stage',
+                 self._durations, 1000.0),
+                (f"{prefix}_payload_size", "Request and response payload size (bytes or characters)", 'kind',
+                 self._sizes, 1.0),
+            )
+            for metric, help_text, label, histograms, divisor in families:
+                if not histograms:
+                    continue
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for name in sorted(histograms):
+                    histogram = histograms[name]
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else f"{bound / divisor:g}"
+                        lines.append(f'{metric}_bucket{{{label}="{name}",le="{le}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.sum / divisor:g}')
+                    lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+    
+    def export(self, path):
+        """
+        Write the metrics to a file, replacing it atomically
+        
+        Args:
+            path: Destination; '.json' files get snapshot() as JSON, anything
+                else gets Prometheus text (e.g. for a node_exporter textfile collector)
+        """
+        if path.lower().endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
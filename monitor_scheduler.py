@@ -0,0 +1,87 @@
+"""
+Change-driven scheduling for monitoring mode
+Fires an analysis once the screen has changed and then settled, within
+configurable minimum and maximum interval bounds
+"""
+
+
+class MonitorScheduler:
+    """Debounces screen changes into analysis triggers"""
+    
+    def __init__(self, debounce=1.5, min_interval=5.0, max_interval=120.0):
+        """
+        Initialize the scheduler
+        
+        Args:
+            debounce: Seconds the screen must stay still after a change before analyzing
+            min_interval: Minimum seconds between analyses
+            max_interval: Seconds after which a pending change is analyzed even if the
+                screen never settles (None to always wait for it to settle)
+        """
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.reset()
+    
+    def reset(self):
+        """Forget all timing state"""
+        self.last_fire = None
+        self.last_skip = None
+        self.last_motion = None
+        self.pending_since = None
+    
+    @property
+    def pending(self):
+        """True while a change is waiting to be analyzed"""
+        return self.pending_since is not None
+    
+    def observe(self, now, moving, dirty, min_interval=None):
+        """
+        Feed one poll result and decide whether to analyze now
+        
+        Args:
+            now: Current time in seconds (time.monotonic())
+            moving: The screen changed since the previous poll
+            dirty: The screen differs from the last analyzed frame
+            min_interval: Override for the minimum interval (e.g. stretched while rate limited)
+        
+        Returns:
+            True if an analysis should be triggered
+        """
+        if moving:
+            self.last_motion = now
+        if not dirty:
+            self.pending_since = None
+            return False
+        if self.pending_since is None:
+            self.pending_since = now
+        
+        min_interval = self.min_interval if min_interval is None else min_interval
+        if self.last_fire is not None and now - self.last_fire < min_interval:
+            return False
+        
+        settled = self.last_motion is None or now - self.last_motion >= self.debounce
+        overdue = self.max_interval is not None and now - self.pending_since >= self.max_interval
+        return settled or overdue
+    
+    def skipped(self, now, min_interval=None):
+        """
+        Record a poll where the screen had not changed since the last analysis
+        
+        Only polls where a fixed-interval monitor would have analyzed count, i.e.
+        at most one per minimum interval since the last analysis or counted skip.
+        
+        Returns:
+            True if the poll stands for an avoided analysis
+        """
+        min_interval = self.min_interval if min_interval is None else min_interval
+        since = max((t for t in (self.last_fire, self.last_skip) if t is not None), default=None)
+        if since is not None and now - since < min_interval:
+            return False
+        self.last_skip = now
+        return True
+    
+    def fired(self, now):
+        """Record that an analysis was triggered"""
+        self.last_fire = now
+        self.pending_since = None
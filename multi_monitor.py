@@ -0,0 +1,155 @@
+"""
+Multi-monitor capture and encoding
+Grabs several monitors concurrently (one mss handle per worker thread) and
+encodes them in parallel
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import image_codec
+from screen_analyzer import ScreenCapture
+
+
+# One monitor's image and the desktop area (left, top, width, height) it covers
+MonitorShot = namedtuple('MonitorShot', ['number', 'bounds', 'image', 'capture_ms'])
+
+
+def parse_monitor_selection(text, monitor_count):
+    """
+    Parse a monitor selection such as "all" or "1, 3"
+    
+    Args:
+        text: Selection text ("all" or empty selects every monitor)
+        monitor_count: Number of monitors available
+    
+    Returns:
+        Sorted list of monitor numbers (1-based)
+    
+    Raises:
+        ValueError: If the text names an unknown monitor
+    """
+    text = text.strip().lower()
+    if text in ("", "all"):
+        return list(range(1, monitor_count + 1))
+    
+    numbers = set()
+    for item in text.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        number = int(item)
+        if not 1 <= number <= monitor_count:
+            raise ValueError(f"Monitor {number} does not exist (found {monitor_count})")
+        numbers.add(number)
+    if not numbers:
+        raise ValueError("No monitors selected")
+    return sorted(numbers)
+
+
+def split_frame(image, frame_bounds, monitors):
+    """
+    Cut a virtual-desktop frame into per-monitor images
+    
+    Args:
+        image: PIL Image covering frame_bounds
+        frame_bounds: (left, top, width, height) of the frame on the desktop
+        monitors: List of (monitor_number, bounds) tuples to extract
+    
+    Returns:
+        List of MonitorShot (monitors outside the frame are skipped)
+    """
+    frame_left, frame_top = frame_bounds[:2]
+    shots = []
+    for number, bounds in monitors:
+        left, top, width, height = bounds
+        box = (left - frame_left, top - frame_top, left - frame_left + width, top - frame_top + height)
+        if box[0] < 0 or box[1] < 0 or box[2] > image.size[0] or box[3] > image.size[1]:
+            continue
+        shots.append(MonitorShot(number, bounds, image.crop(box), 0.0))
+    return shots
+
+
+def composite(shots):
+    """
+    Arrange monitor images in their desktop layout
+    
+    Returns:
+        PIL Image spanning the bounding box of all shots (gaps are black)
+    """
+    left = min(shot.bounds[0] for shot in shots)
+    top = min(shot.bounds[1] for shot in shots)
+    right = max(shot.bounds[0] + shot.bounds[2] for shot in shots)
+    bottom = max(shot.bounds[1] + shot.bounds[3] for shot in shots)
+    
+    canvas = Image.new('RGB', (right - left, bottom - top))
+    for shot in shots:
+        canvas.paste(shot.image, (shot.bounds[0] - left, shot.bounds[1] - top))
+    return canvas
+
+
+class MultiMonitorCapture:
+    """Captures and encodes several monitors in parallel"""
+    
+    def __init__(self, max_workers=4):
+        """
+        Initialize the capture pool
+        
+        Args:
+            max_workers: Maximum number of monitors grabbed or encoded at once
+        """
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="MonitorCapture")
+        self._local = threading.local()
+        self._capturers = []
+        self._lock = threading.Lock()
+    
+    def _capturer(self):
+        """ScreenCapture owned by the current worker thread (mss handles are per thread)"""
+        capturer = getattr(self._local, 'capturer', None)
+        if capturer is None:
+            capturer = self._local.capturer = ScreenCapture()
+            with self._lock:
+                self._capturers.append(capturer)
+        return capturer
+    
+    def _grab(self, number):
+        """Grab one monitor (runs on a pool thread)"""
+        start = time.perf_counter()
+        capturer = self._capturer()
+        image = capturer.capture_screen(number)
+        return MonitorShot(number, capturer.last_bounds, image, (time.perf_counter() - start) * 1000)
+    
+    def capture(self, numbers):
+        """
+        Grab monitors concurrently
+        
+        Args:
+            numbers: Monitor numbers (1-based)
+        
+        Returns:
+            List of MonitorShot in the order of numbers
+        """
+        futures = [self._pool.submit(self._grab, number) for number in numbers]
+        return [future.result() for future in futures]
+    
+    def encode(self, shots, profile=image_codec.DEFAULT_PROFILE, model=None):
+        """
+        Encode monitor images in parallel
+        
+        Returns:
+            List of image_codec.EncodedImage in the order of shots
+        """
+        futures = [self._pool.submit(image_codec.encode_frame, shot.image, profile, model) for shot in shots]
+        return [future.result() for future in futures]
+    
+    def close(self):
+        """Stop the pool and release the per-thread mss handles"""
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            for capturer in self._capturers:
+                capturer.close()
+            self._capturers.clear()
@@ -0,0 +1,363 @@
+"""
+Opt-in profiling for field diagnostics
+Wraps selected callbacks with cProfile and samples allocations with tracemalloc,
+dumping the top functions and allocation sites to a rotating log directory.
+When disabled, wrap() returns callbacks unchanged so there is no overhead.
+
+Enable with the --profile [DIR] command-line switch or ANSWERLENS_PROFILE=1
+(or =DIR); ANSWERLENS_PROFILE_INTERVAL sets the seconds between dumps.
+
+Before Python 3.12 cProfile only hooks the thread that enables it, so each
+thread running a wrapped callback gets its own profile, enabled for the
+duration of the callback. From 3.12 cProfile uses sys.monitoring, which is
+process-wide and allows one active profiler: a single profile is enabled
+from start() and covers all code on every thread, not only the wrapped
+callbacks (which are then just counted and timed).
+
+While profiling, tracemalloc traces every allocation. Only the allocating
+line is recorded (trace_frames=1) to keep that overhead down, but
+allocation-heavy code still runs noticeably slower and uses more memory.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+
+DEFAULT_DIRECTORY = "profiles"
+DEFAULT_INTERVAL = 300  # Seconds between dumps
+
+# cProfile hooks every thread at once (sys.monitoring) rather than the calling thread
+PROCESS_WIDE_PROFILE = sys.version_info >= (3, 12)
+
+
+class _ThreadProfile:
+    """cProfile instance used by one thread (before Python 3.12)"""
+    
+    __slots__ = ('profile', 'depth', 'lock')
+    
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.depth = 0
+        self.lock = threading.Lock()
+
+
+class Profiler:
+    """Collects CPU profiles of wrapped callbacks and allocation snapshots"""
+    
+    def __init__(self, enabled=False, directory=DEFAULT_DIRECTORY, interval=DEFAULT_INTERVAL, top=30,
+                 keep=24, trace_frames=1):
+        """
+        Initialize the profiler (nothing is started until start())
+        
+        Args:
+            enabled: Profile at all; when False every method is a no-op
+            directory: Folder the reports are written to
+            interval: Seconds between periodic dumps
+            top: Number of functions and allocation sites per report
+            keep: Number of reports kept (older ones are deleted)
+            trace_frames: Stack depth recorded per allocation by tracemalloc (deeper
+                stacks make every traced allocation more expensive)
+        """
+        self.enabled = enabled
+        self.directory = directory
+        self.interval = interval
+        self.top = top
+        self.keep = keep
+        self.trace_frames = trace_frames
+        self._profiles = {}  # Thread id -> _ThreadProfile (before Python 3.12)
+        self._profile = None  # Process-wide profile (Python 3.12+)
+        self._calls = {}  # Callback name -> [calls, total seconds, max seconds]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._previous_snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._since = time.time()
+    
+    @classmethod
+    def from_settings(cls, option=None, environ=None):
+        """
+        Build a profiler from the --profile option and the environment
+        
+        Args:
+            option: Value of --profile (None if not given, "" for the default directory)
+            environ: Environment mapping (default os.environ)
+        
+        Returns:
+            Profiler, disabled unless the switch or ANSWERLENS_PROFILE is set
+        """
+        environ = os.environ if environ is None else environ
+        setting = option if option is not None else environ.get('ANSWERLENS_PROFILE', '')
+        if option is None and setting.lower() in ('', '0', 'false', 'no', 'off'):
+            return cls(enabled=False)
+        directory = setting if setting and setting.lower() not in ('1', 'true', 'yes', 'on') else DEFAULT_DIRECTORY
+        try:
+            interval = float(environ.get('ANSWERLENS_PROFILE_INTERVAL', DEFAULT_INTERVAL))
+        except ValueError:
+            interval = DEFAULT_INTERVAL
+        return cls(enabled=True, directory=directory, interval=max(1.0, interval))
+    
+    def wrap(self, name, func):
+        """
+        Profile calls to func under name
+        
+        Coroutine and async generator functions are profiled until they finish,
+        so their times include waiting (rate limits, retries, the network).
+        
+        Returns:
+            func itself when profiling is disabled, otherwise a wrapper
+        """
+        if not self.enabled:
+            return func
+        
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                call = self._enter()
+                stream = func(*args, **kwargs)
+                try:
+                    async for item in stream:
+                        yield item
+                finally:
+                    try:
+                        await stream.aclose()
+                    finally:
+                        self._leave(name, call)
+        
+        elif inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                call = self._enter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._leave(name, call)
+        
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                call = self._enter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._leave(name, call)
+        
+        return wrapper
+    
+    def instrument(self, obj, groups):
+        """
+        Replace methods of obj with profiled wrappers
+        
+        Args:
+            obj: Object whose bound methods are wrapped (as instance attributes)
+            groups: Dict of group name -> method names, e.g. {'capture': ['capture_screen']}
+        """
+        if not self.enabled:
+            return
+        for group, names in groups.items():
+            for name in names:
+                setattr(obj, name, self.wrap(f"{group}:{name}", getattr(obj, name)))
+    
+    def start(self):
+        """Start allocation tracing (and the process-wide profile on 3.12+) and the periodic dump thread"""
+        if not self.enabled or self._thread is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        if PROCESS_WIDE_PROFILE:
+            self._profile = self._enable_process_profile()
+        self._since = time.time()
+        self._thread = threading.Thread(target=self._run, name="Profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Write a final report and stop tracing"""
+        if not self.enabled or self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+        self.dump()
+        with self._lock:
+            if self._profile is not None:
+                self._profile.disable()
+                self._profile = None
+        tracemalloc.stop()
+    
+    def dump(self):
+        """
+        Write a report covering the time since the last dump
+        
+        Returns:
+            Path of the text report, or None when disabled
+        """
+        if not self.enabled:
+            return None
+        stats, calls = self._collect()
+        since, self._since = self._since, time.time()
+        
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = os.path.join(self.directory, f"profile_{stamp}.txt")
+        report = io.StringIO()
+        report.write(f"AnswerLens profile {datetime.fromtimestamp(since):%Y-%m-%d %H:%M:%S} - "
+                     f"{datetime.now():%H:%M:%S}\n\n")
+        self._write_calls(report, calls)
+        if stats is not None:
+            stats.dump_stats(os.path.join(self.directory, f"profile_{stamp}.pstats"))
+            for sort in ('cumulative', 'tottime'):
+                report.write(f"\n== Top functions by {sort} ==\n")
+                stats.stream = report
+                stats.sort_stats(sort).print_stats(self.top)
+        self._write_allocations(report)
+        
+        with open(path, 'w') as f:
+            f.write(report.getvalue())
+        self._rotate()
+        return path
+    
+    def _enter(self):
+        """
+        Start profiling a wrapped call on this thread
+        
+        The thread's profile stays enabled while any wrapped call on it is
+        running, including nested calls and coroutines interleaved on an event loop.
+        
+        Returns:
+            (thread profile or None, start time)
+        """
+        start = time.perf_counter()
+        if PROCESS_WIDE_PROFILE:
+            return None, start
+        state = self._thread_profile()
+        with state.lock:
+            state.depth += 1
+            if state.depth == 1:
+                state.profile.enable()
+        return state, start
+    
+    def _leave(self, name, call):
+        """Finish profiling a wrapped call started by _enter()"""
+        state, start = call
+        if state is not None:
+            with state.lock:
+                state.depth -= 1
+                if state.depth == 0:
+                    state.profile.disable()
+        self._count(name, time.perf_counter() - start)
+    
+    @staticmethod
+    def _enable_process_profile():
+        """Start a process-wide profile (None if another profiler is already active)"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            print("Profiler: another profiler is active; only callback timings are reported")
+            return None
+        return profile
+    
+    def _thread_profile(self):
+        """This thread's profile, created on first use"""
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = self._local.state = _ThreadProfile()
+            with self._lock:
+                self._profiles[threading.get_ident()] = state
+        return state
+    
+    def _count(self, name, seconds):
+        """Add one call to the per-callback counters"""
+        with self._lock:
+            entry = self._calls.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+    
+    def _collect(self):
+        """Merge and reset the profiles and callback counters"""
+        with self._lock:
+            states = list(self._profiles.values())
+            calls, self._calls = self._calls, {}
+            profile = self._profile
+            if profile is not None:
+                # Swap in a fresh process-wide profile for the next report
+                profile.disable()
+                self._profile = self._enable_process_profile() if self._thread is not None else None
+        
+        stats = None
+        if profile is not None:
+            try:
+                stats = pstats.Stats(profile)
+            except TypeError:
+                pass  # Nothing was recorded
+        for state in states:
+            with state.lock:
+                if state.depth:
+                    continue  # A call is in progress on that thread; collect it next time
+                profile, state.profile = state.profile, cProfile.Profile()
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                pass  # Nothing was recorded by this profile
+        return stats, calls
+    
+    @staticmethod
+    def _write_calls(report, calls):
+        """Per-callback call counts and times"""
+        report.write("== Callbacks ==\n")
+        report.write(f"{'callback':<48} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9}\n")
+        for name, (count, total, longest) in sorted(calls.items(), key=lambda item: -item[1][1]):
+            report.write(f"{name:<48} {count:>8} {total * 1000:>10.1f} {total * 1000 / count:>9.2f} "
+                         f"{longest * 1000:>9.1f}\n")
+    
+    def _write_allocations(self, report):
+        """Top allocation sites and growth since the previous dump"""
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        report.write(f"\n== Memory: {current / 1048576:.1f} MB traced, peak {peak / 1048576:.1f} MB ==\n")
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        report.write("\n== Top allocation sites ==\n")
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            report.write(f"{stat}\n")
+        if self._previous_snapshot is not None:
+            report.write("\n== Growth since previous report ==\n")
+            for stat in snapshot.compare_to(self._previous_snapshot, 'lineno')[:self.top]:
+                report.write(f"{stat}\n")
+        self._previous_snapshot = snapshot
+    
+    def _rotate(self):
+        """Delete all but the newest keep reports"""
+        for extension in ('.txt', '.pstats'):
+            reports = sorted(name for name in os.listdir(self.directory)
+                             if name.startswith("profile_") and name.endswith(extension))
+            for name in reports[:-self.keep]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+    
+    def _run(self):
+        """Thread target: dump a report every interval"""
+        while not self._stop.wait(self.interval):
+            try:
+                self.dump()
+            except Exception as e:
+                print(f"Profiler dump failed: {e}")
@@ -3,15 +3,31 @@ Region Selection Tool
 Allows user to select a region of the screen with a transparent overlay
 """
 
+import math
 import tkinter as tk
 from PIL import Image, ImageTk
 import mss
 
+import image_codec
+
 
 class RegionSelector:
     """Tool for selecting a screen region"""
     
-    def __init__(self):
+    def __init__(self, frame=None, frame_bounds=None, max_overlay_size=1920):
+        """
+        Initialize the selector
+        
+        Args:
+            frame: Recent PIL Image of the screen to show under the overlay
+                (the virtual desktop is grabbed if None)
+            frame_bounds: (left, top, width, height) desktop area covered by frame
+            max_overlay_size: Longest edge of the overlay image before it is zoomed
+                up to fill the screen
+        """
+        self.frame = frame
+        self.frame_bounds = frame_bounds
+        self.max_overlay_size = max_overlay_size
         self.start_x = None
         self.start_y = None
         self.rect = None
@@ -19,42 +35,55 @@ class RegionSelector:
         self.root = None
         self.canvas = None
         self.photo = None  # Keep photo reference at class level
+        self.desktop = None
+        self.scale = (1.0, 1.0)
     
     def select_region(self):
         """
         Open a transparent overlay to select a region
         
+        The overlay spans the virtual desktop (all monitors), so regions can be
+        selected on any monitor.
+        
         Returns:
-            Tuple of (left, top, width, height) or None if cancelled
+            Tuple of (left, top, width, height) in physical desktop coordinates or None if cancelled
         """
-        # Take a screenshot of the entire screen using mss
+        # Bounding box of all monitors
         with mss.mss() as sct:
-            monitor = sct.monitors[1]  # Primary monitor
-            screenshot_data = sct.grab(monitor)
-            screenshot = Image.frombytes('RGB', screenshot_data.size, screenshot_data.rgb)
+            monitor = sct.monitors[0]
+            self.desktop = (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+            if self.frame is None or not self.frame_bounds:
+                screenshot_data = sct.grab(monitor)
+                self.frame = Image.frombytes('RGB', screenshot_data.size, screenshot_data.rgb)
+                self.frame_bounds = self.desktop
+        
+        left, top, width, height = self.desktop
         
-        # Create fullscreen transparent window
+        # Create borderless window covering the virtual desktop
         self.root = tk.Toplevel()  # Use Toplevel instead of Tk
-        self.root.attributes('-fullscreen', True)
+        self.root.overrideredirect(True)
+        self.root.geometry(f"{width}x{height}+{left}+{top}")
         self.root.attributes('-alpha', 0.3)
         self.root.attributes('-topmost', True)
+        self.root.update_idletasks()
         self.root.focus_force()
         
-        # Create canvas with screenshot
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
+        # The window may be sized in logical pixels (display scaling)
+        view_width = self.root.winfo_width() if self.root.winfo_width() > 1 else width
+        view_height = self.root.winfo_height() if self.root.winfo_height() > 1 else height
+        self.scale = (width / view_width, height / view_height)
         
-        self.canvas = tk.Canvas(self.root, width=screen_width, height=screen_height, 
+        self.canvas = tk.Canvas(self.root, width=view_width, height=view_height,
                                 highlightthickness=0, cursor="cross")
         self.canvas.pack()
         
         # Display screenshot - keep reference at class level
-        self.photo = ImageTk.PhotoImage(screenshot)
+        self.photo = self._overlay_image(view_width, view_height)
         self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
         
         # Add instructions
         instruction_text = "Click and drag to select region. Press ESC to cancel."
-        self.canvas.create_text(screen_width // 2, 30, text=instruction_text, 
+        self.canvas.create_text(view_width // 2, 30, text=instruction_text,
                                fill="yellow", font=("Arial", 16, "bold"),
                                tags="instruction")
         
@@ -72,6 +101,37 @@ class RegionSelector:
         
         return self.selected_region
     
+    def _overlay_image(self, view_width, view_height):
+        """
+        Build the overlay background
+        
+        The frame is downscaled by an integer factor and zoomed back up by Tk,
+        so only a small image is converted to a PhotoImage. Desktop areas the
+        frame does not cover are left dark.
+        """
+        factor = max(1, math.ceil(max(view_width, view_height) / self.max_overlay_size))
+        small_size = (max(1, view_width // factor), max(1, view_height // factor))
+        background = Image.new('RGB', small_size, (32, 32, 32))
+        
+        # Place the frame at its position within the desktop
+        desk_left, desk_top, desk_width, desk_height = self.desktop
+        frame_left, frame_top, frame_width, frame_height = self.frame_bounds
+        scale_x = small_size[0] / desk_width
+        scale_y = small_size[1] / desk_height
+        box = (round((frame_left - desk_left) * scale_x), round((frame_top - desk_top) * scale_y),
+               round((frame_left - desk_left + frame_width) * scale_x),
+               round((frame_top - desk_top + frame_height) * scale_y))
+        if box[2] > box[0] and box[3] > box[1]:
+            frame = self.frame if self.frame.mode == 'RGB' else self.frame.convert('RGB')
+            background.paste(image_codec.resize_image(frame, (box[2] - box[0], box[3] - box[1])), box[:2])
+        
+        small_photo = ImageTk.PhotoImage(background, master=self.root)
+        if factor == 1:
+            return small_photo
+        photo = tk.PhotoImage(master=self.root, width=small_size[0] * factor, height=small_size[1] * factor)
+        photo.tk.call(photo, 'copy', small_photo, '-zoom', factor, factor)
+        return photo
+    
     def _on_press(self, event):
         """Handle mouse press"""
         self.start_x = event.x
@@ -94,11 +154,13 @@ class RegionSelector:
             # Get coordinates
             x1, y1, x2, y2 = self.canvas.coords(self.rect)
             
-            # Ensure x1 < x2 and y1 < y2
-            left = int(min(x1, x2))
-            top = int(min(y1, y2))
-            right = int(max(x1, x2))
-            bottom = int(max(y1, y2))
+            # Map overlay coordinates to physical desktop coordinates
+            scale_x, scale_y = self.scale
+            desk_left, desk_top = self.desktop[:2]
+            left = desk_left + int(min(x1, x2) * scale_x)
+            top = desk_top + int(min(y1, y2) * scale_y)
+            right = desk_left + int(max(x1, x2) * scale_x)
+            bottom = desk_top + int(max(y1, y2) * scale_y)
             
             # Calculate width and height
             width = right - left
@@ -0,0 +1,280 @@
+"""
+Rate-limit-aware scheduling for LLM requests
+Token bucket for requests per minute, retries with jittered exponential backoff,
+per-request deadlines and an interval hint for the monitoring loop
+"""
+
+import asyncio
+import random
+import time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+# HTTP status codes worth retrying (rate limit and transient server errors)
+TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+# Dropped connections, timeouts and other network failures of the HTTP clients the SDK may use
+TRANSIENT_ERRORS = (asyncio.TimeoutError, ConnectionError)
+if httpx is not None:
+    TRANSIENT_ERRORS += (httpx.TransportError,)
+if aiohttp is not None:
+    TRANSIENT_ERRORS += (aiohttp.ClientError,)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request cannot complete before its deadline"""
+
+
+class TokenBucket:
+    """Token bucket refilled at a fixed requests-per-minute rate"""
+    
+    def __init__(self, requests_per_minute, burst=None):
+        """
+        Initialize the bucket
+        
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Maximum tokens that can accumulate (default: a quarter of a minute's worth)
+        """
+        self.burst = burst
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1, requests_per_minute // 4)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = None
+    
+    def set_rate(self, requests_per_minute):
+        """
+        Change the sustained rate, keeping the tokens already accumulated
+        
+        Safe to call from another thread: a refill running concurrently uses
+        either the old or the new rate.
+        """
+        self.capacity = self.burst if self.burst is not None else max(1, requests_per_minute // 4)
+        self.rate = requests_per_minute / 60.0
+    
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def try_acquire(self):
+        """
+        Take a token if one is available
+        
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    async def acquire(self, deadline=None):
+        """
+        Wait for a token
+        
+        Args:
+            deadline: time.monotonic() value to give up at (None to wait indefinitely)
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                wait = self.try_acquire()
+                if wait == 0:
+                    return
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    raise DeadlineExceeded("Rate limit would delay the request past its deadline")
+                await asyncio.sleep(wait)
+
+
+class RequestScheduler:
+    """Runs LLM requests under a rate limit with retries and deadlines"""
+    
+    def __init__(self, requests_per_minute=None, burst=None, max_retries=3, base_delay=1.0, max_delay=30.0,
+                 max_throttle=8.0):
+        """
+        Initialize the scheduler
+        
+        Args:
+            requests_per_minute: Client-side rate limit (None for no limit)
+            burst: Token bucket capacity
+            max_retries: Retries for transient errors
+            base_delay: First backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay
+            max_throttle: Largest factor adjusted_interval may stretch an interval by
+        """
+        self.burst = burst
+        self.bucket = TokenBucket(requests_per_minute, burst) if requests_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_throttle = max_throttle
+        self.throttle = 1.0
+        self.retries = 0
+        self.rate_limited = 0
+    
+    def set_rate(self, requests_per_minute):
+        """Change the client-side rate limit of a running scheduler (None for no limit)"""
+        if not requests_per_minute:
+            self.bucket = None
+        elif self.bucket is None:
+            self.bucket = TokenBucket(requests_per_minute, self.burst)
+        else:
+            self.bucket.set_rate(requests_per_minute)
+    
+    @staticmethod
+    def is_transient(error):
+        """Check whether an error is worth retrying"""
+        if isinstance(error, DeadlineExceeded):
+            return False
+        # HTTP errors carry their status as code (google-genai) or status (aiohttp)
+        status = getattr(error, 'code', None) or getattr(error, 'status', None)
+        if isinstance(status, int):
+            return status in TRANSIENT_STATUS_CODES
+        return isinstance(error, TRANSIENT_ERRORS)
+    
+    @staticmethod
+    def is_rate_limit(error):
+        """Check whether an error is an HTTP 429"""
+        return getattr(error, 'code', None) == 429
+    
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def adjusted_interval(self, base_interval):
+        """
+        Stretch a polling interval while the API is pushing back
+        
+        Args:
+            base_interval: Normal interval (any unit)
+        
+        Returns:
+            Interval scaled by the current throttle factor
+        """
+        return base_interval * self.throttle
+    
+    async def run(self, request_factory, timeout=None):
+        """
+        Run a request with rate limiting, retries and an optional deadline
+        
+        Args:
+            request_factory: Callable returning a new awaitable for each attempt
+            timeout: Seconds the whole request (including retries) may take
+        
+        Returns:
+            The awaitable's result
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        attempt = 0
+        while True:
+            await self._acquire(deadline)
+            try:
+                result = await self._with_deadline(request_factory(), deadline)
+            except Exception as e:
+                attempt = await self._handle_failure(e, attempt, deadline)
+                continue
+            self._on_success()
+            return result
+    
+    async def stream(self, stream_factory, timeout=None):
+        """
+        Run a streaming request, retrying only if it fails before the first chunk
+        
+        Args:
+            stream_factory: Callable returning a new async iterator for each attempt
+            timeout: Seconds the whole stream may take
+        
+        Yields:
+            Items from the stream
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        attempt = 0
+        while True:
+            await self._acquire(deadline)
+            iterator = stream_factory().__aiter__()
+            started = False
+            try:
+                while True:
+                    try:
+                        item = await self._with_deadline(iterator.__anext__(), deadline)
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    yield item
+            except Exception as e:
+                if started:
+                    raise  # Partial output was already delivered
+                await self._close(iterator)
+                attempt = await self._handle_failure(e, attempt, deadline)
+                continue
+            self._on_success()
+            return
+    
+    async def _acquire(self, deadline):
+        """Wait for the rate limiter"""
+        if self.bucket is not None:
+            await self.bucket.acquire(deadline)
+    
+    @staticmethod
+    async def _close(iterator):
+        """Close an abandoned stream so its connection is released before a retry"""
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is None:
+            return
+        try:
+            await aclose()
+        except Exception:
+            pass  # The attempt already failed; its error is the one that matters
+    
+    async def _with_deadline(self, awaitable, deadline):
+        """Await with the time remaining until the deadline"""
+        if deadline is None:
+            return await awaitable
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded("Request deadline exceeded")
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded") from None
+    
+    async def _handle_failure(self, error, attempt, deadline):
+        """
+        Decide whether to retry a failed attempt, sleeping for the backoff if so
+        
+        Returns:
+            The next attempt number (re-raises the error when giving up)
+        """
+        if self.is_rate_limit(error):
+            self.rate_limited += 1
+            self.throttle = min(self.max_throttle, self.throttle * 2)
+        
+        if not self.is_transient(error) or attempt >= self.max_retries:
+            raise error
+        
+        delay = self.backoff_delay(attempt)
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise error
+        self.retries += 1
+        await asyncio.sleep(delay)
+        return attempt + 1
+    
+    def _on_success(self):
+        """Relax the throttle after a successful request"""
+        self.throttle = max(1.0, self.throttle / 2)
@@ -0,0 +1,253 @@
+"""
+Content-addressed response cache for LLM analysis
+Keys responses on the image content, normalized question and model name.
+Persistent entries are swept when the directory is opened and whenever the
+disk limits are exceeded, so the directory never grows without bound.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """In-memory LRU cache of LLM responses with optional on-disk persistence"""
+    
+    def __init__(self, max_entries=256, max_bytes=4 * 1024 * 1024, ttl=3600, cache_dir=None,
+                 max_disk_entries=2000, max_disk_bytes=32 * 1024 * 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            max_bytes: Maximum total size of cached response text in memory
+            ttl: Seconds before an entry expires (None to never expire)
+            cache_dir: Directory for persistent entries (None for memory only)
+            max_disk_entries: Maximum number of persistent entries
+            max_disk_bytes: Maximum total size of the persistent entry files
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created, text)
+        self._size = 0
+        self._disk_entries = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.cache_dir = None
+        self.set_cache_dir(cache_dir)
+    
+    def set_cache_dir(self, cache_dir):
+        """
+        Change where entries are persisted, sweeping the new directory
+        
+        Args:
+            cache_dir: Directory for persistent entries (None for memory only)
+        """
+        self.cache_dir = cache_dir or None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.sweep()
+    
+    @staticmethod
+    def make_key(image_data, question, model):
+        """
+        Build a cache key
+        
+        Args:
+            image_data: Encoded image (bytes or base64 string)
+            question: Question text (whitespace and case are normalized)
+            model: Model name
+        
+        Returns:
+            Hex digest string
+        """
+        if isinstance(image_data, str):
+            image_data = image_data.encode()
+        normalized_question = " ".join(question.split()).casefold()
+        
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(image_data).digest())
+        digest.update(normalized_question.encode())
+        digest.update(b"\0")
+        digest.update(model.encode())
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """
+        Look up a cached response
+        
+        Returns:
+            Response text, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, text = entry
+                if self._is_expired(created):
+                    self._remove(key)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return text
+        
+        # Fall back to the persistent store
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is not None:
+                created, text = entry
+                self._store(key, created, text)
+                self.hits += 1
+                return text
+            self.misses += 1
+            return None
+    
+    def put(self, key, text):
+        """Store a response"""
+        created = time.time()
+        with self._lock:
+            self._store(key, created, text)
+        self._write_disk(key, created, text)
+    
+    def clear(self):
+        """Drop all in-memory entries and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+    
+    def sweep(self):
+        """
+        Delete expired persistent entries, then the oldest ones once the disk limits are reached
+        
+        Returns:
+            Number of files removed
+        """
+        cache_dir = self.cache_dir
+        if not cache_dir:
+            return 0
+        try:
+            names = os.listdir(cache_dir)
+        except OSError:
+            return 0
+        
+        now = time.time()
+        files = []  # (modified, size, path) of live entries
+        expired = []
+        for name in names:
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # An entry file is written once per put(), so its modification time is the entry's creation time
+            if name.endswith('.json'):
+                (expired if self._is_expired(stat.st_mtime) else files).append((stat.st_mtime, stat.st_size, path))
+            elif name.endswith('.tmp') and now - stat.st_mtime > 60:
+                expired.append((stat.st_mtime, stat.st_size, path))  # Left behind by an interrupted write
+        
+        # Trim to 90% of the limits so a full directory is not swept again on every write
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        max_files, max_total = int(self.max_disk_entries * 0.9), self.max_disk_bytes * 0.9
+        while files and (len(files) > max_files or total > max_total):
+            entry = files.pop(0)
+            expired.append(entry)
+            total -= entry[1]
+        
+        removed = 0
+        for _, _, path in expired:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_entries = len(files)
+            self._disk_bytes = total
+        return removed
+    
+    def hit_rate(self):
+        """Return the fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def _is_expired(self, created):
+        """Check whether an entry created at the given time has outlived the TTL"""
+        return self.ttl is not None and time.time() - created > self.ttl
+    
+    def _store(self, key, created, text):
+        """Insert an entry and evict old ones (caller holds the lock)"""
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (created, text)
+        self._size += len(text.encode())
+        
+        # Evict least recently used entries until within bounds
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+    
+    def _remove(self, key):
+        """Remove an entry (caller holds the lock)"""
+        _, text = self._entries.pop(key)
+        self._size -= len(text.encode())
+    
+    def _disk_path(self, key):
+        """Path of the persistent file for a key"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _read_disk(self, key):
+        """Load an entry from disk, or None if missing or expired"""
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            created, text = data['created'], data['text']
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        if self._is_expired(created):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return created, text
+    
+    def _write_disk(self, key, created, text):
+        """Atomically write an entry to disk"""
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'created': created, 'text': text}, f)
+            size = os.path.getsize(tmp_path)
+            try:
+                replaced = os.path.getsize(path)  # Rewriting an existing entry
+            except OSError:
+                replaced = None
+            os.replace(tmp_path, path)
+        except OSError:
+            return  # Persistence is best-effort
+        
+        with self._lock:
+            if replaced is None:
+                self._disk_entries += 1
+                self._disk_bytes += size
+            else:
+                self._disk_bytes += size - replaced
+            over = self._disk_entries > self.max_disk_entries or self._disk_bytes > self.max_disk_bytes
+        if over:
+            self.sweep()
@@ -11,6 +11,8 @@ import base64
 from datetime import datetime
 import os
 import sys
+import time
+import image_codec
 
 # Windows-specific imports
 if sys.platform == 'win32':
@@ -24,7 +26,22 @@ class ScreenCapture:
     """Handles screen capturing functionality"""
     
     def __init__(self):
-        self.sct = mss.mss()
+        self._sct = None
+        self.last_bounds = None  # (left, top, width, height) of the last screen grab
+        self.last_timings = {}  # capture_ms / convert_ms of the last screen grab
+    
+    @property
+    def sct(self):
+        """mss instance, opened on first capture so encoding works without a display"""
+        if self._sct is None:
+            self._sct = mss.mss()
+        return self._sct
+    
+    def close(self):
+        """Release the mss handle"""
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
     
     def capture_screen(self, monitor_number=1):
         """
@@ -37,11 +54,23 @@ class ScreenCapture:
             PIL Image object
         """
         monitor = self.sct.monitors[monitor_number]
-        screenshot = self.sct.grab(monitor)
+        self.last_bounds = (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
+        return self._grab(monitor)
+    
+    def list_monitors(self):
+        """
+        List the physical monitors
         
-        # Convert to PIL Image
-        img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
-        return img
+        Returns:
+            List of (monitor_number, (left, top, width, height)) tuples, numbered from 1
+        """
+        return [(number, (monitor["left"], monitor["top"], monitor["width"], monitor["height"]))
+                for number, monitor in enumerate(self.sct.monitors[1:], start=1)]
+    
+    def desktop_bounds(self):
+        """(left, top, width, height) of the virtual desktop spanning all monitors"""
+        monitor = self.sct.monitors[0]
+        return (monitor["left"], monitor["top"], monitor["width"], monitor["height"])
     
     def capture_region(self, left, top, width, height):
         """
@@ -60,22 +89,33 @@ class ScreenCapture:
             "width": width,
             "height": height
         }
+        self.last_bounds = (left, top, width, height)
+        return self._grab(monitor)
+    
+    def _grab(self, monitor):
+        """Grab an mss monitor dict and convert it to a PIL Image, timing both steps"""
+        start = time.perf_counter()
         screenshot = self.sct.grab(monitor)
+        grabbed = time.perf_counter()
+        
+        # Convert to PIL Image
         img = Image.frombytes('RGB', screenshot.size, screenshot.rgb)
+        self.last_timings = {'capture_ms': (grabbed - start) * 1000,
+                             'convert_ms': (time.perf_counter() - grabbed) * 1000}
         return img
     
     def save_screenshot(self, img, filename=None):
         """Save screenshot to file"""
         if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             filename = f"screenshot_{timestamp}.png"
         
         img.save(filename)
         return filename
     
-    def image_to_base64(self, img, format='PNG', max_size=1024):
+    def encode_image(self, img, format='PNG', max_size=1024):
         """
-        Convert PIL Image to base64 string, with optional resizing
+        Encode a PIL Image to bytes, with optional resizing
         
         Args:
             img: PIL Image object
@@ -83,7 +123,7 @@ class ScreenCapture:
             max_size: Maximum dimension (width or height) for resizing
         
         Returns:
-            Base64 encoded string
+            Tuple of (encoded bytes, MIME type)
         """
         # Resize if image is too large
         if max(img.size) > max_size:
@@ -91,10 +131,41 @@ class ScreenCapture:
             new_size = tuple(int(dim * ratio) for dim in img.size)
             img = img.resize(new_size, Image.Resampling.LANCZOS)
         
-        # Convert to base64
         buffered = io.BytesIO()
         img.save(buffered, format=format)
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        return buffered.getvalue(), Image.MIME[format.upper()]
+    
+    def encode_adaptive(self, img, profile=image_codec.DEFAULT_PROFILE, model=None):
+        """
+        Encode a PIL Image using an adaptive encoding profile
+        
+        Args:
+            img: PIL Image object
+            profile: Profile name from image_codec.PROFILES ('auto', 'lossless', 'compact')
+            model: Model name used to size the image from its token budget
+        
+        Returns:
+            image_codec.EncodedImage (data, mime_type, format, size, encode_ms)
+        """
+        return image_codec.encode_frame(img, profile=profile, model=model)
+    
+    def image_to_base64(self, img, format='PNG', max_size=1024):
+        """
+        Convert PIL Image to base64 string, with optional resizing
+        
+        Kept for compatibility; LLMAnalyzer.analyze_image_data accepts the
+        bytes from encode_image directly.
+        
+        Args:
+            img: PIL Image object
+            format: Image format (PNG, JPEG)
+            max_size: Maximum dimension (width or height) for resizing
+        
+        Returns:
+            Base64 encoded string
+        """
+        image_bytes, _ = self.encode_image(img, format=format, max_size=max_size)
+        img_str = base64.b64encode(image_bytes).decode()
         return img_str
     
     def list_windows(self):
@@ -132,6 +203,7 @@ class ScreenCapture:
         if sys.platform != 'win32':
             raise NotImplementedError("Window capture is only supported on Windows")
         
+        start = time.perf_counter()
         try:
             # Get window dimensions
             left, top, right, bottom = win32gui.GetWindowRect(window_handle)
@@ -166,6 +238,7 @@ class ScreenCapture:
             mfc_dc.DeleteDC()
             win32gui.ReleaseDC(window_handle, hwnd_dc)
             
+            self.last_timings = {'capture_ms': (time.perf_counter() - start) * 1000}
             return img
         except Exception as e:
             raise Exception(f"Failed to capture window: {str(e)}")
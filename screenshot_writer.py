@@ -0,0 +1,130 @@
+"""
+Background screenshot writer
+Saves captures on a worker thread in a chosen format, naming files by content
+hash so the same frame is only written once
+"""
+
+import hashlib
+import os
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+
+from PIL import features
+
+
+# Supported formats: file extension and Pillow format name
+FORMATS = {
+    'png': ('png', 'PNG'),
+    'webp': ('webp', 'WEBP'),  # Lossless WebP
+    'jpeg': ('jpg', 'JPEG'),
+}
+DEFAULT_FORMAT = 'png'
+
+SavedScreenshot = namedtuple('SavedScreenshot', ['path', 'written'])
+
+
+def image_hash(img):
+    """Hex SHA-256 of an image's mode, size and pixels"""
+    digest = hashlib.sha256(f"{img.mode}{img.size}".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+class ScreenshotWriter:
+    """Queue of screenshots written to disk by a background thread"""
+    
+    def __init__(self, directory="screenshots", format=DEFAULT_FORMAT, compress_level=6, jpeg_quality=90):
+        """
+        Initialize the writer
+        
+        Args:
+            directory: Folder the screenshots are written to
+            format: 'png', 'webp' (lossless) or 'jpeg'
+            compress_level: PNG zlib level (0 = fastest, 9 = smallest)
+            jpeg_quality: JPEG quality (1-95)
+        """
+        self.directory = directory
+        self.format = format
+        self.compress_level = compress_level
+        self.jpeg_quality = jpeg_quality
+        self.written = 0
+        self.duplicates = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def save(self, img, format=None):
+        """
+        Queue an image for saving (returns immediately)
+        
+        Args:
+            img: PIL Image object (must not be modified afterwards)
+            format: Override the writer's format for this image
+        
+        Returns:
+            concurrent.futures.Future resolving to a SavedScreenshot
+        """
+        future = Future()
+        self._queue.put((img, format or self.format, self.compress_level, self.jpeg_quality, future))
+        self._start()
+        return future
+    
+    def pending(self):
+        """Number of screenshots waiting to be written"""
+        return self._queue.qsize()
+    
+    def close(self, timeout=10):
+        """Write the remaining screenshots and stop the thread"""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+    
+    def _start(self):
+        """Start the writer thread (no-op if already running)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="ScreenshotWriter", daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        """Thread target: write queued screenshots in order"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            img, format, compress_level, jpeg_quality, future = item
+            try:
+                future.set_result(self._write(img, format, compress_level, jpeg_quality))
+            except Exception as e:
+                future.set_exception(e)
+    
+    def _write(self, img, format, compress_level, jpeg_quality):
+        """Encode and write one screenshot unless a file with the same content exists"""
+        if format == 'webp' and not features.check('webp'):
+            format = 'png'
+        extension, pil_format = FORMATS[format]
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"screenshot_{image_hash(img)[:16]}.{extension}")
+        if os.path.exists(path):
+            self.duplicates += 1
+            return SavedScreenshot(path, False)
+        
+        if pil_format == 'PNG':
+            options = {'compress_level': compress_level}
+        elif pil_format == 'WEBP':
+            options = {'lossless': True, 'method': 4}
+        else:
+            options = {'quality': jpeg_quality}
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+        
+        # Write to a temporary name first so a crash never leaves a truncated file
+        tmp_path = f"{path}.tmp"
+        img.save(tmp_path, format=pil_format, **options)
+        os.replace(tmp_path, path)
+        self.written += 1
+        return SavedScreenshot(path, True)
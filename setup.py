@@ -43,6 +43,7 @@ setup(
     entry_points={
         "console_scripts": [
             "answerlens=app:main",
+            "answerlens-batch=batch_analyzer:main",
         ],
     },
     include_package_data=True,
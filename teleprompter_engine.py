@@ -0,0 +1,114 @@
+"""
+Time-based animation engine for the teleprompter
+Advances word highlighting and scrolling from elapsed wall-clock time so one
+frame timer drives both and event-loop jitter does not change the speed
+"""
+
+import math
+from collections import deque
+
+
+FRAME_MS = 16  # Target frame interval (~60 fps)
+
+
+class TeleprompterEngine:
+    """Computes highlighted word and scroll distance per animation frame"""
+    
+    def __init__(self, start_delay=3.0, reading_line=0.35, catch_up_rate=2.0, max_frame_dt=0.25,
+                 history=600):
+        """
+        Initialize the engine
+        
+        Args:
+            start_delay: Seconds before scrolling starts so the first line can be read
+            reading_line: Fraction of the view height where the current word should sit
+            catch_up_rate: Fraction of the distance to the reading line closed per second
+            max_frame_dt: Longest frame step in seconds (stalls do not cause jumps)
+            history: Number of recent frame times kept for statistics
+        """
+        self.start_delay = start_delay
+        self.reading_line = reading_line
+        self.catch_up_rate = catch_up_rate
+        self.max_frame_dt = max_frame_dt
+        self.frame_times = deque(maxlen=history)
+        self.started_at = None
+        self.last_frame = None
+        self.word_clock = 0.0
+        self.scroll_remainder = 0.0
+    
+    @staticmethod
+    def words_per_second(speed):
+        """Highlight rate for a speed slider value (0-10)"""
+        return 1000.0 / max(80, 600 - speed * 50)
+    
+    @staticmethod
+    def max_scroll_speed(speed):
+        """Scroll speed limit in pixels per second for a speed slider value (0-10)"""
+        return 30 + speed * 15
+    
+    def start(self, now, word_index=0):
+        """
+        Start (or resume) the animation
+        
+        Args:
+            now: Current time.monotonic() value
+            word_index: Word to resume from
+        """
+        self.started_at = now
+        self.last_frame = now
+        self.word_clock = float(word_index)
+        self.scroll_remainder = 0.0
+        self.frame_times.clear()
+    
+    def advance(self, now, speed, word_offset=None, word_count=None):
+        """
+        Step the animation to the given time
+        
+        Args:
+            now: Current time.monotonic() value
+            speed: Speed slider value (0-10)
+            word_offset: Pixels between the current word and the reading line
+                (positive when the word is below it), or None if unknown
+            word_count: Number of words available; the clock waits at the end
+                (e.g. while an answer is still streaming in)
+        
+        Returns:
+            Tuple of (index of the word to highlight, whole pixels to scroll down)
+        """
+        dt = min(max(0.0, now - self.last_frame), self.max_frame_dt)
+        self.frame_times.append(now - self.last_frame)
+        self.last_frame = now
+        
+        self.word_clock += dt * self.words_per_second(speed)
+        if word_count is not None:
+            self.word_clock = min(self.word_clock, float(word_count))
+        
+        pixels = 0
+        if now - self.started_at >= self.start_delay and word_offset is not None:
+            # Ease the current word towards the reading line, capped by the speed limit
+            velocity = min(self.max_scroll_speed(speed), max(0.0, word_offset * self.catch_up_rate))
+            self.scroll_remainder += velocity * dt
+            pixels = int(self.scroll_remainder)
+            self.scroll_remainder -= pixels
+        
+        return int(self.word_clock), pixels
+    
+    def frame_time_stats(self):
+        """
+        Summarize recent frame times
+        
+        Returns:
+            Dict with mean, standard deviation and p99 in milliseconds (empty if no frames)
+        """
+        samples = [t * 1000 for t in self.frame_times]
+        if not samples:
+            return {}
+        mean = sum(samples) / len(samples)
+        variance = sum((t - mean) ** 2 for t in samples) / len(samples)
+        ordered = sorted(samples)
+        return {
+            'frames': len(samples),
+            'mean_ms': mean,
+            'stdev_ms': math.sqrt(variance),
+            'p99_ms': ordered[max(0, math.ceil(0.99 * len(ordered)) - 1)],
+        }
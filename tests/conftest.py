@@ -0,0 +1,35 @@
+"""
+Shared pytest setup: the app modules live at the repository root and the
+fake Gemini server and synthetic frames in benchmarks/. Tests that need the
+Tk window use the gui_app fixture and are skipped without a display
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture
+def gui_app(tmp_path, monkeypatch):
+    """A ScreenAnalysisApp in a real Tk window (skipped without a display, e.g. run under xvfb-run -a)"""
+    if not os.environ.get("DISPLAY"):
+        pytest.skip("needs a display (run under xvfb-run)")
+    tk = pytest.importorskip("tkinter")
+    app_module = pytest.importorskip("app")
+    
+    monkeypatch.chdir(tmp_path)  # config, cache and history files stay out of the tree
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"cannot open the display: {e}")
+    instance = app_module.ScreenAnalysisApp(root)
+    root.update()
+    yield instance
+    instance.async_runner.stop()
+    instance.capture_worker.stop()
+    root.destroy()
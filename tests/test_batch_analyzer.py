@@ -0,0 +1,99 @@
+"""
+Batch CLI: input discovery, resumable JSONL results and a full run against
+the local fake Gemini server
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("google.genai")
+
+from PIL import Image  # noqa: E402
+
+import batch_analyzer  # noqa: E402
+from batch_analyzer import find_images, load_completed, run_batch  # noqa: E402
+from fake_gemini_server import FakeGeminiServer  # noqa: E402
+from llm_analyzer import LLMAnalyzer  # noqa: E402
+
+
+QUESTION = "What is on this screen?"
+
+
+@pytest.fixture
+def shots(tmp_path):
+    """Three screenshots (one in a subfolder) plus files that are not images"""
+    (tmp_path / "sub").mkdir()
+    paths = [tmp_path / "a.png", tmp_path / "b.jpg", tmp_path / "sub" / "c.webp"]
+    for index, path in enumerate(paths):
+        Image.new('RGB', (320, 200), (index * 80, 100, 200)).save(path)
+    (tmp_path / "notes.txt").write_text("not an image")
+    return tmp_path
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeGeminiServer(latency=0.0) as server:
+        monkeypatch.setenv("GEMINI_API_KEY", "test")  # LLMAnalyzer exports the key; restore it afterwards
+        monkeypatch.setattr(batch_analyzer, "LLMAnalyzer",
+                            lambda api_key=None: LLMAnalyzer(api_key="test", base_url=server.base_url))
+        yield server
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_find_images_filters_and_recurses(shots):
+    top = find_images([str(shots)])
+    assert [os.path.basename(path) for path in top] == ["a.png", "b.jpg"]
+    assert len(find_images([str(shots)], recursive=True)) == 3
+    assert find_images([str(shots / "*.png"), str(shots / "a.png")]) == [str(shots / "a.png")]
+
+
+def test_load_completed_skips_errors_and_a_torn_last_line(tmp_path):
+    output = tmp_path / "answers.jsonl"
+    output.write_text(
+        json.dumps({'path': "a.png", 'question': QUESTION, 'answer': "A", 'error': None}) + "\n"
+        + json.dumps({'path': "b.png", 'question': QUESTION, 'answer': None, 'error': "timeout"}) + "\n"
+        + '{"path": "c.png", "quest'
+    )
+    assert load_completed(str(output)) == {("a.png", QUESTION)}
+    assert load_completed(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_run_batch_writes_one_record_per_image(shots, server):
+    paths = find_images([str(shots)], recursive=True) + [str(shots / "notes.txt")]
+    output = shots / "answers.jsonl"
+    analyzer = batch_analyzer.LLMAnalyzer()
+    
+    ok, failed = asyncio.run(run_batch(paths, QUESTION, analyzer, str(output), workers=1, concurrency=2,
+                                       max_size=128))
+    
+    assert (ok, failed) == (3, 1)
+    records = {record['path']: record for record in read_records(output)}
+    assert set(records) == set(paths)
+    assert records[str(shots / "notes.txt")]['error']
+    for path in paths[:3]:
+        assert records[path]['answer'] == server.answer
+        assert records[path]['bytes'] > 0
+    assert server.request_count == 3
+
+
+def test_cli_resumes_from_the_results_file(shots, server, capsys):
+    output = str(shots / "answers.jsonl")
+    argv = [str(shots), "-r", "-q", QUESTION, "-o", output, "--workers", "1", "--profile", "compact"]
+    
+    assert batch_analyzer.main(argv) == 0
+    assert len(read_records(output)) == 3
+    
+    assert batch_analyzer.main(argv) == 0
+    assert "Nothing to analyze" in capsys.readouterr().err
+    assert server.request_count == 3
+    
+    assert batch_analyzer.main(argv + ["--no-resume"]) == 0
+    assert len(read_records(output)) == 6
@@ -0,0 +1,67 @@
+"""
+parse_batch_answers: mapping a structured batch response back to the questions
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("google.genai")
+
+from llm_analyzer import batch_prompt, parse_batch_answers  # noqa: E402
+
+
+def response(*entries):
+    return json.dumps({"answers": [{"index": index, "answer": answer} for index, answer in entries]})
+
+
+def test_answers_follow_their_index_not_their_order():
+    text = response((2, "second"), (1, "first"), (3, "third"))
+    assert parse_batch_answers(text, 3) == ["first", "second", "third"]
+
+
+def test_zero_based_indexes_are_shifted():
+    text = response((0, "first"), (1, "second"), (2, "third"))
+    assert parse_batch_answers(text, 3) == ["first", "second", "third"]
+
+
+def test_out_of_range_index_falls_back_to_position():
+    text = response((1, "first"), (7, "second"), (3, "third"))
+    assert parse_batch_answers(text, 3) == ["first", "second", "third"]
+
+
+def test_repeated_index_does_not_overwrite():
+    text = response((1, "first"), (1, "second"))
+    assert parse_batch_answers(text, 2) == ["first", "second"]
+
+
+def test_non_numeric_index_uses_position():
+    text = json.dumps({"answers": [{"index": "one", "answer": "first"}, {"answer": "second"}]})
+    assert parse_batch_answers(text, 2) == ["first", "second"]
+
+
+def test_skipped_questions_are_empty():
+    text = response((2, "second"))
+    assert parse_batch_answers(text, 3) == ["", "second", ""]
+
+
+def test_extra_answers_are_ignored():
+    text = response((1, "first"), (2, "second"), (3, "extra"))
+    assert parse_batch_answers(text, 2) == ["first", "second"]
+
+
+def test_bare_list_is_accepted():
+    text = json.dumps([{"index": 1, "answer": " first "}])
+    assert parse_batch_answers(text, 1) == ["first"]
+
+
+@pytest.mark.parametrize("text", ["not json", json.dumps({"result": "x"}), json.dumps("text")])
+def test_malformed_response_raises_value_error(text):
+    with pytest.raises(ValueError):
+        parse_batch_answers(text, 2)
+
+
+def test_prompt_numbers_questions_from_one():
+    prompt = batch_prompt(["What is open?", "Any errors?"])
+    assert prompt.endswith("1. What is open?\n2. Any errors?")
@@ -0,0 +1,96 @@
+"""
+CaptureWorker with a fake capture source: on-demand grabs, the ring buffer,
+errors and stopping
+"""
+
+import itertools
+import time
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("mss")
+
+from PIL import Image  # noqa: E402
+
+from capture_worker import CaptureWorker  # noqa: E402
+
+
+class FakeSource:
+    """Capture source returning numbered frames and reporting their bounds like a screen grab"""
+    
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.count = itertools.count()
+    
+    def __call__(self, capturer):
+        if self.fail:
+            raise OSError("grab failed")
+        number = next(self.count)
+        capturer.last_bounds = (0, 0, 64, 48)
+        capturer.last_timings = {'capture_ms': 1.0}
+        return Image.new('RGB', (64, 48), (number % 256, 0, 0))
+
+
+@pytest.fixture
+def worker():
+    worker = CaptureWorker(buffer_size=3)
+    yield worker
+    worker.stop()
+
+
+def test_grab_now_returns_the_frame_and_latest_sees_it(worker):
+    assert worker.latest() is None
+    source = FakeSource()
+    frame = worker.grab_now(source).result(timeout=5)
+    time.sleep(0.05)
+    
+    assert next(source.count) == 1  # Switching the source did not cost a second grab
+    assert worker.latest() is frame
+    assert frame.image.size == (64, 48)
+    assert frame.bounds == (0, 0, 64, 48)
+    assert frame.timings == {'capture_ms': 1.0}
+
+
+def test_periodic_capture_keeps_the_newest_frames(worker):
+    worker.set_source(FakeSource())
+    worker.set_interval(0.01)
+    deadline = time.monotonic() + 5
+    while worker.latest() is None or worker.latest().image.getpixel((0, 0))[0] < 5:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    worker.set_interval(None)
+    
+    frames = worker.frames()
+    assert len(frames) == 3
+    assert [frame.timestamp for frame in frames] == sorted(frame.timestamp for frame in frames)
+    assert frames[-1] is worker.latest()
+
+
+def test_set_source_clears_the_buffer(worker):
+    old = worker.grab_now(FakeSource()).result(timeout=5)
+    worker.set_source(FakeSource())
+    assert old not in worker.frames()
+
+
+def test_errors_reach_the_caller_and_clear_on_success(worker):
+    with pytest.raises(RuntimeError):
+        worker.grab_now().result(timeout=5)
+    
+    with pytest.raises(OSError):
+        worker.grab_now(FakeSource(fail=True)).result(timeout=5)
+    assert isinstance(worker.last_error, OSError)
+    
+    worker.grab_now(FakeSource()).result(timeout=5)
+    assert worker.last_error is None
+
+
+def test_stop_ends_periodic_capture(worker):
+    worker.set_source(FakeSource())
+    worker.set_interval(0.01)
+    worker.grab_now().result(timeout=5)
+    worker.stop()
+    
+    count = len(worker.frames())
+    time.sleep(0.05)
+    assert len(worker.frames()) == count
@@ -0,0 +1,82 @@
+"""
+ChatSession against the local fake Gemini server: the capture is uploaded
+once and follow-up questions send only their text
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("google.genai")
+
+from fake_gemini_server import FakeGeminiServer  # noqa: E402
+from llm_analyzer import LLMAnalyzer  # noqa: E402
+
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64
+QUESTIONS = ["What is on this screen?", "What should I click next?", "Is anything missing?"]
+
+
+@pytest.fixture
+def server():
+    with FakeGeminiServer(latency=0.0) as server:
+        yield server
+
+
+@pytest.fixture
+def analyzer(server, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")  # LLMAnalyzer exports the key; restore it afterwards
+    return LLMAnalyzer(api_key="test", base_url=server.base_url)
+
+
+def ask(session, questions):
+    """Ask the questions in turn, then close the session; returns the answers"""
+    async def run():
+        answers = []
+        for question in questions:
+            answers.append("".join([chunk async for chunk in session.stream_async(question)]))
+        await session.close_async()
+        return answers
+    return asyncio.run(run())
+
+
+def parts(contents, key):
+    """All parts of a request's contents that carry key (e.g. 'fileData')"""
+    return [part for content in contents for part in content.get('parts', []) if key in part]
+
+
+def test_image_uploaded_once_and_not_resent(server, analyzer):
+    session = analyzer.chat_session(IMAGE, "image/png")
+    answers = ask(session, QUESTIONS)
+    
+    assert answers == [server.answer] * len(QUESTIONS)
+    assert server.upload_bytes == [len(IMAGE)]
+    assert server.request_count == len(QUESTIONS)
+    for contents in server.contents:
+        # The history references the uploaded file; the bytes never go inline
+        assert parts(contents, 'inlineData') == []
+        assert len(parts(contents, 'fileData')) == 1
+    for contents in server.contents[1:]:
+        # Follow-up turns are text only
+        assert [list(part) for part in contents[-1]['parts']] == [['text']]
+        assert contents[-1]['parts'][0]['text'] in QUESTIONS
+    assert max(server.request_bytes) < len(IMAGE)
+
+
+def test_close_deletes_the_upload(server, analyzer):
+    session = analyzer.chat_session(IMAGE, "image/png")
+    ask(session, QUESTIONS[:1])
+    
+    assert session.uploaded_file is None
+    assert server.files == {}
+
+
+def test_inline_session_sends_image_with_first_turn_only(server, analyzer):
+    session = analyzer.chat_session(IMAGE, "image/png", upload=False)
+    ask(session, QUESTIONS)
+    
+    assert server.upload_bytes == []
+    assert len(parts(server.contents[0], 'inlineData')) == 1
+    for contents in server.contents[1:]:
+        assert [list(part) for part in contents[-1]['parts']] == [['text']]
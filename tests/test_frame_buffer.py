@@ -0,0 +1,84 @@
+"""
+FrameBuffer: downscaling, delta encoding, eviction and time windows
+"""
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from frame_buffer import FrameBuffer  # noqa: E402
+import image_codec  # noqa: E402
+
+
+def frame(step, size=(320, 200)):
+    """A flat frame with a box that moves with step"""
+    image = Image.new('RGB', size, (230, 230, 230))
+    ImageDraw.Draw(image).rectangle([step * 10, 20, step * 10 + 40, 60], fill=(200, 30, 30))
+    return image
+
+
+def test_frames_are_downscaled_and_decode_exactly():
+    buffer = FrameBuffer(max_size=160)
+    originals = [frame(step) for step in range(4)]
+    for step, image in enumerate(originals):
+        buffer.add(100.0 + step, image)
+    
+    decoded = buffer.window(0)
+    assert [timestamp for timestamp, _ in decoded] == [100.0, 101.0, 102.0, 103.0]
+    for (_, image), original in zip(decoded, originals):
+        assert image.size == (160, 100)
+        assert image.tobytes() == image_codec.resize_image(original, (160, 100)).tobytes()
+    assert buffer.stats()['keyframes'] == 1
+
+
+def test_delta_frames_round_trip():
+    buffer = FrameBuffer(max_size=320, keyframe_interval=3)
+    originals = [frame(step) for step in range(5)]
+    for step, image in enumerate(originals):
+        buffer.add(float(step), image)
+    
+    assert buffer.stats()['keyframes'] == 2
+    for (_, image), original in zip(buffer.window(0), originals):
+        assert image.tobytes() == original.tobytes()
+
+
+def test_max_frames_evicts_oldest():
+    buffer = FrameBuffer(max_size=64, max_frames=3)
+    for step in range(6):
+        buffer.add(float(step), frame(step))
+    
+    assert len(buffer) == 3
+    assert [timestamp for timestamp, _ in buffer.window(0)] == [3.0, 4.0, 5.0]
+
+
+def test_memory_budget_is_respected_after_eviction():
+    buffer = FrameBuffer(max_size=320, memory_budget=4000, keyframe_interval=2)
+    for step in range(20):
+        buffer.add(float(step), frame(step % 10))
+    
+    stats = buffer.stats()
+    assert stats['bytes'] <= 4000 or stats['frames'] == 1
+    # Bytes of every stored frame (and keyframes still referenced) are accounted for
+    kept = {id(f): f for f in buffer._frames}
+    kept.update({id(f.base): f.base for f in buffer._frames if f.base is not None})
+    assert stats['bytes'] == sum(len(f.data) for f in kept.values())
+
+
+def test_window_limits_and_spaces_frames():
+    buffer = FrameBuffer(max_size=32)
+    for step in range(10):
+        buffer.add(float(step), frame(step))
+    
+    timestamps = [timestamp for timestamp, _ in buffer.window(2.0, 8.0, max_frames=3)]
+    assert timestamps == [2.0, 5.0, 8.0]
+    assert [timestamp for timestamp, _ in buffer.window(0, max_frames=1)] == [9.0]
+
+
+def test_clear():
+    buffer = FrameBuffer(max_size=32)
+    buffer.add(1.0, frame(0))
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.stats()['bytes'] == 0
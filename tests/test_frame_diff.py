@@ -0,0 +1,78 @@
+"""
+FrameChangeDetector and changed_region on text-like screens
+"""
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from frame_diff import FrameChangeDetector, changed_region  # noqa: E402
+
+QUESTION = "Question 1: What is the capital of France?"
+
+
+def page(question=QUESTION, new_line=None, clock="12:00"):
+    """A 1080p page of body text with a question line and a small clock"""
+    font = ImageFont.load_default(size=16)
+    image = Image.new('RGB', (1920, 1080), 'white')
+    draw = ImageDraw.Draw(image)
+    for row in range(20):
+        draw.text((100, 100 + row * 24), "Lorem ipsum dolor sit amet, consectetur adipiscing elit",
+                  fill='black', font=font)
+    draw.text((100, 700), question, fill='black', font=font)
+    if new_line:
+        draw.text((100, 730), new_line, fill='black', font=font)
+    draw.text((1800, 1050), clock, fill='black', font=font)
+    return image
+
+
+def differs(detector, a, b):
+    return detector.differs(detector.signature(a), detector.signature(b))
+
+
+def test_identical_frames_are_unchanged():
+    detector = FrameChangeDetector(threshold=0)
+    assert not differs(detector, page(), page())
+
+
+def test_swapped_question_text_is_a_change():
+    detector = FrameChangeDetector()
+    before, after = page(), page("Question 2: Which planet is the largest one?")
+    assert detector.signature(before).hash == detector.signature(after).hash
+    assert differs(detector, before, after)
+    assert differs(FrameChangeDetector(threshold=0), before, after)
+
+
+def test_new_line_of_text_is_a_change():
+    detector = FrameChangeDetector()
+    assert differs(detector, page(), page(new_line="A brand new line of text appears here"))
+
+
+def test_ticking_clock_stays_below_the_default_threshold():
+    detector = FrameChangeDetector()
+    assert not differs(detector, page(), page(clock="12:01"))
+    assert differs(FrameChangeDetector(threshold=0), page(), page(clock="12:01"))
+
+
+def test_size_change_is_a_change():
+    detector = FrameChangeDetector()
+    assert differs(detector, page(), page().resize((1280, 720)))
+
+
+def test_reference_only_advances_on_change():
+    detector = FrameChangeDetector()
+    assert detector.has_changed(page())
+    assert not detector.has_changed(page(clock="12:01"))
+    assert detector.has_changed(page("Question 2: Which planet is the largest one?"))
+    assert (detector.sent_count, detector.skipped_count) == (2, 1)
+
+
+def test_changed_region_covers_the_edited_line():
+    box = changed_region(page(), page("Question 2: Which planet is the largest one?"))
+    assert box is not None
+    left, top, right, bottom = box
+    assert 100 <= left < right and top <= 700 and bottom >= 716
+    assert bottom - top < 100
+    assert changed_region(page(), page()) is None
@@ -0,0 +1,75 @@
+"""
+HistoryStore: deduplicated inserts and search
+"""
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image  # noqa: E402
+
+from history_store import HistoryStore, fts_query  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    yield store
+    store.close()
+
+
+def add(store, *args, **kwargs):
+    store.add(*args, **kwargs)
+    assert store.flush()
+
+
+def test_same_answer_about_same_frame_is_stored_once(store):
+    add(store, "What is open?", "An editor", "model", image_data=b"frame", image=Image.new('RGB', (64, 48)))
+    first = store.search()[0]
+    add(store, "What is open?", "An editor", "model", image_data=b"frame")
+    
+    entries = store.search()
+    assert len(entries) == 1
+    assert entries[0].id == first.id
+    assert entries[0].created >= first.created  # Upsert refreshes the time
+    assert store.count() == (1, 1)
+    assert store.thumbnail(first.frame_hash)
+
+
+def test_entries_without_a_frame_are_deduplicated(store):
+    add(store, "Summarize", "Text only", "model")
+    add(store, "Summarize", "Text only", "model")
+    add(store, "Summarize", "Text only", None)
+    add(store, "Summarize", "Text only", None)
+    assert store.count() == (2, 0)
+    assert {entry.frame_hash for entry in store.search()} == {None}
+
+
+def test_different_answers_and_frames_are_kept(store):
+    add(store, "Q", "A", "model", image_data=b"one")
+    add(store, "Q", "A", "model", image_data=b"two")
+    add(store, "Q", "B", "model", image_data=b"two")
+    assert store.count() == (3, 2)
+
+
+def test_search_matches_word_prefixes_newest_first(store):
+    add(store, "Which error?", "A timeout in the upload", "model", timings={'total_ms': 12.5})
+    add(store, "Next step?", "Retry the upload", "model")
+    
+    assert [entry.question for entry in store.search("uplo")] == ["Next step?", "Which error?"]
+    assert [entry.question for entry in store.search("timeout")] == ["Which error?"]
+    assert store.search("timeout")[0].timings == {'total_ms': 12.5}
+    assert store.search('"quoted') == []
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query('say "hi" now') == '"say"* """hi"""* "now"*'
+    assert fts_query("   ") is None
+
+
+def test_write_errors_are_recorded(store):
+    store.add("Q", "A", "model", image_data=b"frame", image="not an image")
+    assert store.flush()
+    assert store.last_error is not None
+    add(store, "Q", "A", "model")
+    assert store.last_error is None
@@ -0,0 +1,110 @@
+"""
+image_codec: token estimates, downscale targets, resizing and per-profile encoding
+"""
+
+import io
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image, features  # noqa: E402
+
+import image_codec  # noqa: E402
+from image_codec import (encode_frame, estimate_image_tokens, is_text_like, make_thumbnail,  # noqa: E402
+                         resize_image, scale_for_budget)
+from synthetic import make_frame, make_photo_frame  # noqa: E402
+
+WEBP = features.check('webp')
+
+
+@pytest.fixture(scope="module")
+def text_frame():
+    return make_frame(1920, 1080)
+
+
+@pytest.fixture(scope="module")
+def photo_frame():
+    return make_photo_frame(1920, 1080)
+
+
+def test_token_estimate_uses_tiles():
+    assert estimate_image_tokens((384, 200)) == 258
+    assert estimate_image_tokens((768, 768)) == 258
+    assert estimate_image_tokens((1920, 1080)) == 3 * 2 * 258
+
+
+@pytest.mark.parametrize("size", [(1920, 1080), (2560, 1440), (1080, 1920), (5000, 400)])
+@pytest.mark.parametrize("budget", [258, 1032, 1120])
+def test_scale_for_budget_fits_the_budget(size, budget):
+    scale = scale_for_budget(size, budget)
+    assert 0 < scale <= 1
+    scaled = tuple(int(dim * scale) for dim in size)
+    assert estimate_image_tokens(scaled) <= budget
+
+
+def test_small_images_are_not_scaled():
+    assert scale_for_budget((640, 480), 1032) == 1.0
+
+
+def test_content_heuristic(text_frame, photo_frame):
+    assert is_text_like(text_frame)
+    assert not is_text_like(photo_frame)
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_resize_image_hits_the_target(text_frame, fast):
+    assert resize_image(text_frame, (640, 360), fast=fast).size == (640, 360)
+    assert resize_image(text_frame, text_frame.size, fast=fast) is text_frame
+
+
+def test_thumbnail_fits_the_box_and_is_rgb(text_frame):
+    thumb = make_thumbnail(text_frame.convert('RGBA'), (400, 300))
+    assert thumb.mode == 'RGB'
+    assert thumb.size == (400, 225)
+
+
+def decode(encoded):
+    image = Image.open(io.BytesIO(encoded.data))
+    assert image.format == encoded.format
+    assert image.size == encoded.size == encoded.image.size
+    assert Image.MIME[image.format] == encoded.mime_type
+    return image
+
+
+def test_lossless_profile_matches_the_original_encoding(text_frame, photo_frame):
+    for frame in (text_frame, photo_frame):
+        encoded = encode_frame(frame, 'lossless')
+        assert encoded.format == 'PNG'
+        assert max(decode(encoded).size) == 1024
+
+
+def test_auto_profile_picks_the_codec_from_the_content(text_frame, photo_frame):
+    text = encode_frame(text_frame, 'auto')
+    photo = encode_frame(photo_frame, 'auto')
+    assert text.format == 'PNG'
+    assert photo.format == ('WEBP' if WEBP else 'JPEG')
+    for encoded in (text, photo):
+        decode(encoded)
+        assert estimate_image_tokens(encoded.size) <= image_codec.DEFAULT_IMAGE_TOKEN_BUDGET
+        assert 0 <= encoded.resize_ms <= encoded.encode_ms
+
+
+def test_compact_profile_is_lossy_and_smaller(text_frame, photo_frame):
+    assert encode_frame(text_frame, 'compact').format == ('WEBP' if WEBP else 'JPEG')
+    compact = encode_frame(photo_frame, 'compact')
+    assert compact.format == 'JPEG'
+    decode(compact)
+    assert len(compact.data) < len(encode_frame(photo_frame, 'lossless').data)
+
+
+def test_model_budget_sets_the_size(text_frame):
+    budget = image_codec.IMAGE_TOKEN_BUDGETS["gemini-3-flash-preview"]
+    encoded = encode_frame(text_frame, 'auto', model="gemini-3-flash-preview")
+    assert estimate_image_tokens(encoded.size) <= budget
+    assert encode_frame(text_frame, 'auto', model="unknown-model").size == encode_frame(text_frame, 'auto').size
+
+
+def test_non_rgb_input_is_converted(text_frame):
+    encoded = encode_frame(text_frame.convert('RGBA'), 'compact')
+    assert decode(encoded).mode == 'RGB'
@@ -0,0 +1,150 @@
+"""
+LLMAnalyzer against the local fake Gemini server: encoded bytes are sent
+inline as they are, streamed answers arrive in chunks, repeats hit the cache,
+several images go in one request after their captions
+"""
+
+import asyncio
+import base64
+import io
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("google.genai")
+
+from PIL import Image  # noqa: E402
+
+from fake_gemini_server import FakeGeminiServer  # noqa: E402
+from llm_analyzer import LLMAnalyzer, sniff_mime_type  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+QUESTION = "What is on this screen?"
+
+
+def encode(image_format, size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (40, 120, 200)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+PNG, JPEG, WEBP = encode('PNG'), encode('JPEG'), encode('WEBP')
+
+
+@pytest.fixture
+def server():
+    with FakeGeminiServer(latency=0.0, stream_chunks=4) as server:
+        yield server
+
+
+@pytest.fixture
+def analyzer(server, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")  # LLMAnalyzer exports the key; restore it afterwards
+    return LLMAnalyzer(api_key="test", base_url=server.base_url, cache=ResponseCache(max_entries=8))
+
+
+def texts(contents):
+    return [part['text'] for content in contents for part in content.get('parts', []) if 'text' in part]
+
+
+def inline_images(contents):
+    """(MIME type, bytes) of each inline image in a request's contents"""
+    images = []
+    for content in contents:
+        for part in content.get('parts', []):
+            if 'inlineData' in part:
+                inline = part['inlineData']
+                mime_type = inline.get('mimeType', inline.get('mime_type'))
+                images.append((mime_type, base64.urlsafe_b64decode(inline['data'])))
+    return images
+
+
+def test_sniff_mime_type():
+    assert sniff_mime_type(PNG) == "image/png"
+    assert sniff_mime_type(JPEG) == "image/jpeg"
+    assert sniff_mime_type(WEBP) == "image/webp"
+
+
+def test_encoded_bytes_are_sent_inline_unchanged(server, analyzer):
+    answer = analyzer.analyze_image_data(JPEG, QUESTION, mime_type="image/jpeg")
+    
+    assert answer == server.answer
+    contents = server.contents[0]
+    assert texts(contents) == [QUESTION]
+    assert inline_images(contents) == [("image/jpeg", JPEG)]
+
+
+def test_base64_wrapper_detects_the_format(server, analyzer):
+    analyzer.analyze_image(base64.b64encode(WEBP).decode(), QUESTION)
+    assert inline_images(server.contents[0]) == [("image/webp", WEBP)]
+
+
+def test_repeated_request_is_served_from_the_cache(server, analyzer):
+    first = analyzer.analyze_image_data(PNG, QUESTION)
+    second = asyncio.run(analyzer.analyze_image_data_async(PNG, "  what is on this SCREEN? "))
+    assert first == second == server.answer
+    assert server.request_count == 1
+    
+    analyzer.analyze_image_data(PNG, "Something else?")
+    assert server.request_count == 2
+
+
+def test_stream_yields_chunks_and_caches_the_answer(server, analyzer):
+    chunks = list(analyzer.stream_image_data(PNG, QUESTION))
+    
+    assert len(chunks) > 1
+    assert "".join(chunks) == server.answer
+    assert list(analyzer.stream_image_data(PNG, QUESTION)) == [server.answer]
+    assert server.request_count == 1
+
+
+def test_async_stream(server, analyzer):
+    async def collect():
+        return [chunk async for chunk in analyzer.stream_image_data_async(JPEG, QUESTION, mime_type="image/jpeg")]
+    
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 1
+    assert "".join(chunks) == server.answer
+    assert inline_images(server.contents[0]) == [("image/jpeg", JPEG)]
+
+
+def request_parts(contents):
+    """The request's parts in order: text, or (MIME type, bytes) for inline images"""
+    sequence = []
+    for content in contents:
+        for part in content.get('parts', []):
+            sequence.append(part['text'] if 'text' in part else inline_images([{'parts': [part]}])[0])
+    return sequence
+
+
+def test_images_follow_their_captions_in_order(server, analyzer):
+    images = [(PNG, "image/png"), (JPEG, "image/jpeg"), (WEBP, "image/webp")]
+    answer = analyzer.analyze_images(images, QUESTION, captions=["Before:", "", "After:"])
+    
+    assert answer == server.answer
+    assert server.request_count == 1
+    assert request_parts(server.contents[0]) == [
+        QUESTION, "Before:", ("image/png", PNG), ("image/jpeg", JPEG), "After:", ("image/webp", WEBP),
+    ]
+
+
+def test_images_without_captions(server, analyzer):
+    asyncio.run(analyzer.analyze_images_async([(PNG, "image/png"), (JPEG, "image/jpeg")], QUESTION))
+    assert request_parts(server.contents[0]) == [QUESTION, ("image/png", PNG), ("image/jpeg", JPEG)]
+
+
+def test_multi_image_cache_key_covers_order_and_captions(server, analyzer):
+    images = [(PNG, "image/png"), (JPEG, "image/jpeg")]
+    analyzer.analyze_images(images, QUESTION, captions=["One", "Two"])
+    asyncio.run(analyzer.analyze_images_async(images, QUESTION, captions=["One", "Two"]))
+    assert server.request_count == 1
+    
+    analyzer.analyze_images(images, QUESTION, captions=["Two", "One"])
+    analyzer.analyze_images(images[::-1], QUESTION, captions=["One", "Two"])
+    assert server.request_count == 3
+
+
+def test_caption_count_must_match(analyzer):
+    with pytest.raises(ValueError):
+        analyzer.analyze_images([(PNG, "image/png")], QUESTION, captions=["One", "Two"])
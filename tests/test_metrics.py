@@ -0,0 +1,97 @@
+"""
+Metrics: histograms, per-analysis breakdown and exports
+"""
+
+import json
+
+import pytest
+
+from metrics import Histogram, Metrics, breakdown, percentile
+
+
+def test_percentile_nearest_rank():
+    ordered = list(range(1, 101))
+    assert percentile(ordered, 50) == 50
+    assert percentile(ordered, 95) == 95
+    assert percentile(ordered, 100) == 100
+    assert percentile([7], 99) == 7
+
+
+def test_histogram_buckets_and_rolling_window():
+    histogram = Histogram((10, 100), window=3)
+    for value in (5, 50, 500, 20):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.count == 4
+    assert sorted(histogram.recent()) == [20, 50, 500]
+    summary = histogram.summary()
+    assert summary['last'] == 20
+    assert summary['max'] == 500
+    assert summary['p50'] == 50
+
+
+def test_observe_ignores_none_and_clamps_negative():
+    metrics = Metrics()
+    metrics.observe('encode', None)
+    metrics.observe('encode', -3)
+    assert metrics.snapshot()['durations_ms']['encode']['count'] == 1
+    assert metrics.last() == {'encode': 0.0}
+
+
+def test_observe_timings_uses_ms_keys():
+    metrics = Metrics()
+    metrics.observe_timings({'capture_ms': 12.0, 'convert_ms': 3.0, 'bounds': (0, 0, 1, 1)})
+    assert metrics.last() == {'capture': 12.0, 'convert': 3.0}
+
+
+def test_timer_records_its_block():
+    metrics = Metrics()
+    with metrics.timer('render'):
+        pass
+    assert metrics.snapshot()['durations_ms']['render']['count'] == 1
+
+
+def test_breakdown_of_one_run_in_stage_order():
+    stages = {'total': 812.4, 'capture': 21.6, 'extra': 1.0, 'encode': 40.2, 'resize': None}
+    assert breakdown(stages) == "capture 22 · encode 40 · total 812 · extra 1 ms"
+    assert breakdown({}) == ""
+    assert breakdown({'capture': None}) == ""
+
+
+def test_prometheus_export(tmp_path):
+    metrics = Metrics()
+    metrics.observe('total', 1500)
+    metrics.observe_size('image', 2000)
+    text = metrics.to_prometheus()
+    assert '# TYPE answerlens_stage_duration_seconds histogram' in text
+    assert 'answerlens_stage_duration_seconds_bucket{stage="total",le="1"} 0' in text
+    assert 'answerlens_stage_duration_seconds_bucket{stage="total",le="2.5"} 1' in text
+    assert 'answerlens_stage_duration_seconds_bucket{stage="total",le="+Inf"} 1' in text
+    assert 'answerlens_stage_duration_seconds_sum{stage="total"} 1.5' in text
+    assert 'answerlens_payload_size_count{kind="image"} 1' in text
+    
+    path = tmp_path / "out" / "metrics.prom"
+    metrics.export(str(path))
+    assert path.read_text() == text
+
+
+def test_json_export(tmp_path):
+    metrics = Metrics()
+    metrics.observe('encode', 4.0)
+    path = tmp_path / "metrics.json"
+    metrics.export(str(path))
+    data = json.loads(path.read_text())
+    assert data['durations_ms']['encode']['count'] == 1
+    assert data['sizes'] == {}
+    assert not (tmp_path / "metrics.json.tmp").exists()
+
+
+@pytest.mark.parametrize("stage", ['capture', 'total'])
+def test_snapshot_summaries(stage):
+    metrics = Metrics(window=10)
+    for value in range(1, 21):
+        metrics.observe(stage, value)
+    summary = metrics.snapshot()['durations_ms'][stage]
+    assert summary['count'] == 20
+    assert summary['p50'] == 15  # Over the last 10 samples
+    assert summary['sum'] == 210
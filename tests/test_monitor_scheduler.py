@@ -0,0 +1,78 @@
+"""
+MonitorScheduler: debounce, interval bounds and overdue changes
+"""
+
+from monitor_scheduler import MonitorScheduler
+
+
+def test_waits_for_the_screen_to_settle():
+    scheduler = MonitorScheduler(debounce=1.5, min_interval=0, max_interval=None)
+    assert not scheduler.observe(0.0, moving=True, dirty=True)
+    assert scheduler.pending
+    assert not scheduler.observe(1.0, moving=False, dirty=True)
+    assert scheduler.observe(1.5, moving=False, dirty=True)
+
+
+def test_first_change_without_motion_fires_immediately():
+    scheduler = MonitorScheduler()
+    assert scheduler.observe(0.0, moving=False, dirty=True)
+
+
+def test_unchanged_screen_never_fires():
+    scheduler = MonitorScheduler(debounce=0, min_interval=0)
+    assert not any(scheduler.observe(float(t), moving=False, dirty=False) for t in range(10))
+    assert not scheduler.pending
+
+
+def test_min_interval_after_firing():
+    scheduler = MonitorScheduler(debounce=0, min_interval=5.0)
+    assert scheduler.observe(0.0, moving=False, dirty=True)
+    scheduler.fired(0.0)
+    assert not scheduler.pending
+    assert not scheduler.observe(4.9, moving=False, dirty=True)
+    assert scheduler.observe(5.0, moving=False, dirty=True)
+
+
+def test_min_interval_override_stretches_the_wait():
+    scheduler = MonitorScheduler(debounce=0, min_interval=5.0)
+    scheduler.fired(0.0)
+    assert not scheduler.observe(6.0, moving=False, dirty=True, min_interval=10.0)
+    assert scheduler.observe(10.0, moving=False, dirty=True, min_interval=10.0)
+
+
+def test_screen_that_never_settles_fires_at_max_interval():
+    scheduler = MonitorScheduler(debounce=1.5, min_interval=0, max_interval=10.0)
+    fired = [t for t in range(12) if scheduler.observe(float(t), moving=True, dirty=True)]
+    assert fired == [10, 11]
+
+
+def test_change_reverting_clears_the_pending_state():
+    scheduler = MonitorScheduler(debounce=1.5, min_interval=0, max_interval=10.0)
+    scheduler.observe(0.0, moving=True, dirty=True)
+    scheduler.observe(1.0, moving=True, dirty=False)
+    assert not scheduler.pending
+    # The overdue clock restarts with the next change
+    assert not scheduler.observe(10.0, moving=True, dirty=True)
+    assert scheduler.observe(20.0, moving=True, dirty=True)
+
+
+def test_reset():
+    scheduler = MonitorScheduler(debounce=0, min_interval=60)
+    scheduler.fired(0.0)
+    scheduler.reset()
+    assert scheduler.observe(1.0, moving=False, dirty=True)
+
+
+def test_unchanged_polls_count_one_skip_per_interval():
+    scheduler = MonitorScheduler(debounce=0, min_interval=5.0)
+    scheduler.fired(0.0)
+    polls = [t / 2 for t in range(1, 31)]  # Every 0.5 s for 15 s
+    skips = [t for t in polls if scheduler.skipped(t)]
+    assert skips == [5.0, 10.0, 15.0]
+
+
+def test_skips_follow_a_stretched_interval():
+    scheduler = MonitorScheduler(debounce=0, min_interval=5.0)
+    scheduler.fired(0.0)
+    assert not scheduler.skipped(6.0, min_interval=20.0)
+    assert scheduler.skipped(20.0, min_interval=20.0)
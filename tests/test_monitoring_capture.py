@@ -0,0 +1,73 @@
+"""
+Monitoring polls in the app: the frame that is analyzed becomes the current
+capture, including its per-monitor shots in All Monitors mode (needs a display)
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("google.genai")
+
+from capture_worker import Frame  # noqa: E402
+from fake_gemini_server import FakeGeminiServer  # noqa: E402
+from llm_analyzer import LLMAnalyzer  # noqa: E402
+from synthetic import make_frame, make_photo_frame  # noqa: E402
+
+MONITORS = [(1, (0, 0, 640, 360)), (2, (640, 0, 640, 360))]
+
+
+@pytest.fixture
+def app(gui_app, monkeypatch):
+    import tkinter as tk
+    
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    with FakeGeminiServer(latency=0.0) as server:
+        gui_app.analyzer = LLMAnalyzer(api_key="test", base_url=server.base_url)
+        monkeypatch.setattr(gui_app.capturer, "list_monitors", lambda: MONITORS)
+        gui_app.question_text.delete("1.0", tk.END)
+        gui_app.question_text.insert("1.0", "What is on screen?")
+        gui_app.debounce_var.set(0)
+        gui_app.min_interval_var.set(0)
+        yield gui_app
+
+
+def pump(app, condition, timeout=10.0):
+    """Run the Tk event loop until condition() holds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the app"
+        app.root.update()
+        time.sleep(0.01)
+
+
+def poll(app, image):
+    """Feed one monitoring frame covering both monitors and wait for its analysis"""
+    frame = Frame(time.time(), image, (0, 0) + image.size)
+    app._poll_frame(frame)
+    assert app.current_image is image
+    pump(app, lambda: not app.analyses_in_flight)
+    return frame
+
+
+def test_all_monitors_poll_becomes_the_current_capture(app):
+    app.capture_mode.set("monitors")
+    image = make_frame(1280, 360)
+    poll(app, image)
+    
+    assert app.current_image is image
+    assert [shot.number for shot, _ in app.current_monitors] == [1, 2]
+    assert app.current_monitors[1][0].image.tobytes() == image.crop((640, 0, 1280, 360)).tobytes()
+
+
+def test_stale_monitor_shots_are_dropped_by_a_fullscreen_poll(app):
+    app.capture_mode.set("monitors")
+    poll(app, make_frame(1280, 360))
+    assert app.current_monitors
+    
+    app.capture_mode.set("fullscreen")
+    image = make_photo_frame(1280, 360)
+    poll(app, image)
+    assert app.current_image is image
+    assert app.current_monitors is None
+    pump(app, lambda: app.current_image_bytes is not None)
@@ -0,0 +1,94 @@
+"""
+multi_monitor: monitor selection, desktop layout (split and composite) and
+parallel capture/encode with a fake screen
+"""
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("mss")
+
+from PIL import Image  # noqa: E402
+
+import multi_monitor  # noqa: E402
+from multi_monitor import (MonitorShot, MultiMonitorCapture, composite, parse_monitor_selection,  # noqa: E402
+                           split_frame)
+
+# A 1280x720 monitor left of the primary and a taller one to its right, top-aligned at -120
+LAYOUT = [(1, (0, 0, 1920, 1080)), (2, (-1280, 0, 1280, 720)), (3, (1920, -120, 1080, 1920))]
+COLORS = {1: (200, 30, 30), 2: (30, 200, 30), 3: (30, 30, 200)}
+
+
+def shots():
+    return [MonitorShot(number, bounds, Image.new('RGB', bounds[2:], COLORS[number]), 0.0)
+            for number, bounds in LAYOUT]
+
+
+def test_parse_monitor_selection():
+    assert parse_monitor_selection("all", 3) == [1, 2, 3]
+    assert parse_monitor_selection(" ", 2) == [1, 2]
+    assert parse_monitor_selection("3; 1,1", 3) == [1, 3]
+    with pytest.raises(ValueError):
+        parse_monitor_selection("4", 3)
+    with pytest.raises(ValueError):
+        parse_monitor_selection(",", 3)
+
+
+def test_composite_places_monitors_in_the_desktop_layout():
+    image = composite(shots())
+    assert image.size == (1280 + 1920 + 1080, 1920)
+    # Desktop origin is (-1280, -120)
+    assert image.getpixel((0, 120)) == COLORS[2]
+    assert image.getpixel((1280, 120)) == COLORS[1]
+    assert image.getpixel((1280 + 1920, 0)) == COLORS[3]
+    assert image.getpixel((0, 0)) == (0, 0, 0)  # Gap above monitor 2
+
+
+def test_split_frame_inverts_composite():
+    image = composite(shots())
+    frame_bounds = (-1280, -120) + image.size
+    split = split_frame(image, frame_bounds, LAYOUT)
+    assert [shot.number for shot in split] == [1, 2, 3]
+    for shot, original in zip(split, shots()):
+        assert shot.bounds == original.bounds
+        assert shot.image.tobytes() == original.image.tobytes()
+
+
+def test_split_frame_skips_monitors_outside_the_frame():
+    image = Image.new('RGB', (1920, 1080))
+    assert [shot.number for shot in split_frame(image, (0, 0, 1920, 1080), LAYOUT)] == [1]
+
+
+class FakeScreenCapture:
+    """ScreenCapture stand-in drawing each monitor in its own color"""
+    
+    closed = 0
+    
+    def __init__(self):
+        self.last_bounds = None
+    
+    def capture_screen(self, monitor_number=1):
+        self.last_bounds = dict(LAYOUT)[monitor_number]
+        return Image.new('RGB', self.last_bounds[2:], COLORS[monitor_number])
+    
+    def close(self):
+        FakeScreenCapture.closed += 1
+
+
+def test_capture_and_encode_keep_the_requested_order(monkeypatch):
+    monkeypatch.setattr(multi_monitor, "ScreenCapture", FakeScreenCapture)
+    FakeScreenCapture.closed = 0
+    capture = MultiMonitorCapture(max_workers=3)
+    try:
+        captured = capture.capture([3, 1])
+        encoded = capture.encode(captured, 'compact')
+    finally:
+        capture.close()
+    
+    assert [shot.number for shot in captured] == [3, 1]
+    assert [shot.bounds for shot in captured] == [dict(LAYOUT)[3], dict(LAYOUT)[1]]
+    assert all(shot.capture_ms >= 0 for shot in captured)
+    # Portrait monitor 3 stays portrait after encoding
+    assert encoded[0].size[1] > encoded[0].size[0]
+    assert encoded[1].size[0] > encoded[1].size[1]
+    assert FakeScreenCapture.closed >= 1
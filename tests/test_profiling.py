@@ -0,0 +1,81 @@
+"""
+Profiler: settings, wrapping and reports
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from profiling import DEFAULT_DIRECTORY, DEFAULT_INTERVAL, Profiler
+
+
+@pytest.mark.parametrize("option, environ, enabled, directory", [
+    (None, {}, False, None),
+    (None, {'ANSWERLENS_PROFILE': '0'}, False, None),
+    (None, {'ANSWERLENS_PROFILE': 'off'}, False, None),
+    (None, {'ANSWERLENS_PROFILE': '1'}, True, DEFAULT_DIRECTORY),
+    (None, {'ANSWERLENS_PROFILE': 'TRUE'}, True, DEFAULT_DIRECTORY),
+    (None, {'ANSWERLENS_PROFILE': '/tmp/al'}, True, '/tmp/al'),
+    ('', {}, True, DEFAULT_DIRECTORY),
+    ('reports', {'ANSWERLENS_PROFILE': '0'}, True, 'reports'),
+])
+def test_from_settings(option, environ, enabled, directory):
+    profiler = Profiler.from_settings(option, environ)
+    assert profiler.enabled is enabled
+    if enabled:
+        assert profiler.directory == directory
+        assert profiler.interval == DEFAULT_INTERVAL
+
+
+@pytest.mark.parametrize("value, interval", [('60', 60.0), ('0.1', 1.0), ('soon', DEFAULT_INTERVAL)])
+def test_from_settings_interval(value, interval):
+    profiler = Profiler.from_settings('', {'ANSWERLENS_PROFILE_INTERVAL': value})
+    assert profiler.interval == interval
+
+
+def test_disabled_profiler_leaves_callbacks_alone():
+    profiler = Profiler()
+    
+    def callback():
+        pass
+    
+    assert profiler.wrap('x', callback) is callback
+    assert profiler.dump() is None
+
+
+def test_wrapped_calls_are_counted_and_reported(tmp_path):
+    profiler = Profiler(enabled=True, directory=str(tmp_path), interval=3600, keep=1)
+    profiler.start()
+    try:
+        square = profiler.wrap('math:square', lambda value: value * value)
+        
+        async def fetch():
+            await asyncio.sleep(0)
+            return "done"
+        
+        async def chunks():
+            yield 1
+            yield 2
+        
+        fetch = profiler.wrap('network:fetch', fetch)
+        chunks = profiler.wrap('network:chunks', chunks)
+        
+        async def consume():
+            return await fetch(), [item async for item in chunks()]
+        
+        assert [square(value) for value in range(3)] == [0, 1, 4]
+        assert asyncio.run(consume()) == ("done", [1, 2])
+        path = profiler.dump()
+        with open(path) as f:
+            report = f.read()
+        assert os.path.exists(path[:-4] + ".pstats")
+    finally:
+        profiler.stop()
+    
+    assert "math:square" in report and "network:fetch" in report and "network:chunks" in report
+    assert "Top functions by cumulative" in report
+    # The final report from stop() rotated out the older one
+    assert not os.path.exists(path)
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.txt')]) == 1
+
@@ -0,0 +1,46 @@
+"""
+Region selector background: only recent whole-screen frames are reused (needs a display)
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image  # noqa: E402
+
+from capture_worker import Frame  # noqa: E402
+
+DESKTOP = (0, 0, 1280, 360)
+MONITORS = [(1, (0, 0, 640, 360)), (2, (640, 0, 640, 360))]
+
+
+@pytest.fixture
+def app(gui_app, monkeypatch):
+    monkeypatch.setattr(gui_app.capturer, "desktop_bounds", lambda: DESKTOP)
+    monkeypatch.setattr(gui_app.capturer, "list_monitors", lambda: MONITORS)
+    return gui_app
+
+
+def selector_for(app, monkeypatch, bounds, age=0.0):
+    frame = Frame(time.time() - age, Image.new('RGB', bounds[2:]), bounds)
+    monkeypatch.setattr(app.capture_worker, "latest", lambda: frame)
+    return app._region_selector(), frame
+
+
+@pytest.mark.parametrize("bounds", [DESKTOP, MONITORS[1][1]])
+def test_whole_screen_frames_are_reused(app, monkeypatch, bounds):
+    selector, frame = selector_for(app, monkeypatch, bounds)
+    assert selector.frame is frame.image
+    assert selector.frame_bounds == bounds
+
+
+def test_region_frames_are_not_reused(app, monkeypatch):
+    selector, _ = selector_for(app, monkeypatch, (100, 100, 300, 200))
+    assert selector.frame is None
+
+
+def test_old_frames_are_not_reused(app, monkeypatch):
+    selector, _ = selector_for(app, monkeypatch, DESKTOP, age=60.0)
+    assert selector.frame is None
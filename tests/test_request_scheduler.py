@@ -0,0 +1,221 @@
+"""
+RequestScheduler: token bucket, backoff, retries and deadlines
+"""
+
+import asyncio
+
+import pytest
+
+import request_scheduler
+from request_scheduler import DeadlineExceeded, RequestScheduler, TokenBucket
+
+
+class HttpError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status code"""
+    
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the scheduler module"""
+    now = [1000.0]
+    monkeypatch.setattr(request_scheduler.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Record asyncio.sleep() delays instead of waiting"""
+    delays = []
+    
+    async def sleep(delay):
+        delays.append(delay)
+    
+    monkeypatch.setattr(request_scheduler.asyncio, 'sleep', sleep)
+    return delays
+
+
+def test_bucket_allows_burst_then_waits(clock):
+    bucket = TokenBucket(60, burst=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+def test_bucket_refills_at_rate_up_to_capacity(clock):
+    bucket = TokenBucket(120, burst=2)
+    bucket.try_acquire()
+    bucket.try_acquire()
+    clock[0] += 0.5
+    assert bucket.try_acquire() == 0
+    clock[0] += 60
+    bucket.try_acquire()
+    assert bucket.tokens == pytest.approx(1.0)
+
+
+def test_default_burst_is_a_quarter_minute():
+    assert TokenBucket(40).capacity == 10
+    assert TokenBucket(2).capacity == 1
+
+
+def test_set_rate_keeps_tokens_and_rescales(clock):
+    bucket = TokenBucket(60)
+    bucket.tokens = 0.0
+    bucket.set_rate(600)
+    assert bucket.capacity == 150
+    assert bucket.try_acquire() == pytest.approx(0.1)
+
+
+def test_acquire_past_deadline_raises(clock):
+    bucket = TokenBucket(60, burst=1)
+    bucket.try_acquire()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(bucket.acquire(deadline=clock[0] + 0.5))
+
+
+def test_backoff_is_full_jitter_and_capped(monkeypatch):
+    scheduler = RequestScheduler(base_delay=1.0, max_delay=5.0)
+    monkeypatch.setattr(request_scheduler.random, 'uniform', lambda low, high: high)
+    assert [scheduler.backoff_delay(attempt) for attempt in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+    monkeypatch.setattr(request_scheduler.random, 'uniform', lambda low, high: low)
+    assert scheduler.backoff_delay(3) == 0
+
+
+@pytest.mark.parametrize("error, transient", [
+    (HttpError(429), True),
+    (HttpError(503), True),
+    (HttpError(400), False),
+    (ConnectionResetError(), True),
+    (asyncio.TimeoutError(), True),
+    (DeadlineExceeded(), False),
+    (ValueError("bad"), False),
+])
+def test_is_transient(error, transient):
+    assert RequestScheduler.is_transient(error) is transient
+
+
+def test_httpx_transport_errors_are_transient():
+    httpx = pytest.importorskip("httpx")
+    assert RequestScheduler.is_transient(httpx.ReadError("reset"))
+    assert RequestScheduler.is_transient(httpx.ConnectTimeout("timeout"))
+
+
+def test_run_retries_transient_errors_and_throttles(no_sleep):
+    scheduler = RequestScheduler(max_retries=3)
+    outcomes = [HttpError(429), HttpError(503), "ok"]
+    
+    async def request():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    assert asyncio.run(scheduler.run(request)) == "ok"
+    assert scheduler.retries == 2
+    assert scheduler.rate_limited == 1
+    assert len(no_sleep) == 2
+    assert scheduler.throttle == 1.0  # Doubled by the 429, halved by the success
+    assert scheduler.adjusted_interval(10) == 10
+
+
+def test_run_gives_up_after_max_retries(no_sleep):
+    scheduler = RequestScheduler(max_retries=2)
+    calls = []
+    
+    async def request():
+        calls.append(1)
+        raise HttpError(500)
+    
+    with pytest.raises(HttpError):
+        asyncio.run(scheduler.run(request))
+    assert len(calls) == 3
+
+
+def test_run_does_not_retry_client_errors(no_sleep):
+    scheduler = RequestScheduler()
+    calls = []
+    
+    async def request():
+        calls.append(1)
+        raise HttpError(400)
+    
+    with pytest.raises(HttpError):
+        asyncio.run(scheduler.run(request))
+    assert len(calls) == 1
+
+
+def test_run_deadline():
+    scheduler = RequestScheduler()
+    
+    async def request():
+        await asyncio.sleep(1)
+    
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scheduler.run(request, timeout=0.05))
+
+
+def test_stream_retries_before_first_chunk_and_closes_failed_stream(no_sleep):
+    scheduler = RequestScheduler()
+    closed = []
+    
+    class Stream:
+        def __init__(self, fail):
+            self.fail = fail
+            self.items = ["a", "b"]
+        
+        def __aiter__(self):
+            return self
+        
+        async def __anext__(self):
+            if self.fail:
+                raise ConnectionResetError()
+            if not self.items:
+                raise StopAsyncIteration
+            return self.items.pop(0)
+        
+        async def aclose(self):
+            closed.append(self.fail)
+    
+    attempts = [Stream(True), Stream(False)]
+    
+    async def consume():
+        return [item async for item in scheduler.stream(lambda: attempts.pop(0))]
+    
+    assert asyncio.run(consume()) == ["a", "b"]
+    assert closed == [True]
+    assert scheduler.retries == 1
+
+
+def test_stream_does_not_retry_after_partial_output(no_sleep):
+    scheduler = RequestScheduler()
+    calls = []
+    
+    async def stream():
+        calls.append(1)
+        yield "partial"
+        raise ConnectionResetError()
+    
+    async def consume():
+        items = []
+        async for item in scheduler.stream(stream):
+            items.append(item)
+        return items
+    
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(consume())
+    assert len(calls) == 1
+
+
+def test_set_rate_adds_and_removes_the_limit():
+    scheduler = RequestScheduler()
+    assert scheduler.bucket is None
+    scheduler.set_rate(30)
+    bucket = scheduler.bucket
+    assert bucket.rate == pytest.approx(0.5)
+    scheduler.set_rate(120)
+    assert scheduler.bucket is bucket and bucket.rate == pytest.approx(2.0)
+    scheduler.set_rate(None)
+    assert scheduler.bucket is None
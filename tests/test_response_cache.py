@@ -0,0 +1,102 @@
+"""
+ResponseCache: keys, LRU bounds, expiry and on-disk persistence
+"""
+
+import os
+import time
+
+from response_cache import ResponseCache
+
+
+def entry_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def age(path, seconds):
+    """Backdate a file's modification time"""
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_key_normalizes_question_whitespace_and_case():
+    key = ResponseCache.make_key(b"image", "What  is\nthis?", "model")
+    assert key == ResponseCache.make_key(b"image", "what is this?", "model")
+    assert key != ResponseCache.make_key(b"image", "what is this?", "other")
+    assert key != ResponseCache.make_key(b"other", "what is this?", "model")
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.hit_rate() == 0.75
+
+
+def test_memory_only_cache_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = ResponseCache()
+    cache.put("key", "answer")
+    assert os.listdir(tmp_path) == []
+
+
+def test_entries_persist_across_instances(tmp_path):
+    ResponseCache(cache_dir=str(tmp_path)).put("key", "answer")
+    assert ResponseCache(cache_dir=str(tmp_path)).get("key") == "answer"
+
+
+def test_expired_entries_are_swept_on_open(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=60)
+    cache.put("old", "stale")
+    cache.put("new", "fresh")
+    age(tmp_path / "old.json", 120)
+    (tmp_path / "leftover.1.tmp").write_text("{")
+    age(tmp_path / "leftover.1.tmp", 120)
+    
+    ResponseCache(cache_dir=str(tmp_path), ttl=60)
+    assert entry_files(tmp_path) == ["new.json"]
+    assert not (tmp_path / "leftover.1.tmp").exists()
+
+
+def test_disk_entry_cap_removes_oldest_on_write(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_disk_entries=10)
+    for index in range(10):
+        cache.put(f"k{index:02}", "answer")
+        age(tmp_path / f"k{index:02}.json", 100 - index)
+    cache.put("k10", "answer")
+    
+    files = entry_files(tmp_path)
+    assert len(files) == 9
+    assert files[0] == "k02.json" and files[-1] == "k10.json"
+
+
+def test_rewriting_a_key_does_not_count_as_a_new_entry(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_disk_entries=3)
+    cache.put("a", "first")
+    cache.put("b", "answer")
+    for _ in range(5):
+        cache.put("a", "a longer answer")
+    assert entry_files(tmp_path) == ["a.json", "b.json"]
+    assert cache._disk_entries == 2
+    assert cache._disk_bytes == sum(os.path.getsize(tmp_path / name) for name in entry_files(tmp_path))
+
+
+def test_disk_size_cap(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_disk_bytes=4000)
+    for index in range(20):
+        cache.put(f"k{index:02}", "x" * 500)
+    total = sum(os.path.getsize(tmp_path / name) for name in entry_files(tmp_path))
+    assert total <= 4000
+    assert "k19.json" in entry_files(tmp_path)
+
+
+def test_set_cache_dir_turns_persistence_on_and_off(tmp_path):
+    cache = ResponseCache()
+    cache.set_cache_dir(str(tmp_path / "cache"))
+    cache.put("on", "answer")
+    cache.set_cache_dir(None)
+    cache.put("off", "answer")
+    assert entry_files(tmp_path / "cache") == ["on.json"]
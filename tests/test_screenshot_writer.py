@@ -0,0 +1,76 @@
+"""
+ScreenshotWriter: content-hash names, duplicate skipping, formats and close()
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image, ImageChops, features  # noqa: E402
+
+from screenshot_writer import ScreenshotWriter, image_hash  # noqa: E402
+
+
+def shot(color=(30, 120, 200), size=(160, 90)):
+    return Image.new('RGB', size, color)
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = ScreenshotWriter(directory=str(tmp_path / "shots"))
+    yield writer
+    writer.close()
+
+
+def test_files_are_named_by_content_hash(writer):
+    image = shot()
+    saved = writer.save(image).result(timeout=5)
+    
+    assert saved.written
+    assert os.path.basename(saved.path) == f"screenshot_{image_hash(image)[:16]}.png"
+    with Image.open(saved.path) as written:
+        assert written.format == 'PNG'
+        assert ImageChops.difference(written.convert('RGB'), image).getbbox() is None
+
+
+def test_identical_frames_are_written_once(writer):
+    first = writer.save(shot()).result(timeout=5)
+    second = writer.save(shot()).result(timeout=5)
+    other = writer.save(shot(color=(0, 0, 0))).result(timeout=5)
+    
+    assert second.path == first.path and not second.written
+    assert other.path != first.path and other.written
+    assert (writer.written, writer.duplicates) == (2, 1)
+    assert sorted(os.listdir(writer.directory)) == sorted(os.path.basename(s.path) for s in (first, other))
+
+
+def test_hash_depends_on_mode_and_size():
+    assert image_hash(shot()) == image_hash(shot())
+    assert image_hash(shot()) != image_hash(shot().convert('RGBA'))
+    assert image_hash(shot(size=(90, 160))) != image_hash(shot(size=(160, 90)))
+
+
+@pytest.mark.parametrize("format, extension, pil_format", [
+    ('jpeg', 'jpg', 'JPEG'),
+    pytest.param('webp', 'webp', 'WEBP', marks=pytest.mark.skipif(not features.check('webp'), reason="no WebP")),
+])
+def test_formats(writer, format, extension, pil_format):
+    image = shot().convert('RGBA')  # JPEG needs a conversion first
+    saved = writer.save(image, format=format).result(timeout=5)
+    assert saved.path.endswith(f".{extension}")
+    with Image.open(saved.path) as written:
+        assert written.format == pil_format
+        assert written.size == image.size
+
+
+def test_close_writes_everything_queued(tmp_path):
+    writer = ScreenshotWriter(directory=str(tmp_path), compress_level=0)
+    futures = [writer.save(shot(color=(index, 0, 0))) for index in range(20)]
+    writer.close()
+    
+    assert all(future.done() for future in futures)
+    assert writer.pending() == 0
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.png')]) == 20
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
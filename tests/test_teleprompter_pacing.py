@@ -0,0 +1,71 @@
+"""
+Teleprompter frame pacing: plays an answer in the real app for a few seconds
+and checks the frame intervals and highlight rate (needs a display, e.g. xvfb-run -a)
+"""
+
+import random
+import time
+
+import pytest
+
+from teleprompter_engine import FRAME_MS, TeleprompterEngine
+
+SECONDS = 3.0
+SPEED = 6
+
+
+@pytest.fixture
+def app(gui_app):
+    import tkinter as tk
+    from synthetic import make_answer
+    
+    gui_app.answer_text.delete("1.0", tk.END)
+    gui_app.answer_text.insert("1.0", make_answer(2000))
+    gui_app.open_teleprompter()
+    gui_app.scroll_speed_var.set(SPEED)
+    gui_app.teleprompter_engine.start_delay = 0.5
+    gui_app.root.update()
+    return gui_app
+
+
+def play(app, jitter_ms=0):
+    """
+    Play the teleprompter for SECONDS, optionally stalling the event loop at random
+    
+    Returns:
+        (frame_time_stats(), seconds played)
+    """
+    root = app.root
+    rng = random.Random(1)
+    
+    def stall():
+        time.sleep(rng.uniform(0, jitter_ms) / 1000)
+        root.after(rng.randint(10, 60), stall)
+    
+    if jitter_ms:
+        root.after(10, stall)
+    root.after(int(SECONDS * 1000), root.quit)
+    start = time.monotonic()
+    app.toggle_teleprompter_scroll()
+    root.mainloop()
+    played = time.monotonic() - start
+    assert app.teleprompter_scroll_active
+    return app.teleprompter_engine.frame_time_stats(), played
+
+
+def expected_words(played):
+    return played * TeleprompterEngine.words_per_second(SPEED)
+
+
+def test_frames_keep_the_target_interval(app):
+    stats, played = play(app)
+    assert stats['frames'] >= 0.6 * played * 1000 / FRAME_MS
+    assert FRAME_MS * 0.9 <= stats['mean_ms'] <= FRAME_MS * 1.5
+    assert stats['p99_ms'] <= FRAME_MS * 4
+    assert abs(app.highlighted_word_index - expected_words(played)) <= 2
+
+
+def test_event_loop_stalls_do_not_change_the_reading_speed(app):
+    stats, played = play(app, jitter_ms=20)
+    assert stats['mean_ms'] <= FRAME_MS + 20
+    assert abs(app.highlighted_word_index - expected_words(played)) <= 2
@@ -0,0 +1,39 @@
+"""
+Streaming answers into the teleprompter: playback auto-starts once per answer (needs a display)
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app(gui_app):
+    gui_app.open_teleprompter()
+    gui_app.root.update()
+    return gui_app
+
+
+def test_playback_starts_with_the_first_words(app):
+    app._set_teleprompter_text("")
+    assert not app.teleprompter_scroll_active
+    app._append_teleprompter_text("The first words")
+    assert app.teleprompter_scroll_active
+
+
+def test_pause_sticks_while_the_answer_streams(app):
+    app._set_teleprompter_text("")
+    app._append_teleprompter_text("The first words")
+    app.toggle_teleprompter_scroll()
+    assert not app.teleprompter_scroll_active
+    
+    app._append_teleprompter_text(" and some more")
+    assert not app.teleprompter_scroll_active
+
+
+def test_next_answer_starts_again(app):
+    app._set_teleprompter_text("")
+    app._append_teleprompter_text("First answer")
+    app.toggle_teleprompter_scroll()
+    
+    app._set_teleprompter_text("")
+    app._append_teleprompter_text("Second answer")
+    assert app.teleprompter_scroll_active
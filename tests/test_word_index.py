@@ -0,0 +1,50 @@
+"""
+WordIndex: Tk line/column positions of teleprompter words
+"""
+
+from word_index import WordIndex
+
+
+def spans(index):
+    return [index.span(position) for position in range(len(index))]
+
+
+def test_words_on_several_lines():
+    index = WordIndex()
+    index.add_text("Hello  world\n\n  again!")
+    assert spans(index) == [("1.0", "1.5"), ("1.7", "1.12"), ("3.2", "3.8")]
+
+
+def test_add_text_from_a_position():
+    index = WordIndex()
+    index.add_text("more words", line=4, column=10)
+    assert spans(index) == [("4.10", "4.14"), ("4.15", "4.20")]
+
+
+def test_streamed_chunk_continuing_the_last_word():
+    index = WordIndex()
+    text = "The quick bro"
+    index.add_text(text)
+    
+    line, column = index.resume_position()
+    assert (line, column) == (1, 10)
+    text += "wn fox\njumps"
+    index.add_text(text[column:], line, column)
+    
+    expected = WordIndex()
+    expected.add_text(text)
+    assert spans(index) == spans(expected)
+    assert index.span(2) == ("1.10", "1.15")
+
+
+def test_resume_position_of_empty_index():
+    assert WordIndex().resume_position() == (1, 0)
+
+
+def test_clear():
+    index = WordIndex()
+    index.add_text("one two")
+    index.clear()
+    assert len(index) == 0
+    index.add_text("three")
+    assert spans(index) == [("1.0", "1.5")]
@@ -0,0 +1,73 @@
+"""
+Word index for teleprompter highlighting
+Stores word positions as array-backed line/column triples so highlight steps
+use direct Tk indices instead of "1.0 + N chars" offsets resolved from the top
+"""
+
+import re
+from array import array
+
+
+WORD_PATTERN = re.compile(r'\S+')
+
+
+class WordIndex:
+    """Positions of the words in a Tk text widget"""
+    
+    def __init__(self):
+        """Initialize an empty index"""
+        self.lines = array('I')
+        self.starts = array('I')
+        self.ends = array('I')
+    
+    def __len__(self):
+        return len(self.lines)
+    
+    def clear(self):
+        """Forget all words"""
+        del self.lines[:]
+        del self.starts[:]
+        del self.ends[:]
+    
+    def span(self, index):
+        """
+        Tk text indices of a word
+        
+        Returns:
+            Tuple of (start, end) indices such as ("3.14", "3.19")
+        """
+        line = self.lines[index]
+        return f"{line}.{self.starts[index]}", f"{line}.{self.ends[index]}"
+    
+    def resume_position(self):
+        """
+        Drop the last word and return where parsing should continue
+        
+        A streamed chunk may continue the last word, so it is parsed again
+        together with the appended text.
+        
+        Returns:
+            Tuple of (line, column) to pass to add_text along with the text from there on
+        """
+        if not self.lines:
+            return 1, 0
+        line, column = self.lines.pop(), self.starts.pop()
+        self.ends.pop()
+        return line, column
+    
+    def add_text(self, text, line=1, column=0):
+        """
+        Index the words of text that starts at the given position
+        
+        Args:
+            text: Widget content from (line, column) onwards
+            line: Tk line number (1-based) where text starts
+            column: Tk column where text starts
+        """
+        for segment in text.split('\n'):
+            for match in WORD_PATTERN.finditer(segment):
+                self.lines.append(line)
+                self.starts.append(column + match.start())
+                self.ends.append(column + match.end())
+            line += 1
+            column = 0